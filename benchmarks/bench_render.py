@@ -0,0 +1,71 @@
+"""比較內建 Markdown renderer 與模板 renderer 的 render 時間。
+
+用法：python benchmarks/bench_render.py [--entries 2000] [--repeat 20]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import pathlib
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "ops"))
+
+import renderers  # noqa: E402
+import templating  # noqa: E402
+
+
+def make_entries(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": f"Entry {idx} 標題",
+            "url": f"https://example.com/{idx}",
+            "summary_raw": "摘要內容 " * (idx % 60),
+            "published_at": "2025-12-22T08:00:00+00:00",
+            "source": f"Source {idx % 12}",
+            "tags": ["AI", "tools"][: idx % 3],
+            "category": f"category-{idx % 6}",
+        }
+        for idx in range(count)
+    ]
+
+
+def best_of(repeat: int, func: Callable[[], None]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    model = renderers.build_model(make_entries(args.entries), "2025-12-22", {"dedup_rate": 0.1})
+    candidates: Dict[str, renderers.Renderer] = {"markdown (內建)": renderers.MarkdownRenderer()}
+
+    started = time.perf_counter()
+    candidates["template (builtin)"] = templating.TemplateRenderer(engine="builtin")
+    print(f"builtin 模板編譯：{(time.perf_counter() - started) * 1000:.2f} ms（每個行程一次）")
+    try:
+        import jinja2  # noqa: F401
+    except ImportError:
+        print("未安裝 jinja2，略過 jinja2 引擎")
+    else:
+        candidates["template (jinja2)"] = templating.TemplateRenderer(engine="jinja2")
+
+    baseline = None
+    for name, renderer in candidates.items():
+        seconds = best_of(args.repeat, lambda: renderer.render(model, io.StringIO()))
+        baseline = baseline or seconds
+        print(f"{name:<20} {seconds * 1000:8.2f} ms  ({seconds / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
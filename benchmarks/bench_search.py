@@ -0,0 +1,79 @@
+"""產生多年份的假 raw JSON，量測建索引與查詢時間。
+
+用法：python benchmarks/bench_search.py [--days 1095] [--per-day 300]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import pathlib
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "ops"))
+
+import search  # noqa: E402
+
+WORDS = "模型 語言 推論 加速 資料 安全 雲端 開源 框架 效能 rust python kubernetes llm gpu".split()
+# 其餘詞彙只當背景雜訊，讓查詢詞的命中率接近真實資料（少數百分比）
+FILLER = [f"word{idx}" for idx in range(5000)]
+QUERIES = ["模型", "kubernetes", "開源 框架", "gpu*", "rust python"]
+
+
+def make_entries(rng: random.Random, date: str, count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": " ".join([rng.choice(WORDS), *rng.sample(FILLER, 5)]),
+            "url": f"https://example.com/{date}/{idx}",
+            "summary_raw": " ".join(rng.choices(FILLER, k=40) + [rng.choice(WORDS)]),
+            "published_at": date,
+            "source": f"Source {idx % 30}",
+            "tags": rng.sample(FILLER, 2),
+            "category": f"category-{idx % 6}",
+        }
+        for idx in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=1095)
+    parser.add_argument("--per-day", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    start = dt.date(2023, 1, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = pathlib.Path(tmp)
+        for offset in range(args.days):
+            date = (start + dt.timedelta(days=offset)).isoformat()
+            document = {"entries": make_entries(rng, date, args.per_day)}
+            (raw_dir / f"raw-{date}.json").write_text(json.dumps(document), encoding="utf-8")
+
+        conn = search.connect(search.store_path(raw_dir))
+        started = time.perf_counter()
+        search.sync(conn, raw_dir)
+        total = args.days * args.per_day
+        print(f"建立索引：{total} 筆，{time.perf_counter() - started:.1f} s")
+
+        started = time.perf_counter()
+        search.sync(conn, raw_dir)
+        print(f"無變更的增量同步：{(time.perf_counter() - started) * 1000:.1f} ms")
+
+        middle = (start + dt.timedelta(days=args.days // 2)).isoformat()
+        for text in QUERIES:
+            for kwargs in ({}, {"since": middle, "categories": ["category-1"]}):
+                started = time.perf_counter()
+                hits = search.search(conn, text, **kwargs)
+                elapsed = (time.perf_counter() - started) * 1000
+                label = "（日期+分類過濾）" if kwargs else ""
+                print(f"{text!r:<16} {label:<10} {len(hits):3d} 筆 {elapsed:8.2f} ms")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""把每次 collector 的 payload 與 meta 匯出成依日期分割的 Parquet，並提供常用彙總查詢。
+
+目錄採 Hive 風格分割，pyarrow.dataset 讀取時可依 ``date`` 略過不相關的分割，並只讀需要的欄位：
+
+    out/analytics/entries/date=2025-12-22/part-0.parquet    當日 payload（重跑時整份取代）
+    out/analytics/runs/date=2025-12-22/run-<時間>.parquet    每次執行的 meta 一列（累加）
+
+用法：
+    python ops/analytics.py export --range 2025-01-01..2025-12-31   # 轉換既有 raw JSON
+    python ops/analytics.py sources --since 2025-06-01               # 來源產量
+    python ops/analytics.py categories | dedup
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import logging
+import os
+import pathlib
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Sequence
+
+import logutil
+import rollup
+from lazyimport import LazyModule
+
+pa = LazyModule("pyarrow", "請先安裝 pyarrow：pip install pyarrow")
+pc = LazyModule("pyarrow.compute", "請先安裝 pyarrow：pip install pyarrow")
+pq = LazyModule("pyarrow.parquet", "請先安裝 pyarrow：pip install pyarrow")
+pads = LazyModule("pyarrow.dataset", "請先安裝 pyarrow：pip install pyarrow")
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+OUT_DIR = ROOT / "out"
+ANALYTICS_DIR = OUT_DIR / "analytics"
+RAW_PREFIX = "raw"
+ENTRY_STRING_FIELDS = (
+    "source_key",
+    "source",
+    "category",
+    "title",
+    "url",
+    "summary_raw",
+    "published_at",
+    "fetched_at",
+)
+RUN_INT_FIELDS = (
+    "raw_entries",
+    "unique_entries",
+    "filtered_entries",
+    "total_sources",
+    "succeeded_sources",
+    "failed_source_count",
+)
+_RAW_DATE = re.compile(rf"^{RAW_PREFIX}-(\d{{4}}-\d{{2}}-\d{{2}})\.json$")
+LOGGER = logging.getLogger("analytics")
+
+
+def require() -> None:
+    """Fail fast (SystemExit with an install hint) when pyarrow is missing."""
+    pa.__version__
+
+
+def partition_dir(root: pathlib.Path, table: str, date: str) -> pathlib.Path:
+    return root / table / f"date={date}"
+
+
+def _field(entry: Any, name: str) -> Any:
+    # collector 傳入 models.Entry，export 指令讀 raw JSON 時為 dict
+    if isinstance(entry, dict):
+        return entry.get(name, "")
+    return getattr(entry, name, "")
+
+
+def entry_columns(entries: Sequence[Any]) -> Dict[str, List[Any]]:
+    """Column-major view of the payload (one list per field)."""
+    columns: Dict[str, List[Any]] = {
+        name: [str(_field(entry, name) or "") for entry in entries] for name in ENTRY_STRING_FIELDS
+    }
+    columns["tags"] = [[str(tag) for tag in _field(entry, "tags") or ()] for entry in entries]
+    columns["published_epoch"] = [
+        epoch if isinstance(epoch, int) else None
+        for epoch in (_field(entry, "published_epoch") for entry in entries)
+    ]
+    return columns
+
+
+def run_row(meta: Dict[str, Any]) -> Dict[str, Any]:
+    """One row of run-level metrics; missing counters become null."""
+    row: Dict[str, Any] = {"generated_at": str(meta.get("generated_at", ""))}
+    for name in RUN_INT_FIELDS:
+        value = meta.get(name)
+        row[name] = value if isinstance(value, int) else None
+    dedup_rate = meta.get("dedup_rate")
+    row["dedup_rate"] = float(dedup_rate) if isinstance(dedup_rate, (int, float)) else None
+    failed_sources = meta.get("failed_sources") or []
+    row["failed_sources"] = [
+        str(item.get("key", "")) for item in failed_sources if isinstance(item, dict)
+    ]
+    row["category_counts"] = json.dumps(meta.get("category_counts") or {}, ensure_ascii=False)
+    return row
+
+
+def entries_schema() -> Any:
+    return pa.schema(
+        [(name, pa.string()) for name in ENTRY_STRING_FIELDS]
+        + [("tags", pa.list_(pa.string())), ("published_epoch", pa.int64())]
+    )
+
+
+def runs_schema() -> Any:
+    return pa.schema(
+        [("generated_at", pa.string())]
+        + [(name, pa.int64()) for name in RUN_INT_FIELDS]
+        + [
+            ("dedup_rate", pa.float64()),
+            ("failed_sources", pa.list_(pa.string())),
+            ("category_counts", pa.string()),
+        ]
+    )
+
+
+def _write_table(table: Any, path: pathlib.Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def run_file_name(meta: Dict[str, Any]) -> str:
+    stamp = re.sub(r"[^0-9A-Za-z]", "", str(meta.get("generated_at", ""))) or "unknown"
+    return f"run-{stamp}.parquet"
+
+
+def export_run(
+    root: pathlib.Path, date: str, entries: Sequence[Any], meta: Dict[str, Any]
+) -> pathlib.Path:
+    """Replace the day's entries partition and append one row for this run's meta."""
+    entries_path = partition_dir(root, "entries", date) / "part-0.parquet"
+    entries_table = pa.Table.from_pydict(entry_columns(entries), schema=entries_schema())
+    _write_table(entries_table, entries_path)
+    run_table = pa.Table.from_pylist([run_row(meta)], schema=runs_schema())
+    _write_table(run_table, partition_dir(root, "runs", date) / run_file_name(meta))
+    return entries_path
+
+
+def _dataset(root: pathlib.Path, table: str) -> Any:
+    schema = entries_schema() if table == "entries" else runs_schema()
+    return pads.dataset(
+        root / table,
+        format="parquet",
+        schema=schema.append(pa.field("date", pa.string())),
+        partitioning=pads.partitioning(pa.schema([("date", pa.string())]), flavor="hive"),
+    )
+
+
+def _date_filter(since: str | None, until: str | None) -> Any:
+    expression = None
+    for op, value in (("greater_equal", since), ("less_equal", until)):
+        if value:
+            clause = getattr(pc, op)(pc.field("date"), pc.scalar(value))
+            expression = clause if expression is None else expression & clause
+    return expression
+
+
+def read_table(
+    root: pathlib.Path,
+    table: str,
+    columns: Sequence[str],
+    since: str | None = None,
+    until: str | None = None,
+) -> Any:
+    """Read only ``columns`` from partitions within [since, until]."""
+    if not (root / table).exists():
+        return pa.table({name: [] for name in columns})
+    return _dataset(root, table).to_table(columns=list(columns), filter=_date_filter(since, until))
+
+
+def source_yield(root: pathlib.Path, since: str | None = None, until: str | None = None) -> Any:
+    """Per source: entries in total, active days and the daily mean."""
+    table = read_table(root, "entries", ["date", "source_key", "source"], since, until)
+    daily = table.group_by(["source_key", "source", "date"]).aggregate([([], "count_all")])
+    summary = daily.group_by(["source_key", "source"]).aggregate(
+        [("count_all", "sum"), ("date", "count"), ("count_all", "mean")]
+    )
+    summary = summary.rename_columns(["source_key", "source", "entries", "days", "per_day"])
+    return summary.sort_by([("entries", "descending"), ("source_key", "ascending")])
+
+
+def category_mix(root: pathlib.Path, since: str | None = None, until: str | None = None) -> Any:
+    """Entries per (date, category)."""
+    table = read_table(root, "entries", ["date", "category"], since, until)
+    counts = table.group_by(["date", "category"]).aggregate([([], "count_all")])
+    counts = counts.rename_columns(["date", "category", "entries"])
+    return counts.sort_by([("date", "ascending"), ("category", "ascending")])
+
+
+def dedup_rates(root: pathlib.Path, since: str | None = None, until: str | None = None) -> Any:
+    """The last run of each day: raw/unique counts and dedup rate."""
+    columns = ["date", "generated_at", "raw_entries", "unique_entries", "dedup_rate"]
+    table = read_table(root, "runs", columns, since, until)
+    table = table.sort_by([("date", "ascending"), ("generated_at", "ascending")])
+    dates = table.column("date").to_pylist()
+    last = [
+        idx for idx, date in enumerate(dates) if idx + 1 == len(dates) or dates[idx + 1] != date
+    ]
+    return table.take(last)
+
+
+def raw_files(
+    raw_dir: pathlib.Path, dates: Iterable[str] | None = None
+) -> List[tuple[str, pathlib.Path]]:
+    if dates is not None:
+        candidates = [(date, raw_dir / f"{RAW_PREFIX}-{date}.json") for date in dates]
+        return [(date, path) for date, path in candidates if path.exists()]
+    matches = (_RAW_DATE.match(path.name) for path in sorted(raw_dir.glob(f"{RAW_PREFIX}-*.json")))
+    return [(match.group(1), raw_dir / match.group(0)) for match in matches if match]
+
+
+def export_raw(
+    root: pathlib.Path, raw_dir: pathlib.Path, dates: Iterable[str] | None = None
+) -> int:
+    """Convert existing raw JSON files (all, or the given dates); returns files exported."""
+    exported = 0
+    for date, path in raw_files(raw_dir, dates):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            LOGGER.warning(f"略過無法讀取的檔案 {path}：{exc}")
+            continue
+        if isinstance(data, list):
+            data = {"entries": data}
+        entries = [entry for entry in data.get("entries") or [] if isinstance(entry, dict)]
+        export_run(root, date, entries, data.get("meta") or {})
+        exported += 1
+    return exported
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Parquet 分析匯出與彙總查詢")
+    parser.add_argument("command", choices=("export", "sources", "categories", "dedup"))
+    parser.add_argument(
+        "--dir",
+        type=pathlib.Path,
+        default=ANALYTICS_DIR,
+        help="Parquet 根目錄（預設：out/analytics）",
+    )
+    parser.add_argument(
+        "--raw-dir", type=pathlib.Path, default=OUT_DIR, help="export 讀取的 raw JSON 目錄"
+    )
+    parser.add_argument("--range", help="export 的日期區間 START..END（預設：全部 raw 檔）")
+    parser.add_argument("--since", help="查詢起始日期（含）")
+    parser.add_argument("--until", help="查詢結束日期（含）")
+    parser.add_argument("--verbose", "-v", action="store_true", help="顯示 DEBUG 級別日誌")
+    return parser.parse_args(argv)
+
+
+def format_table(table: Any) -> str:
+    rows = table.to_pylist()
+    names = table.column_names
+    cells = [
+        [f"{row[name]:.2f}" if isinstance(row[name], float) else str(row[name]) for name in names]
+        for row in rows
+    ]
+    widths = [
+        max([len(name)] + [len(line[idx]) for line in cells]) for idx, name in enumerate(names)
+    ]
+    lines = ["  ".join(name.ljust(width) for name, width in zip(names, widths))]
+    lines.extend("  ".join(cell.ljust(width) for cell, width in zip(line, widths)) for line in cells)
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    logutil.setup_logging(verbose=args.verbose)
+    require()
+
+    if args.command == "export":
+        dates = None
+        if args.range:
+            try:
+                dates = rollup.parse_range(args.range)
+            except ValueError as exc:
+                LOGGER.error(f"日期區間錯誤：{exc}")
+                sys.exit(1)
+        exported = export_raw(args.dir, args.raw_dir, dates)
+        if not exported:
+            LOGGER.error(f"{args.raw_dir} 沒有可匯出的 raw JSON")
+            sys.exit(2)
+        LOGGER.info(f"匯出 {exported} 天到 {args.dir}")
+        return
+
+    query = {"sources": source_yield, "categories": category_mix, "dedup": dedup_rates}[args.command]
+    table = query(args.dir, args.since, args.until)
+    logutil.stop_logging()
+    print(format_table(table))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""批次重建一段日期區間的 digest：以 process pool 平行 render，未變動的日期直接略過。"""
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import sys
+from typing import Any, Dict, List, Tuple
+
+import digest
+import logutil
+import ranking
+import renderers
+import rollup
+import templating
+import trends
+
+STATE_PATH = digest.ROOT / "cache" / "backfill.json"
+# 輸出內容改變時（例如加入趨勢段落）遞增，既有日期會重建一次
+STATE_VERSION = 2
+LOGGER = logging.getLogger("digest")
+
+# worker 行程共用的設定：由 initializer 設定一次，避免每個日期重新解析 feeds.yml
+_WORKER_CONFIG: ranking.RankingConfig | None = None
+# 模板每個 worker 只編譯一次，之後所有日期共用
+_WORKER_RENDERER: renderers.Renderer = renderers.RENDERERS["markdown"]
+
+
+def input_digest(path: pathlib.Path) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def load_state(path: pathlib.Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_state(path: pathlib.Path, state: Dict[str, Dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    text = json.dumps(state, ensure_ascii=False, indent=2, sort_keys=True)
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _init_worker(
+    config: ranking.RankingConfig | None,
+    verbose: bool,
+    template: pathlib.Path | None = None,
+    template_engine: str = "builtin",
+) -> None:
+    global _WORKER_CONFIG, _WORKER_RENDERER
+    _WORKER_CONFIG = config
+    if template is not None:
+        _WORKER_RENDERER = templating.TemplateRenderer(template, template_engine)
+    # pool worker 結束時不會執行 atexit，改用同步 handler 以免遺失 queue 中的記錄
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        handlers=logutil.build_handlers(verbose=verbose),
+        force=True,
+    )
+
+
+def render_day(
+    date: str,
+    input_path: pathlib.Path,
+    output_path: pathlib.Path,
+    top_k: int | None,
+    bursts: List[trends.Burst] | None = None,
+) -> Tuple[str, int]:
+    """Render one digest in a worker; returns (date, rendered entry count)."""
+    entries, meta = digest.load_entries(input_path)
+    if not entries:
+        raise ValueError(f"{input_path} 沒有資料")
+    if top_k is not None and _WORKER_CONFIG is not None:
+        entries = ranking.rank_entries(entries, _WORKER_CONFIG, date, top_k or None)
+    model = renderers.build_model(entries, date, meta, bursts)
+    digest.write_atomic(output_path, lambda fh: _WORKER_RENDERER.render(model, fh))
+    return date, len(entries)
+
+
+def plan(
+    dates: List[str],
+    state: Dict[str, Dict[str, Any]],
+    fingerprint: str,
+    force: bool = False,
+) -> Tuple[List[Tuple[str, pathlib.Path, pathlib.Path, Dict[str, Any]]], int]:
+    """Return (days to render with their new state record, number of missing inputs)."""
+    todo = []
+    missing = 0
+    for date in dates:
+        input_path = digest.OUT_DIR / f"{digest.RAW_PREFIX}-{date}.json"
+        output_path = digest.OUT_DIR / f"digest-{date}.md"
+        if not input_path.exists():
+            missing += 1
+            continue
+        record = {
+            "version": STATE_VERSION,
+            "input": input_digest(input_path),
+            "renderer": digest.RENDERER_VERSION,
+            "config": fingerprint,
+        }
+        if not force and state.get(date) == record and output_path.exists():
+            continue
+        todo.append((date, input_path, output_path, record))
+    return todo, missing
+
+
+def fold_trends(
+    todo: List[Tuple[str, pathlib.Path, pathlib.Path, Dict[str, Any]]]
+) -> Dict[str, List[trends.Burst]]:
+    """Fold each day's term counts into the trend store, oldest first, as digest.py does per run.
+
+    每天的 burst 只取決於當天與更早的計數，因此依日期順序更新後立即計算。
+    """
+    path = trends.store_path(digest.OUT_DIR)
+    store = trends.TrendStore.load(path)
+    bursts: Dict[str, List[trends.Burst]] = {}
+    for date, input_path, _output_path, _record in sorted(todo, key=lambda item: item[0]):
+        if not trends.is_iso_date(date):
+            continue
+        try:
+            entries, _meta = digest.load_entries(input_path)
+        except SystemExit:
+            # 損壞的原始資料由 worker 回報為失敗
+            continue
+        # 以排序前的完整 payload 計數，同 digest.py
+        if store.update(date, trends.count_terms(entries)):
+            bursts[date] = store.bursts(date)
+    if bursts:
+        try:
+            store.save(path)
+        except OSError as exc:
+            LOGGER.warning(f"無法寫入趨勢統計 {path}：{exc}")
+    return bursts
+
+
+def run(
+    dates: List[str],
+    workers: int,
+    top_k: int | None,
+    config_path: pathlib.Path,
+    force: bool = False,
+    verbose: bool = False,
+    template: pathlib.Path | None = None,
+    template_engine: str = "builtin",
+) -> Dict[str, int]:
+    """Render stale days in parallel; returns counts of rendered/skipped/missing/failed days."""
+    ranking_config = digest.load_ranking_config(config_path) if top_k is not None else None
+    fingerprint = f"{rollup.config_fingerprint(ranking_config)}:{top_k}" if ranking_config else ""
+    if template is not None:
+        fingerprint += f"|{template_engine}:{input_digest(template)}"
+    state = load_state(STATE_PATH)
+    todo, missing = plan(dates, state, fingerprint, force)
+    skipped = len(dates) - missing - len(todo)
+    LOGGER.info(f"待重建 {len(todo)} 天，略過未變動 {skipped} 天，缺少原始資料 {missing} 天")
+
+    failed = 0
+    if todo:
+        bursts = fold_trends(todo)
+        workers = max(1, min(workers, len(todo)))
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(ranking_config, verbose, template, template_engine),
+        ) as pool:
+            futures = {
+                pool.submit(
+                    render_day, date, input_path, output_path, top_k, bursts.get(date)
+                ): (date, record)
+                for date, input_path, output_path, record in todo
+            }
+            for future in concurrent.futures.as_completed(futures):
+                date, record = futures[future]
+                try:
+                    _date, count = future.result()
+                except (Exception, SystemExit) as exc:  # noqa: BLE001 - 單日失敗不影響其他日期
+                    failed += 1
+                    LOGGER.error(f"{date} 重建失敗：{exc!r}")
+                    continue
+                state[date] = record
+                LOGGER.info(f"{date} 重建完成（{count} 筆）")
+        save_state(STATE_PATH, state)
+
+    return {"rendered": len(todo) - failed, "skipped": skipped, "missing": missing, "failed": failed}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="平行重建日期區間內的 digest")
+    parser.add_argument(
+        "--range",
+        type=str,
+        required=True,
+        help="日期區間 START..END（含首尾）",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker 行程數（預設：CPU 核心數）",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=digest.non_negative_int,
+        help="同 digest.py --top-k",
+    )
+    parser.add_argument(
+        "--config",
+        type=pathlib.Path,
+        default=digest.FEEDS_PATH,
+        help="讀取 ranking 權重的設定檔（預設：ops/feeds.yml）",
+    )
+    parser.add_argument(
+        "--template",
+        type=pathlib.Path,
+        help="同 digest.py --template",
+    )
+    parser.add_argument(
+        "--template-engine",
+        choices=templating.ENGINES,
+        default="builtin",
+        help="同 digest.py --template-engine",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="忽略快取狀態，全部重建",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="顯示 DEBUG 級別日誌",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    digest.setup_logging(verbose=args.verbose)
+    try:
+        dates = rollup.parse_range(args.range)
+    except ValueError as exc:
+        LOGGER.error(f"日期區間錯誤：{exc}")
+        sys.exit(1)
+
+    if args.template is not None:
+        try:
+            templating.load_template(args.template, args.template_engine)
+        except (OSError, templating.TemplateError) as exc:
+            LOGGER.error(f"模板載入失敗：{exc}")
+            sys.exit(1)
+
+    result = run(
+        dates,
+        args.workers,
+        args.top_k,
+        args.config,
+        args.force,
+        args.verbose,
+        args.template,
+        args.template_engine,
+    )
+    if result["rendered"] + result["skipped"] == 0 and not result["failed"]:
+        LOGGER.error("區間內沒有任何原始資料")
+        sys.exit(2)
+    if result["failed"]:
+        sys.exit(3)
+    LOGGER.info("backfill 執行完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""HTTP cassette：``--record DIR`` 把每個來源的原始回應存檔，``--replay DIR`` 從檔案重播。
+
+每個來源兩個檔案：``<source_key>.json``（method、URL、status、回應 headers、錄製時間）與
+``<source_key>.body``（原始 bytes，不經編碼轉換）。請求 headers 不會寫入，
+Product Hunt token 等憑證不會留在 cassette 中。重播時完全不連網，可重現解析結果並單獨量測
+``feedparser.parse`` 與正規化的成本。
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import pathlib
+import re
+from typing import Any, Dict, Tuple
+
+from lazyimport import LazyModule
+
+requests = LazyModule("requests", "請先安裝 requests：pip install requests")
+
+CASSETTE_VERSION = 1
+MODES = ("record", "replay")
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+class CassetteMissing(LookupError):
+    """重播時找不到來源的 cassette（或格式不符）。"""
+
+
+class CassetteResponse:
+    """重播用的回應，只提供 collector 會用到的 ``requests.Response`` 介面。"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error (replayed) for url: {self.url}")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+def _stem(source_key: str) -> str:
+    return _UNSAFE.sub("_", source_key) or "_"
+
+
+class Cassette:
+    def __init__(self, directory: pathlib.Path, mode: str) -> None:
+        if mode not in MODES:
+            raise ValueError(f"不支援的 cassette 模式：{mode}")
+        self.directory = directory
+        self.mode = mode
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def paths(self, source_key: str) -> Tuple[pathlib.Path, pathlib.Path]:
+        stem = _stem(source_key)
+        return self.directory / f"{stem}.json", self.directory / f"{stem}.body"
+
+    def save(self, source_key: str, method: str, url: str, response: Any) -> None:
+        """Store ``response`` for ``source_key``; the body is written before its metadata."""
+        meta_path, body_path = self.paths(source_key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        document = {
+            "version": CASSETTE_VERSION,
+            "source_key": source_key,
+            "method": method,
+            "url": url,
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "recorded_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+        }
+        for path, data in (
+            (body_path, response.content),
+            (meta_path, json.dumps(document, ensure_ascii=False, indent=2).encode("utf-8")),
+        ):
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+    def load(self, source_key: str) -> Tuple[Dict[str, Any], CassetteResponse]:
+        """Recorded metadata and response; raises CassetteMissing when nothing usable is on disk."""
+        meta_path, body_path = self.paths(source_key)
+        try:
+            document = json.loads(meta_path.read_text(encoding="utf-8"))
+            content = body_path.read_bytes()
+        except (OSError, ValueError) as exc:
+            raise CassetteMissing(f"{self.directory} 沒有來源 {source_key} 的 cassette") from exc
+        if not isinstance(document, dict) or document.get("version") != CASSETTE_VERSION:
+            raise CassetteMissing(f"{meta_path} 的 cassette 版本不符")
+        response = CassetteResponse(
+            url=str(document.get("url", "")),
+            status_code=int(document.get("status", 200)),
+            headers={str(key): str(value) for key, value in (document.get("headers") or {}).items()},
+            content=content,
+        )
+        return document, response
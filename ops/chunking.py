@@ -0,0 +1,164 @@
+"""依位元組上限把 Markdown digest 切成多個部分（GitHub issue 等平台的內文長度限制）。
+
+每筆 entry 只 render 與量測一次並累加大小，不會反覆量測整份字串；
+優先在來源（### 標題）邊界切分，單一來源放不下時才退回以 entry 為單位。
+"""
+from __future__ import annotations
+
+import io
+import pathlib
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import renderers
+
+# GitHub issue body 上限為 65536 字元，預留一點空間給模板與標記
+DEFAULT_MAX_BYTES = 60000
+
+
+def _size(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+@dataclass
+class Part:
+    number: int
+    text: str
+    size: int
+    entries: int
+    categories: List[str] = field(default_factory=list)
+
+
+class _Packer:
+    def __init__(self, model: renderers.DigestModel, max_bytes: int) -> None:
+        self.model = model
+        self.max_bytes = max_bytes
+        buffer = io.StringIO()
+        renderers.MarkdownRenderer.write_footer(model, buffer)
+        self.footer = buffer.getvalue()
+        self.footer_size = _size(self.footer)
+        self.parts: List[Part] = []
+        self._start()
+
+    def _heading(self, number: int) -> str:
+        buffer = io.StringIO()
+        if number == 1:
+            renderers.MarkdownRenderer.write_header(self.model, buffer, f"（第 {number} 部分）")
+        else:
+            buffer.write(f"# 技術資訊摘要 - {self.model.date}（第 {number} 部分）\n\n")
+        return buffer.getvalue()
+
+    def _start(self) -> None:
+        heading = self._heading(len(self.parts) + 1)
+        self.chunks: List[str] = [heading]
+        self.size = _size(heading)
+        self.category: str | None = None
+        self.source: str | None = None
+        self.categories: List[str] = []
+        self.entries = 0
+
+    def _remaining(self) -> int:
+        return self.max_bytes - self.size - self.footer_size
+
+    def _fresh_capacity(self) -> int:
+        return self.max_bytes - _size(self._heading(len(self.parts) + 2)) - self.footer_size
+
+    def _prefix(self, category: str, source: str) -> str:
+        prefix = ""
+        if category != self.category:
+            prefix += f"## {category}\n\n"
+        if category != self.category or source != self.source:
+            prefix += f"### {source}\n\n"
+        return prefix
+
+    def flush(self) -> None:
+        self.chunks.append(self.footer)
+        self.parts.append(
+            Part(
+                number=len(self.parts) + 1,
+                text="".join(self.chunks),
+                size=self.size + self.footer_size,
+                entries=self.entries,
+                categories=self.categories,
+            )
+        )
+        self._start()
+
+    def add_source(self, category: str, source: str, items: List[Tuple[str, int]]) -> None:
+        group_size = _size(f"## {category}\n\n### {source}\n\n") + sum(size for _, size in items)
+        # 整個來源在新的部分放得下時，就不在來源中間切開
+        if self.entries and group_size > self._remaining() and group_size <= self._fresh_capacity():
+            self.flush()
+        for text, size in items:
+            prefix = self._prefix(category, source)
+            needed = _size(prefix) + size
+            if self.entries and needed > self._remaining():
+                self.flush()
+                prefix = self._prefix(category, source)
+                needed = _size(prefix) + size
+            self.chunks.append(prefix)
+            self.chunks.append(text)
+            self.size += needed
+            if category not in self.categories:
+                self.categories.append(category)
+            self.category, self.source = category, source
+            self.entries += 1
+
+    def finish(self) -> List[Part]:
+        if self.entries or not self.parts:
+            self.flush()
+        return self.parts
+
+
+def chunk_markdown(model: renderers.DigestModel, max_bytes: int) -> List[Part]:
+    """Split the built-in Markdown layout into parts of at most ``max_bytes`` (UTF-8).
+
+    單筆 entry 本身超過上限時會獨佔一個部分，該部分的 ``size`` 會大於上限。
+    """
+    if max_bytes <= 0:
+        raise ValueError("max_bytes 必須大於 0")
+    packer = _Packer(model, max_bytes)
+    for category in model.categories:
+        for source in category.sources:
+            items = []
+            for item in source.entries:
+                buffer = io.StringIO()
+                renderers.write_entry(item, source.name, buffer)
+                text = buffer.getvalue()
+                items.append((text, _size(text)))
+            packer.add_source(category.name, source.name, items)
+    return packer.finish()
+
+
+def part_path(base_path: pathlib.Path, number: int) -> pathlib.Path:
+    """``digest-2025-12-22.md`` -> ``digest-2025-12-22-part01.md``."""
+    return base_path.with_name(f"{base_path.stem}-part{number:02d}{base_path.suffix}")
+
+
+def index_path(base_path: pathlib.Path) -> pathlib.Path:
+    return base_path.with_name(f"{base_path.stem}-index{base_path.suffix}")
+
+
+def stale_parts(base_path: pathlib.Path, count: int) -> List[pathlib.Path]:
+    """Part files left over from an earlier run that produced more parts."""
+    current = {part_path(base_path, number).name for number in range(1, count + 1)}
+    pattern = f"{base_path.stem}-part*{base_path.suffix}"
+    return sorted(path for path in base_path.parent.glob(pattern) if path.name not in current)
+
+
+def render_index(
+    parts: List[Part], date: str, max_bytes: int, base_path: pathlib.Path
+) -> str:
+    lines = [
+        f"# 技術資訊摘要 - {date} 分段索引",
+        "",
+        f"共 {len(parts)} 部分（每部分上限 {max_bytes} bytes）",
+        "",
+        "| 部分 | 檔案 | 大小 (bytes) | 筆數 | 分類 |",
+        "| --- | --- | --- | --- | --- |",
+    ]
+    for part in parts:
+        name = part_path(base_path, part.number).name
+        categories = ", ".join(part.categories) or "-"
+        lines.append(f"| {part.number} | [{name}]({name}) | {part.size} | {part.entries} | {categories} |")
+    return "\n".join(lines) + "\n"
@@ -3,32 +3,43 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+import html
 import json
 import logging
 import os
 import pathlib
+import sqlite3
 import sys
 import time
 from collections import Counter
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence, Tuple
 
-try:
-    import feedparser  # type: ignore
-except ImportError as exc:
-    raise SystemExit("請先安裝 feedparser：pip install feedparser") from exc
+import analytics
+import cassette
+import configcache
+import cutoffs
+import enrich
+import filters
+import htmltext
+import logutil
+import metrics
+import models
+import parsecache
+import profiles
+import ranking
+import search
+import sharding
+import timeutil
+from lazyimport import LazyModule
 
-try:
-    import requests
-except ImportError as exc:
-    raise SystemExit("請先安裝 requests：pip install requests") from exc
-
-try:
-    import yaml
-except ImportError as exc:
-    raise SystemExit("請先安裝 PyYAML：pip install pyyaml") from exc
+# 第三方套件延遲到實際抓取/讀設定時才 import，--help 與 --check-config 不需付出成本
+feedparser = LazyModule("feedparser", "請先安裝 feedparser：pip install feedparser")
+requests = LazyModule("requests", "請先安裝 requests：pip install requests")
+yaml = LazyModule("yaml", "請先安裝 PyYAML：pip install pyyaml")
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 FEEDS_PATH = ROOT / "ops" / "feeds.yml"
+CACHE_DIR = ROOT / "cache"
 OUT_DIR = ROOT / "out"
 LOGS_DIR = ROOT / "logs"
 REQUEST_TIMEOUT = 30
@@ -40,132 +51,330 @@ SUPPORTED_TYPES = {"rss", "atom", "producthunt"}
 PRODUCTHUNT_API_URL = "https://api.producthunt.com/v2/api/graphql"
 PRODUCTHUNT_TOKEN_ENV = "PRODUCTHUNT_TOKEN"
 PRODUCTHUNT_TOPICS_LIMIT = 5
+CONFIG_CACHE = configcache.ConfigCache(CACHE_DIR / "config")
+WATERMARKS_PATH = CACHE_DIR / "watermarks.json"
+ENRICH_CACHE_PATH = CACHE_DIR / "enrich.json"
+PARSE_CACHE_PATH = CACHE_DIR / "parsed.json"
+# 每次抓取的嘗試次數與回應大小，供 metrics 輸出（key 為 source_key）
+FETCH_STATS: Dict[str, Dict[str, int]] = {}
+# 本次執行各來源的截止時間（UTC epoch），早於此時間的 entry 在解析時丟棄
+CUTOFFS: Dict[str, float] = {}
+# 多個來源共用的 RSS/Atom URL（例如不同團隊各自設定同一 feed）本次執行只下載一次；
+# key 由 main() 預先登記，值在第一次下載後填入
+SHARED_BODIES: Dict[str, bytes | None] = {}
+# RSS/Atom 解析結果快取，main() 載入；None 表示每次都解析
+PARSE_CACHE: parsecache.ParseCache | None = None
+# --record/--replay 時的 HTTP cassette；None 表示直接連網
+CASSETTE: cassette.Cassette | None = None
+# 摘要清理設定，main() 依 feeds.yml 的 summary 區塊更新
+SUMMARY_CONFIG = htmltext.SummaryConfig()
 
 
-def setup_logging(verbose: bool = False, log_file: pathlib.Path | None = None) -> None:
-    """Configure console/file logging similar to digest."""
-    level = logging.DEBUG if verbose else logging.INFO
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    console_handler.setFormatter(
-        logging.Formatter("%(asctime)s | %(levelname)s | %(message)s", datefmt="%H:%M:%S")
-    )
-
-    handlers = [console_handler]
-    if log_file:
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(
-            logging.Formatter(
-                "%(asctime)s | %(levelname)s | %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-            )
-        )
-        handlers.append(file_handler)
-
-    logging.basicConfig(level=level, handlers=handlers)
+def setup_logging(
+    verbose: bool = False, log_file: pathlib.Path | None = None, json_lines: bool = False
+) -> None:
+    """Configure queued console/file logging similar to digest."""
+    logutil.setup_logging(verbose=verbose, log_file=log_file, json_lines=json_lines)
 
 
-def load_config(path: pathlib.Path) -> Dict[str, Any]:
-    """Load feeds.yml and ensure mandatory fields are present."""
-    if not path.exists():
-        LOGGER.error(f"設定檔不存在：{path}")
-        sys.exit(1)
+def normalize_source(source: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill optional fields so downstream code can skip .get() defaults."""
+    normalized = dict(source)
+    normalized.setdefault("enabled", True)
+    normalized["tags"] = list(normalized.get("tags") or [])
+    return normalized
 
-    try:
-        with path.open("r", encoding="utf-8") as fh:
-            config = yaml.safe_load(fh)
-    except yaml.YAMLError as exc:
-        LOGGER.error(f"YAML 格式錯誤：{exc}")
-        sys.exit(1)
 
-    if not config or "sources" not in config:
+def compile_config(
+    config: Any, previous: Dict[str, Dict[str, Any]] | None = None
+) -> Dict[str, Any]:
+    """Validate and normalize parsed YAML; sources identical to ``previous`` skip checks."""
+    if not isinstance(config, dict) or "sources" not in config:
         LOGGER.error("設定檔缺少 'sources' 欄位")
         sys.exit(1)
 
+    previous = previous or {}
     seen_keys: set[str] = set()
-    for idx, source in enumerate(config["sources"]):
-        missing = [
-            field
-            for field in ("key", "name", "url", "type", "category")
-            if field not in source
-        ]
-        if missing:
-            LOGGER.error(f"來源 #{idx} 缺少必要欄位：{', '.join(missing)}")
-            sys.exit(1)
-        if source["type"] not in SUPPORTED_TYPES:
-            LOGGER.error(
-                f"來源 '{source['name']}' 的 type 必須是 {', '.join(sorted(SUPPORTED_TYPES))} 之一"
-            )
+    sources: List[Dict[str, Any]] = []
+    for idx, source in enumerate(config["sources"] or []):
+        if not isinstance(source, dict):
+            LOGGER.error(f"來源 #{idx} 格式錯誤（預期為物件）")
             sys.exit(1)
+        normalized = normalize_source(source)
+        if previous.get(normalized.get("key", "")) != normalized:
+            missing = [
+                field
+                for field in ("key", "name", "url", "type", "category")
+                if field not in source
+            ]
+            if missing:
+                LOGGER.error(f"來源 #{idx} 缺少必要欄位：{', '.join(missing)}")
+                sys.exit(1)
+            if source["type"] not in SUPPORTED_TYPES:
+                LOGGER.error(
+                    f"來源 '{source['name']}' 的 type 必須是 {', '.join(sorted(SUPPORTED_TYPES))} 之一"
+                )
+                sys.exit(1)
         if source["key"] in seen_keys:
             LOGGER.error(f"來源 key '{source['key']}' 重複")
             sys.exit(1)
         seen_keys.add(source["key"])
+        sources.append(normalized)
+
+    compiled = {**config, "sources": sources}
+    # 新增或修改下列驗證時須遞增 configcache.COMPILER_VERSION，否則磁碟快取會略過新驗證
+    try:
+        ranking.RankingConfig.from_config(compiled)
+    except ValueError as exc:
+        LOGGER.error(f"ranking 設定錯誤：{exc}")
+        sys.exit(1)
+    try:
+        filters.parse_rules(compiled)
+    except ValueError as exc:
+        LOGGER.error(f"filters 設定錯誤：{exc}")
+        sys.exit(1)
+    try:
+        cutoffs.validate_config(compiled)
+    except ValueError as exc:
+        LOGGER.error(f"max_age 設定錯誤：{exc}")
+        sys.exit(1)
+    try:
+        htmltext.SummaryConfig.from_config(compiled)
+    except ValueError as exc:
+        LOGGER.error(f"summary 設定錯誤：{exc}")
+        sys.exit(1)
+    try:
+        enrich.EnrichConfig.from_config(compiled)
+    except ValueError as exc:
+        LOGGER.error(f"enrich 設定錯誤：{exc}")
+        sys.exit(1)
+    try:
+        profiles.parse_profiles(compiled)
+    except ValueError as exc:
+        LOGGER.error(f"profiles 設定錯誤：{exc}")
+        sys.exit(1)
+    return compiled
+
+
+def configure_summary(config: Dict[str, Any]) -> None:
+    """Set SUMMARY_CONFIG from the ``summary`` block; exits 1 when it is malformed."""
+    global SUMMARY_CONFIG
+    try:
+        SUMMARY_CONFIG = htmltext.SummaryConfig.from_config(config)
+    except ValueError as exc:
+        LOGGER.error(f"summary 設定錯誤：{exc}")
+        sys.exit(1)
+
+
+def reload_config(path: pathlib.Path) -> Tuple[Dict[str, Any], configcache.ConfigDiff]:
+    """Load feeds.yml through CONFIG_CACHE and report which sources changed.
+
+    mtime/size 未變時直接回傳上次結果；內容雜湊命中磁碟快取時略過 YAML 解析與驗證；
+    否則只重新驗證與上次編譯結果不同的來源。
+    """
+    if not path.exists():
+        LOGGER.error(f"設定檔不存在：{path}")
+        sys.exit(1)
+
+    stat = path.stat()
+    fresh = CONFIG_CACHE.fresh(path, stat)
+    if fresh is not None:
+        return fresh.config, configcache.ConfigDiff()
+
+    previous = CONFIG_CACHE.current(path)
+    data = path.read_bytes()
+    digest = configcache.file_digest(data)
+    config = CONFIG_CACHE.lookup(digest)
+    if config is None:
+        try:
+            parsed = configcache.parse_yaml(data)
+        except yaml.YAMLError as exc:
+            LOGGER.error(f"YAML 格式錯誤：{exc}")
+            sys.exit(1)
+        config = compile_config(parsed, previous.sources_by_key if previous else None)
+
+    compiled = configcache.CompiledConfig(digest, stat.st_mtime_ns, stat.st_size, config)
+    CONFIG_CACHE.store(path, compiled)
+    diff = configcache.diff_sources(
+        previous.sources_by_key if previous else {}, compiled.sources_by_key
+    )
+    if previous is not None and diff:
+        LOGGER.info(
+            f"設定變更：新增 {len(diff.added)}、移除 {len(diff.removed)}、修改 {len(diff.changed)}"
+        )
+    return config, diff
+
 
+def load_config(path: pathlib.Path) -> Dict[str, Any]:
+    """Load feeds.yml and ensure mandatory fields are present."""
+    config, _diff = reload_config(path)
     LOGGER.info(f"載入設定：{path}")
     return config
 
 
-def fetch_rss_or_atom(source: Dict[str, Any]) -> List[Dict[str, Any]]:
+def http_request(source_key: str, method: str, url: str, **kwargs: Any) -> Any:
+    """The fetch layer: a live request, recorded with --record or served from disk with --replay."""
+    if CASSETTE is not None and CASSETTE.replaying:
+        document, response = CASSETTE.load(source_key)
+        if document.get("url") != url:
+            LOGGER.warning(
+                f"cassette 的 URL 與目前設定不同：{document.get('url')}",
+                extra={"source_key": source_key},
+            )
+        return response
+    send = requests.post if method == "POST" else requests.get
+    response = send(url, **kwargs)
+    if CASSETTE is not None:
+        # 錯誤狀態也錄下來，重播時才能重現相同的失敗
+        try:
+            CASSETTE.save(source_key, method, url, response)
+        except OSError as exc:
+            LOGGER.warning(f"寫入 cassette 失敗：{exc}", extra={"source_key": source_key})
+    return response
+
+
+def is_too_old(source_key: str, published_epoch: int | None) -> bool:
+    """True when the entry predates this run's cutoff; undated entries are always kept."""
+    cutoff = CUTOFFS.get(source_key)
+    return cutoff is not None and published_epoch is not None and published_epoch < cutoff
+
+
+def record_too_old(source_key: str, name: str, count: int) -> None:
+    FETCH_STATS[source_key]["too_old"] = count
+    if count:
+        LOGGER.info(
+            f"{name} 略過 {count} 筆早於 {cutoffs.describe(CUTOFFS[source_key])} 的資料",
+            extra={"source_key": source_key},
+        )
+
+
+def select_feed_items(
+    body: bytes, source_key: str, name: str, limit: int, log_extra: Dict[str, Any]
+) -> Tuple[List[parsecache.Item], int]:
+    """Finished items kept under ``limit`` and the cutoff, plus the too-old count.
+
+    截止時間在 limit 之前套用：舊文章不佔名額；時間只正規化到 limit 額滿為止，
+    摘要只清理實際收錄的項目。body 未變更且快取的前綴足以涵蓋時直接取用 PARSE_CACHE。
+    """
+    def too_old(epoch: int | None) -> bool:
+        return is_too_old(source_key, epoch)
+
+    key = ""
+    if PARSE_CACHE is not None:
+        key = parsecache.cache_key(body, SUMMARY_CONFIG)
+        selected = PARSE_CACHE.select(key, limit, too_old)
+        if selected is not None:
+            LOGGER.debug(f"{name} 內容與先前相同，略過解析", extra=log_extra)
+            return selected
+
+    feed = feedparser.parse(body)
+    if feed.bozo:
+        LOGGER.warning(f"{name} 解析時出現警告：{feed.bozo_exception}", extra=log_extra)
+    scanned = parsecache.Feed(total=len(feed.entries))
+    kept: List[parsecache.Item] = []
+    for entry in feed.entries:
+        if len(kept) >= limit:
+            break
+        published_at, published_epoch = timeutil.feed_entry_time(entry)
+        item = parsecache.Item(
+            title=entry.get("title", models.DEFAULT_TITLE),
+            url=entry.get("link", ""),
+            published_at=published_at,
+            published_epoch=published_epoch,
+        )
+        scanned.items.append(item)
+        if too_old(published_epoch):
+            continue
+        item.summary, item.summary_full = htmltext.clean_summary(
+            entry.get("summary", entry.get("description", "")), SUMMARY_CONFIG
+        )
+        kept.append(item)
+    if PARSE_CACHE is not None:
+        PARSE_CACHE.put(key, scanned)
+    return kept, len(scanned.items) - len(kept)
+
+
+def fetch_rss_or_atom(source: Dict[str, Any]) -> List[models.Entry]:
     """Fetch standard RSS/Atom feeds with retries."""
     name = source["name"]
     url = source["url"]
     limit = int(source.get("limit", MAX_ENTRIES_PER_SOURCE))
-    LOGGER.info(f"抓取來源：{name}")
+    source_key = source.get("key", name)
+    LOGGER.info(f"抓取來源：{name}", extra={"source_key": source_key})
+    started = time.perf_counter()
 
     for attempt in range(1, MAX_RETRIES + 1):
+        log_extra = {"source_key": source_key, "attempt": attempt}
         try:
-            response = requests.get(url, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-
-            feed = feedparser.parse(response.content)
-            if feed.bozo:
-                LOGGER.warning(f"{name} 解析時出現警告：{feed.bozo_exception}")
+            FETCH_STATS[source_key] = {"attempts": attempt, "bytes": 0}
+            body = SHARED_BODIES.get(url)
+            if body is None:
+                response = http_request(source_key, "GET", url, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+                body = response.content
+                if url in SHARED_BODIES:
+                    SHARED_BODIES[url] = body
+            else:
+                LOGGER.debug(f"{name} 沿用本次已下載的相同 URL", extra=log_extra)
+            FETCH_STATS[source_key]["bytes"] = len(body)
 
-            entries: List[Dict[str, Any]] = []
-            for entry in feed.entries[:limit]:
-                entries.append(
-                    {
-                        "title": entry.get("title", "無標題"),
-                        "link": entry.get("link", ""),
-                        "summary": entry.get("summary", entry.get("description", "")),
-                        "published": entry.get("published", entry.get("updated", "")),
-                        "source": name,
-                        "source_key": source.get("key", "unknown"),
-                        "tags": source.get("tags", []),
-                        "category": source.get("category", "未分類"),
-                    }
+            items, too_old = select_feed_items(body, source_key, name, limit, log_extra)
+            entries = [
+                models.Entry.create(
+                    source_key=source.get("key", "unknown"),
+                    source=name,
+                    category=source.get("category", models.DEFAULT_CATEGORY),
+                    tags=source.get("tags", ()),
+                    title=item.title,
+                    url=item.url,
+                    summary_raw=item.summary or "",
+                    published_at=item.published_at,
+                    published_epoch=item.published_epoch,
+                    summary_full=item.summary_full,
                 )
+                for item in items
+            ]
 
-            LOGGER.info(f"成功取得 {len(entries)} 筆資料")
+            record_too_old(source_key, name, too_old)
+            latency_ms = round((time.perf_counter() - started) * 1000, 1)
+            LOGGER.info(
+                f"成功取得 {len(entries)} 筆資料", extra={**log_extra, "latency_ms": latency_ms}
+            )
             return entries
         except requests.Timeout:
-            LOGGER.warning(f"{name} Timeout (嘗試 {attempt}/{MAX_RETRIES})")
+            LOGGER.warning(f"{name} Timeout (嘗試 {attempt}/{MAX_RETRIES})", extra=log_extra)
             if attempt < MAX_RETRIES:
                 time.sleep(RETRY_DELAY)
         except requests.RequestException as exc:
-            LOGGER.warning(f"{name} 網路錯誤：{exc} (嘗試 {attempt}/{MAX_RETRIES})")
+            LOGGER.warning(
+                f"{name} 網路錯誤：{exc} (嘗試 {attempt}/{MAX_RETRIES})", extra=log_extra
+            )
             if attempt < MAX_RETRIES:
                 time.sleep(RETRY_DELAY)
+        except cassette.CassetteMissing as exc:
+            LOGGER.error(str(exc), extra=log_extra)
+            break
         except Exception as exc:  # pylint: disable=broad-except
-            LOGGER.error(f"{name} 未預期錯誤：{exc}")
+            LOGGER.error(f"{name} 未預期錯誤：{exc}", extra=log_extra)
             break
 
-    LOGGER.warning(f"{name} 所有嘗試均失敗，跳過")
+    LOGGER.warning(f"{name} 所有嘗試均失敗，跳過", extra={"source_key": source_key})
     return []
 
 
-def fetch_producthunt(source: Dict[str, Any]) -> List[Dict[str, Any]]:
+def fetch_producthunt(source: Dict[str, Any]) -> List[models.Entry]:
     """Fetch Product Hunt posts via GraphQL API."""
     name = source["name"]
     token = os.getenv(PRODUCTHUNT_TOKEN_ENV)
-    if not token:
+    # 重播不連網，不需要 token
+    if not token and not (CASSETTE is not None and CASSETTE.replaying):
         LOGGER.error(f"{name} 需要環境變數 {PRODUCTHUNT_TOKEN_ENV}，已跳過")
         return []
 
     limit = int(source.get("limit", 20))
-    LOGGER.info(f"抓取來源：{name} (Product Hunt GraphQL)")
+    source_key = source.get("key", name)
+    LOGGER.info(f"抓取來源：{name} (Product Hunt GraphQL)", extra={"source_key": source_key})
+    started = time.perf_counter()
     query = (
         "query ProductHuntDaily($first: Int!) {"
         " posts(first: $first, order: RANKING) {"
@@ -192,62 +401,88 @@ def fetch_producthunt(source: Dict[str, Any]) -> List[Dict[str, Any]]:
     payload = {"query": query, "variables": {"first": limit}}
 
     for attempt in range(1, MAX_RETRIES + 1):
+        log_extra = {"source_key": source_key, "attempt": attempt}
         try:
-            response = requests.post(
-                PRODUCTHUNT_API_URL, json=payload, headers=headers, timeout=REQUEST_TIMEOUT
+            FETCH_STATS[source_key] = {"attempts": attempt, "bytes": 0}
+            response = http_request(
+                source_key,
+                "POST",
+                PRODUCTHUNT_API_URL,
+                json=payload,
+                headers=headers,
+                timeout=REQUEST_TIMEOUT,
             )
             response.raise_for_status()
+            FETCH_STATS[source_key]["bytes"] = len(response.content)
             data = response.json()
 
             posts = data.get("data", {}).get("posts", {})
             edges = posts.get("edges", [])
-            entries: List[Dict[str, Any]] = []
+            entries: List[models.Entry] = []
+            too_old = 0
             for edge in edges:
                 node = edge.get("node", {})
                 if not node:
                     continue
+                published_at, published_epoch = timeutil.normalize(node.get("createdAt", ""))
+                if is_too_old(source_key, published_epoch):
+                    too_old += 1
+                    continue
                 summary_parts = [node.get("tagline", "").strip()]
                 description = node.get("description", "").strip()
                 if description:
                     summary_parts.append(description)
-                summary = "\n\n".join(part for part in summary_parts if part)
+                # 純文字欄位包成段落，清理後仍以空行分隔 tagline 與 description
+                markup = "".join(f"<p>{html.escape(part)}</p>" for part in summary_parts if part)
+                summary, summary_full = htmltext.clean_summary(markup, SUMMARY_CONFIG)
                 topics = [
                     topic_edge.get("node", {}).get("name", "")
                     for topic_edge in node.get("topics", {}).get("edges", [])
                 ]
 
                 entries.append(
-                    {
-                        "title": node.get("name", "無標題"),
-                        "link": node.get("website") or node.get("url", ""),
-                        "summary": summary,
-                        "published": node.get("createdAt", ""),
-                        "source": name,
-                        "source_key": source.get("key", "producthunt"),
-                        "tags": list(dict.fromkeys(source.get("tags", []) + topics)),
-                        "category": source.get("category", "未分類"),
-                    }
+                    models.Entry.create(
+                        source_key=source.get("key", "producthunt"),
+                        source=name,
+                        category=source.get("category", models.DEFAULT_CATEGORY),
+                        tags=dict.fromkeys(list(source.get("tags", [])) + topics),
+                        title=node.get("name", models.DEFAULT_TITLE),
+                        url=node.get("website") or node.get("url", ""),
+                        summary_raw=summary,
+                        published_at=published_at,
+                        published_epoch=published_epoch,
+                        summary_full=summary_full,
+                    )
                 )
 
-            LOGGER.info(f"成功取得 {len(entries)} 筆資料")
+            record_too_old(source_key, name, too_old)
+            latency_ms = round((time.perf_counter() - started) * 1000, 1)
+            LOGGER.info(
+                f"成功取得 {len(entries)} 筆資料", extra={**log_extra, "latency_ms": latency_ms}
+            )
             return entries
         except requests.Timeout:
-            LOGGER.warning(f"{name} Timeout (嘗試 {attempt}/{MAX_RETRIES})")
+            LOGGER.warning(f"{name} Timeout (嘗試 {attempt}/{MAX_RETRIES})", extra=log_extra)
             if attempt < MAX_RETRIES:
                 time.sleep(RETRY_DELAY)
         except (requests.RequestException, ValueError) as exc:
-            LOGGER.warning(f"{name} GraphQL 錯誤：{exc} (嘗試 {attempt}/{MAX_RETRIES})")
+            LOGGER.warning(
+                f"{name} GraphQL 錯誤：{exc} (嘗試 {attempt}/{MAX_RETRIES})", extra=log_extra
+            )
             if attempt < MAX_RETRIES:
                 time.sleep(RETRY_DELAY)
+        except cassette.CassetteMissing as exc:
+            LOGGER.error(str(exc), extra=log_extra)
+            break
         except Exception as exc:  # pylint: disable=broad-except
-            LOGGER.error(f"{name} 未預期錯誤：{exc}")
+            LOGGER.error(f"{name} 未預期錯誤：{exc}", extra=log_extra)
             break
 
-    LOGGER.warning(f"{name} 所有嘗試均失敗，跳過")
+    LOGGER.warning(f"{name} 所有嘗試均失敗，跳過", extra={"source_key": source_key})
     return []
 
 
-def fetch_source(source: Dict[str, Any]) -> List[Dict[str, Any]]:
+def fetch_source(source: Dict[str, Any]) -> List[models.Entry]:
     """Dispatch to the correct fetcher based on source type."""
     source_type = source.get("type")
     if source_type in {"rss", "atom"}:
@@ -258,14 +493,14 @@ def fetch_source(source: Dict[str, Any]) -> List[Dict[str, Any]]:
     return []
 
 
-def merge_entries(all_entries: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+def merge_entries(all_entries: List[List[models.Entry]]) -> List[models.Entry]:
     """Flatten and deduplicate entries by link."""
     flat = [entry for entries in all_entries for entry in entries]
     seen_links: set[str] = set()
-    unique: List[Dict[str, Any]] = []
+    unique: List[models.Entry] = []
 
     for entry in flat:
-        link = entry.get("link", "")
+        link = entry.url
         if not link or link in seen_links:
             continue
         seen_links.add(link)
@@ -275,38 +510,278 @@ def merge_entries(all_entries: List[List[Dict[str, Any]]]) -> List[Dict[str, Any
     return unique
 
 
-def build_payload(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Attach metadata required by downstream digest."""
-    fetched_at = dt.datetime.now(dt.timezone.utc).isoformat()
-    payload: List[Dict[str, Any]] = []
-
+def build_payload(entries: List[models.Entry]) -> List[models.Entry]:
+    """Attach metadata required by downstream digest (in place, no copies)."""
+    fetched_at = sys.intern(dt.datetime.now(dt.timezone.utc).isoformat())
     for entry in entries:
-        payload.append(
-            {
-                "source_key": entry.get("source_key", "unknown"),
-                "source": entry.get("source", "未知來源"),
-                "title": entry.get("title", "無標題"),
-                "url": entry.get("link", ""),
-                "summary_raw": entry.get("summary", ""),
-                "tags": entry.get("tags", []),
-                "category": entry.get("category", "未分類"),
-                "fetched_at": fetched_at,
-                "published_at": entry.get("published", ""),
-            }
-        )
+        entry.fetched_at = fetched_at
+    return entries
 
-    return payload
+
+def apply_filters(
+    entries: List[models.Entry], config: Dict[str, Any]
+) -> Tuple[List[models.Entry], Dict[str, Dict[str, int]]]:
+    """Apply feeds.yml ``filters`` rules; returns kept entries and per-rule hit counts."""
+    engine = filters.FilterEngine.from_config(config)
+    if not engine:
+        return entries, {}
+    kept, hits = engine.apply(entries)
+    LOGGER.info(f"關鍵字過濾：保留 {len(kept)} 筆，排除 {len(entries) - len(kept)} 筆")
+    return kept, hits
 
 
 def write_payload(document: Dict[str, Any], path: pathlib.Path) -> None:
-    """Persist payload與品質指標為 UTF-8 JSON。"""
+    """Persist payload與品質指標為 UTF-8 JSON；Entry 於此才轉為 dict。"""
     path.parent.mkdir(parents=True, exist_ok=True)
-    text = json.dumps(document, ensure_ascii=False, indent=2)
+    text = json.dumps(document, ensure_ascii=False, indent=2, default=models.json_default)
     path.write_text(text, encoding="utf-8")
     LOGGER.info(f"產出原始資料：{path}")
 
 
-def parse_args() -> argparse.Namespace:
+def enrich_links(entries: List[models.Entry], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill short summaries from linked pages (--enrich); returns stats for meta."""
+    try:
+        settings = enrich.EnrichConfig.from_config(config)
+    except ValueError as exc:
+        LOGGER.error(f"enrich 設定錯誤：{exc}")
+        sys.exit(1)
+    cache = enrich.LinkCache.load(ENRICH_CACHE_PATH)
+    stats = enrich.enrich_entries(entries, settings, cache, SUMMARY_CONFIG.max_chars)
+    try:
+        cache.save(ENRICH_CACHE_PATH, settings, time.time())
+    except OSError as exc:
+        LOGGER.warning(f"寫入連結快取失敗：{exc}")
+    LOGGER.info(
+        f"連結補充：候選 {stats.candidates}、快取命中 {stats.cache_hits}、抓取 {stats.fetched}、"
+        f"失敗 {stats.failed}、略過 {stats.skipped}，補上 {stats.enriched} 筆摘要"
+        f"（{stats.seconds:.2f}s）"
+    )
+    return stats.to_meta()
+
+
+def update_search_index(path: pathlib.Path, date: str) -> None:
+    """Index the payload just written; the search index is best effort and only warns."""
+    try:
+        started = time.perf_counter()
+        count = search.index_file(path, date)
+    except (OSError, ValueError, sqlite3.Error) as exc:
+        LOGGER.warning(f"更新搜尋索引失敗：{exc}")
+        return
+    if count is not None:
+        LOGGER.info(f"更新搜尋索引：{count} 筆（{time.perf_counter() - started:.2f}s）")
+
+
+def export_analytics(
+    analytics_dir: pathlib.Path | None, date: str, document: Dict[str, Any]
+) -> None:
+    """Append this run to the Parquet dataset when --analytics-dir is given; failures only warn."""
+    if analytics_dir is None:
+        return
+    try:
+        path = analytics.export_run(analytics_dir, date, document["entries"], document["meta"])
+    except (OSError, analytics.pa.ArrowException) as exc:
+        LOGGER.warning(f"匯出 Parquet 失敗：{exc}")
+        return
+    LOGGER.info(f"匯出 Parquet：{path.parent}")
+
+
+def plan_shared_fetches(sources: List[Dict[str, Any]]) -> None:
+    """Register RSS/Atom URLs configured by more than one source so each is downloaded once."""
+    SHARED_BODIES.clear()
+    counts = Counter(source.get("url") for source in sources if source.get("type") in {"rss", "atom"})
+    shared = [url for url, count in counts.items() if url and count > 1]
+    SHARED_BODIES.update(dict.fromkeys(shared))
+    if shared:
+        LOGGER.info(f"{len(shared)} 個 URL 由多個來源共用，每個只下載一次")
+
+
+def configure_cassette(record: pathlib.Path | None, replay: pathlib.Path | None) -> None:
+    global CASSETTE
+    CASSETTE = None
+    if record is not None:
+        CASSETTE = cassette.Cassette(record, "record")
+        LOGGER.info(f"錄製 HTTP 回應至 {record}")
+    elif replay is not None:
+        if not replay.is_dir():
+            LOGGER.error(f"找不到 cassette 目錄：{replay}")
+            sys.exit(1)
+        CASSETTE = cassette.Cassette(replay, "replay")
+        LOGGER.info(f"重播 {replay} 的 HTTP 回應（不連網）")
+
+
+def load_parse_cache(enabled: bool) -> None:
+    global PARSE_CACHE
+    PARSE_CACHE = parsecache.ParseCache.load(PARSE_CACHE_PATH) if enabled else None
+
+
+def save_parse_cache() -> None:
+    if PARSE_CACHE is None:
+        return
+    try:
+        PARSE_CACHE.save(PARSE_CACHE_PATH)
+    except OSError as exc:
+        LOGGER.warning(f"寫入解析快取失敗：{exc}")
+
+
+def parse_shard_arg(value: str | None) -> Tuple[int, int] | None:
+    if value is None:
+        return None
+    try:
+        return sharding.parse_shard(value)
+    except ValueError as exc:
+        LOGGER.error(str(exc))
+        sys.exit(1)
+
+
+def merge_shards(args: argparse.Namespace, started: float) -> None:
+    """--merge-shards: combine shard outputs into the date's raw file, then index/export as usual."""
+    paths = args.merge_shards or sharding.find_shards(OUT_DIR, args.date)
+    if not paths:
+        LOGGER.error(f"找不到 {args.date} 的分片輸出：{OUT_DIR / 'shards'}")
+        sys.exit(2)
+    if args.analytics_dir is not None:
+        analytics.require()
+    documents = []
+    for path in paths:
+        try:
+            documents.append(json.loads(pathlib.Path(path).read_text(encoding="utf-8")))
+        except (OSError, ValueError) as exc:
+            LOGGER.error(f"讀取分片失敗：{path}：{exc}")
+            sys.exit(1)
+    try:
+        document = sharding.merge_documents(documents)
+    except ValueError as exc:
+        LOGGER.error(f"合併分片失敗：{exc}")
+        sys.exit(1)
+
+    meta = document["meta"]
+    shards = meta["shards"]
+    if shards["missing"]:
+        missing = ", ".join(f"{index}/{shards['count']}" for index in shards["missing"])
+        LOGGER.warning(f"缺少分片 {missing}，這些分片的來源不在合併結果中")
+    LOGGER.info(
+        f"合併 {len(documents)} 個分片：共 {len(document['entries'])} 筆"
+        f"（跨分片重複 {shards['cross_shard_duplicates']} 筆，去重率 {meta['dedup_rate'] * 100:.2f}%）"
+    )
+    if args.dry_run:
+        LOGGER.info("Dry-run 模式，不寫檔")
+    else:
+        output_path = args.output or OUT_DIR / f"raw-{args.date}.json"
+        try:
+            write_payload(document, output_path)
+        except OSError as exc:
+            LOGGER.error(f"寫入檔案失敗：{exc}")
+            sys.exit(3)
+        update_search_index(output_path, args.date)
+        export_analytics(args.analytics_dir, args.date, document)
+    export_metrics(args.metrics_dir, [], meta, time.perf_counter() - started)
+
+
+def plan_cutoffs(
+    sources: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    since: str | None,
+    marks: cutoffs.Watermarks | None,
+) -> None:
+    """Fill CUTOFFS for this run from --since, max_age and the per-source marks."""
+    now = time.time()
+    since_epoch = None
+    if since:
+        try:
+            since_epoch = cutoffs.parse_since(since, now)
+        except ValueError as exc:
+            LOGGER.error(str(exc))
+            sys.exit(1)
+    CUTOFFS.clear()
+    for source in sources:
+        cutoff = cutoffs.source_cutoff(source, config, now, since_epoch, marks)
+        if cutoff is not None:
+            CUTOFFS[source["key"]] = cutoff
+            LOGGER.debug(
+                f"{source['key']} 截止時間：{cutoffs.describe(cutoff)}",
+                extra={"source_key": source["key"]},
+            )
+
+
+def save_watermarks(marks: cutoffs.Watermarks, collected: List[List[models.Entry]]) -> None:
+    moved = marks.advance(entry for entries in collected for entry in entries)
+    if not moved:
+        return
+    try:
+        marks.save(WATERMARKS_PATH)
+    except OSError as exc:
+        LOGGER.warning(f"寫入 high-water mark 失敗：{exc}")
+        return
+    LOGGER.info(f"更新 {len(moved)} 個來源的 high-water mark")
+
+
+def build_metrics(
+    source_stats: List[Dict[str, Any]], meta: Dict[str, Any], duration: float
+) -> metrics.Registry:
+    """Convert per-source fetch results與 meta 為 Prometheus 指標。"""
+    registry = metrics.Registry()
+    for stat in source_stats:
+        key = stat["key"]
+        registry.observe(
+            "collector_source_fetch_seconds",
+            stat["seconds"],
+            "Fetch latency per source including retries",
+            source=key,
+        )
+        registry.set(
+            "collector_source_bytes", stat["bytes"], "Response body size of the last attempt", source=key
+        )
+        registry.set(
+            "collector_source_entries", stat["entries"], "Entries returned by the source", source=key
+        )
+        registry.set(
+            "collector_source_retries", stat["retries"], "Retries before success or giving up", source=key
+        )
+        registry.set(
+            "collector_source_up", 1 if stat["ok"] else 0, "1 if the source returned entries", source=key
+        )
+
+    for field in (
+        "raw_entries",
+        "unique_entries",
+        "filtered_entries",
+        "too_old_entries",
+        "failed_source_count",
+        "total_sources",
+    ):
+        if field in meta:
+            registry.set(f"collector_{field}", meta[field], f"meta.{field} of the last run")
+    if "dedup_rate" in meta:
+        registry.set("collector_dedup_rate", meta["dedup_rate"], "meta.dedup_rate of the last run")
+    if "parse_cache" in meta:
+        registry.set(
+            "collector_parse_cache_hit_rate",
+            meta["parse_cache"]["hit_rate"],
+            "meta.parse_cache.hit_rate of the last run",
+        )
+    registry.set("collector_run_duration_seconds", duration, "Wall time of the last run")
+    registry.set("collector_last_run_timestamp_seconds", time.time(), "Unix time of the last run")
+    return registry
+
+
+def export_metrics(
+    metrics_dir: pathlib.Path | None,
+    source_stats: List[Dict[str, Any]],
+    meta: Dict[str, Any],
+    duration: float,
+) -> None:
+    """Write collector.prom when --metrics-dir is given; failures only warn."""
+    if metrics_dir is None:
+        return
+    try:
+        metrics.write_textfile(
+            build_metrics(source_stats, meta, duration), metrics_dir / "collector.prom"
+        )
+    except OSError as exc:
+        LOGGER.warning(f"寫入指標檔失敗：{exc}")
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="收集 feeds 並輸出 JSON")
     parser.add_argument(
         "--date",
@@ -324,88 +799,234 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="僅顯示統計資訊，不寫檔",
     )
+    parser.add_argument(
+        "--check-config",
+        action="store_true",
+        help="只驗證 feeds.yml 後結束（不觸網，適合 pre-commit 與健康檢查）",
+    )
     parser.add_argument(
         "--verbose",
         "-v",
         action="store_true",
         help="顯示 DEBUG 級別日誌",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--metrics-dir",
+        type=pathlib.Path,
+        help="輸出 Prometheus textfile（collector.prom）的目錄",
+    )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        help="log 檔改寫為 JSON lines（含 source_key/attempt/latency_ms 欄位）",
+    )
+    parser.add_argument(
+        "--since",
+        help="只收集此時間之後發布的 entry：ISO 日期/時間（UTC）或相對長度如 36h、7d（純數字為小時）",
+    )
+    parser.add_argument(
+        "--since-last-run",
+        action="store_true",
+        help="依 cache/watermarks.json 記錄的各來源最新發布時間，只收集更新的 entry",
+    )
+    parser.add_argument(
+        "--enrich",
+        action="store_true",
+        help="摘要過短的 entry 另抓連結頁面的 OpenGraph/meta description（結果快取於 cache/enrich.json）",
+    )
+    cassettes = parser.add_mutually_exclusive_group()
+    cassettes.add_argument(
+        "--record",
+        type=pathlib.Path,
+        metavar="DIR",
+        help="把每個來源的原始 HTTP 回應（status、headers、body）存到 DIR",
+    )
+    cassettes.add_argument(
+        "--replay",
+        type=pathlib.Path,
+        metavar="DIR",
+        help="不連網，改用 --record 存下的回應重跑解析流程",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="只收集一致性雜湊分配給第 I 個（共 N 個）分片的來源，輸出到 out/shards/",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        nargs="*",
+        type=pathlib.Path,
+        metavar="FILE",
+        help="合併分片輸出為 out/raw-{date}.json（未指定檔案時讀取 out/shards/ 中該日期的分片）",
+    )
+    parser.add_argument(
+        "--analytics-dir",
+        type=pathlib.Path,
+        help="同時把 payload 與 meta 匯出成依日期分割的 Parquet（需安裝 pyarrow）",
+    )
+    return parser.parse_args(argv)
 
 
 def main() -> None:
+    started = time.perf_counter()
     args = parse_args()
+    if args.check_config:
+        # 快速路徑：只驗證設定，不載入 feedparser/requests，也不建立 log 檔
+        setup_logging(verbose=args.verbose)
+        config = load_config(FEEDS_PATH)
+        enabled = sum(1 for source in config["sources"] if source.get("enabled", True))
+        LOGGER.info(f"設定檢查通過：共 {len(config['sources'])} 個來源（啟用 {enabled}）")
+        return
+
     log_file = LOGS_DIR / f"collector-{args.date}.log" if not args.dry_run else None
-    setup_logging(verbose=args.verbose, log_file=log_file)
+    setup_logging(verbose=args.verbose, log_file=log_file, json_lines=args.log_json)
 
     LOGGER.info("=" * 50)
     LOGGER.info("開始執行 collector")
     LOGGER.info(f"日期：{args.date}")
     LOGGER.info("=" * 50)
 
+    if args.merge_shards is not None:
+        merge_shards(args, started)
+        LOGGER.info("collector 執行完成")
+        return
+
+    shard = parse_shard_arg(args.shard)
     config = load_config(FEEDS_PATH)
+    if args.analytics_dir is not None:
+        # 缺少 pyarrow 時在抓取前就結束，而不是抓完才失敗
+        analytics.require()
     sources = [s for s in config["sources"] if s.get("enabled", True)]
     if not sources:
         LOGGER.error("沒有啟用的資料來源")
         sys.exit(2)
+    if shard is not None:
+        sources = sharding.select_sources(sources, *shard)
+        LOGGER.info(f"分片 {shard[0]}/{shard[1]}：負責 {len(sources)} 個來源")
+
+    marks = cutoffs.Watermarks.load(WATERMARKS_PATH) if args.since_last_run else None
+    plan_cutoffs(sources, config, args.since, marks)
+    configure_summary(config)
+    plan_shared_fetches(sources)
+    configure_cassette(args.record, args.replay)
+    # 重播時 body 固定不變，停用解析快取才能量到實際的解析成本
+    load_parse_cache(enabled=args.replay is None)
 
-    collected: List[List[Dict[str, Any]]] = []
+    collected: List[List[models.Entry]] = []
     failed_sources: List[Dict[str, str]] = []
+    source_stats: List[Dict[str, Any]] = []
     raw_entries_count = 0
+    too_old_count = 0
+    FETCH_STATS.clear()
 
     for source in sources:
+        key = source.get("key", "unknown")
+        fetch_started = time.perf_counter()
         entries = fetch_source(source)
+        stats = FETCH_STATS.get(key, {})
+        # 全部因截止時間被略過仍算抓取成功，不列入失敗來源
+        too_old = stats.get("too_old", 0)
+        too_old_count += too_old
+        ok = bool(entries) or too_old > 0
+        source_stats.append(
+            {
+                "key": key,
+                "seconds": time.perf_counter() - fetch_started,
+                "bytes": stats.get("bytes", 0),
+                "entries": len(entries),
+                "retries": max(stats.get("attempts", 1) - 1, 0),
+                "ok": ok,
+            }
+        )
         if entries:
             collected.append(entries)
             raw_entries_count += len(entries)
-        else:
+        if not ok:
             failed_sources.append(
                 {
                     "key": source.get("key", "unknown"),
                     "name": source.get("name", "未知來源"),
                 }
             )
+    if not args.dry_run:
+        save_parse_cache()
 
-    if not collected:
+    if sources and len(failed_sources) == len(sources):
         LOGGER.error("所有來源都失敗")
+        failure_meta = {"total_sources": len(sources), "failed_source_count": len(failed_sources)}
+        export_metrics(args.metrics_dir, source_stats, failure_meta, time.perf_counter() - started)
         sys.exit(2)
 
     merged = merge_entries(collected)
+    enrichment = None
+    if args.enrich and args.replay is not None:
+        LOGGER.warning("重播模式不連網，略過 --enrich")
+    elif args.enrich:
+        enrichment = enrich_links(merged, config)
     payload = build_payload(merged)
     unique_entries = len(payload)
     dedup_rate = 0.0 if raw_entries_count == 0 else (raw_entries_count - unique_entries) / raw_entries_count
-    category_counts = Counter(entry.get("category", "未分類") or "未分類" for entry in payload)
+    payload, filter_hits = apply_filters(payload, config)
+    category_counts = Counter(entry.category for entry in payload)
     meta: Dict[str, Any] = {
         "generated_at": dt.datetime.now(dt.timezone.utc).isoformat(),
         "raw_entries": raw_entries_count,
         "unique_entries": unique_entries,
         "dedup_rate": round(dedup_rate, 4),
+        "filtered_entries": unique_entries - len(payload),
+        "too_old_entries": too_old_count,
+        "filter_hits": filter_hits,
         "total_sources": len(sources),
         "succeeded_sources": len(sources) - len(failed_sources),
         "failed_source_count": len(failed_sources),
         "failed_sources": failed_sources,
         "category_counts": dict(sorted(category_counts.items())),
     }
+    if PARSE_CACHE is not None:
+        meta["parse_cache"] = PARSE_CACHE.stats()
+    if enrichment is not None:
+        meta["enrichment"] = enrichment
+    if shard is not None:
+        meta["shard"] = {"index": shard[0], "count": shard[1]}
     document = {"meta": meta, "entries": payload}
 
     if args.dry_run:
         LOGGER.info(
             "Dry-run 模式，預計輸出 %s 筆資料（去重率 %.2f%%）",
-            unique_entries,
+            len(payload),
             meta["dedup_rate"] * 100,
         )
         if meta["category_counts"]:
             summary = ", ".join(f"{cat}={count}" for cat, count in meta["category_counts"].items())
             LOGGER.info("分類統計：%s", summary)
-        LOGGER.debug(json.dumps({"meta": meta, "entries": payload[:3]}, ensure_ascii=False, indent=2))
+        LOGGER.debug(
+            json.dumps(
+                {"meta": meta, "entries": payload[:3]},
+                ensure_ascii=False,
+                indent=2,
+                default=models.json_default,
+            )
+        )
     else:
-        output_path = args.output or OUT_DIR / f"raw-{args.date}.json"
+        if shard is not None:
+            output_path = args.output or sharding.shard_path(OUT_DIR, args.date, *shard)
+        else:
+            output_path = args.output or OUT_DIR / f"raw-{args.date}.json"
         try:
             write_payload(document, output_path)
         except OSError as exc:
             LOGGER.error(f"寫入檔案失敗：{exc}")
             sys.exit(3)
+        if shard is None:
+            # 分片輸出只是中間產物，索引與 Parquet 匯出由 --merge-shards 處理
+            update_search_index(output_path, args.date)
+        if marks is not None:
+            # 寫檔成功後才前移 mark，寫入失敗的 entry 下次仍會收集
+            save_watermarks(marks, collected)
+        if shard is None:
+            export_analytics(args.analytics_dir, args.date, document)
 
+    export_metrics(args.metrics_dir, source_stats, meta, time.perf_counter() - started)
     LOGGER.info("collector 執行完成")
 
 
@@ -0,0 +1,136 @@
+"""feeds.yml 編譯快取：以 mtime/檔案雜湊避免重複 YAML 解析與驗證。"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from lazyimport import LazyModule
+
+yaml = LazyModule("yaml", "請先安裝 PyYAML：pip install pyyaml")
+
+LOGGER = logging.getLogger("collector")
+# collector.compile_config 的正規化或驗證規則（含其呼叫的各模組 from_config/validate_config）
+# 改變時必須遞增；版本是磁碟快取檔名的一部分，舊版的編譯結果不會再被命中而略過新的驗證
+COMPILER_VERSION = 7
+MAX_DISK_ENTRIES = 8
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def parse_yaml(data: bytes) -> Any:
+    """Parse YAML with libyaml's CSafeLoader when available."""
+    loader = getattr(yaml, "CSafeLoader", None) or yaml.SafeLoader
+    return yaml.load(data, Loader=loader)  # noqa: S506 - SafeLoader 系列
+
+
+@dataclass
+class ConfigDiff:
+    """兩次編譯之間依 source key 比對的差異。"""
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_sources(
+    old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]
+) -> ConfigDiff:
+    return ConfigDiff(
+        added=[key for key in new if key not in old],
+        removed=[key for key in old if key not in new],
+        changed=[key for key in new if key in old and old[key] != new[key]],
+    )
+
+
+@dataclass
+class CompiledConfig:
+    """已驗證、已正規化的設定，呼叫端應視為唯讀。"""
+
+    digest: str
+    mtime_ns: int
+    size: int
+    config: Dict[str, Any]
+    sources_by_key: Dict[str, Dict[str, Any]] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.sources_by_key = {
+            source["key"]: source for source in self.config.get("sources", [])
+        }
+
+
+class ConfigCache:
+    """兩層快取：行程內以 (mtime, size) 命中免讀檔，磁碟上以檔案雜湊命中免解析。"""
+
+    def __init__(self, cache_dir: pathlib.Path | None = None) -> None:
+        self.cache_dir = cache_dir
+        self._by_path: Dict[pathlib.Path, CompiledConfig] = {}
+
+    def current(self, path: pathlib.Path) -> CompiledConfig | None:
+        """Return the last compiled config for path, fresh or not."""
+        return self._by_path.get(path.resolve())
+
+    def fresh(self, path: pathlib.Path, stat: os.stat_result) -> CompiledConfig | None:
+        compiled = self.current(path)
+        if compiled and compiled.mtime_ns == stat.st_mtime_ns and compiled.size == stat.st_size:
+            return compiled
+        return None
+
+    def _disk_path(self, digest: str) -> pathlib.Path:
+        assert self.cache_dir is not None
+        return self.cache_dir / f"{digest}.v{COMPILER_VERSION}.json"
+
+    def lookup(self, digest: str) -> Dict[str, Any] | None:
+        for compiled in self._by_path.values():
+            if compiled.digest == digest:
+                return compiled.config
+        if self.cache_dir is None:
+            return None
+        try:
+            data = json.loads(self._disk_path(digest).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != COMPILER_VERSION:
+            return None
+        config = data.get("config")
+        return config if isinstance(config, dict) else None
+
+    def store(self, path: pathlib.Path, compiled: CompiledConfig) -> None:
+        self._by_path[path.resolve()] = compiled
+        if self.cache_dir is None:
+            return
+        cache_path = self._disk_path(compiled.digest)
+        if cache_path.exists():
+            return
+        document = {"version": COMPILER_VERSION, "config": compiled.config}
+        try:
+            text = json.dumps(document, ensure_ascii=False)
+        except (TypeError, ValueError) as exc:
+            # 例如 YAML 的日期值（added: 2025-01-01）無法存成 JSON；只保留行程內快取
+            LOGGER.debug(f"設定含無法序列化的值，略過磁碟快取：{exc}")
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(text, encoding="utf-8")
+            os.replace(tmp_path, cache_path)
+            self._prune()
+        except OSError as exc:
+            LOGGER.debug(f"無法寫入設定快取：{exc}")
+
+    def _prune(self) -> None:
+        assert self.cache_dir is not None
+        entries = sorted(
+            self.cache_dir.glob("*.json"), key=lambda item: item.stat().st_mtime, reverse=True
+        )
+        for stale in entries[MAX_DISK_ENTRIES:]:
+            stale.unlink(missing_ok=True)
@@ -0,0 +1,131 @@
+"""收集時的時間截止：``--since``、feeds.yml 的 ``max_age`` 與每個來源的 high-water mark。
+
+截止時間以 UTC epoch 秒表示；entry 的 ``published_epoch`` 小於截止時間時在解析階段就丟棄，
+不進入正規化、去重與後續流程。無法解析發布時間的 entry 一律保留。
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import pathlib
+import re
+from typing import Any, Dict, Iterable
+
+import models
+
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*$")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_duration(value: Any) -> float:
+    """``"90m"``、``"36h"``、``"7d"``、``"2w"`` -> 秒；純數字（含 ``"36"`` 這類字串）視為小時。"""
+    if isinstance(value, bool):
+        raise ValueError(f"無效的時間長度：{value!r}")
+    if isinstance(value, (int, float)):
+        seconds = float(value) * 3600
+    else:
+        match = _DURATION.match(str(value).lower())
+        if not match:
+            raise ValueError(f"無效的時間長度：{value!r}（例：36h、7d）")
+        seconds = float(match.group(1)) * _UNIT_SECONDS[match.group(2) or "h"]
+    if seconds <= 0:
+        raise ValueError(f"時間長度必須大於 0：{value!r}")
+    return seconds
+
+
+def parse_since(value: str, now: float) -> float:
+    """ISO 日期/時間（未帶時區視為 UTC）或相對長度（``36h`` 表示現在往前 36 小時）。
+
+    先試時間長度：純數字一律是小時，``"2025"`` 不會被當成年份。
+    """
+    try:
+        return now - parse_duration(value)
+    except ValueError:
+        pass
+    try:
+        parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError as exc:
+        raise ValueError(f"無效的 --since：{value}（例：2025-12-20、2025-12-20T08:00、36h）") from exc
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+    return parsed.timestamp()
+
+
+def validate_config(config: Dict[str, Any]) -> None:
+    """Check top-level and per-source ``max_age``; raises ValueError."""
+    if config.get("max_age") is not None:
+        parse_duration(config["max_age"])
+    for source in config.get("sources", []):
+        if source.get("max_age") is not None:
+            try:
+                parse_duration(source["max_age"])
+            except ValueError as exc:
+                raise ValueError(f"來源 '{source.get('key')}' 的 max_age：{exc}") from exc
+
+
+class Watermarks:
+    """每個來源已收集過的最新 ``published_epoch``，存成 ``{source_key: epoch}`` JSON。"""
+
+    def __init__(self, marks: Dict[str, int] | None = None) -> None:
+        self.marks: Dict[str, int] = dict(marks or {})
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "Watermarks":
+        """A missing or corrupt file starts with no marks (nothing is dropped)."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls()
+        if not isinstance(data, dict):
+            return cls()
+        return cls({str(key): int(value) for key, value in data.items() if isinstance(value, int)})
+
+    def save(self, path: pathlib.Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self.marks, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def get(self, source_key: str) -> int | None:
+        return self.marks.get(source_key)
+
+    def advance(self, entries: Iterable[models.Entry]) -> Dict[str, int]:
+        """Raise each source's mark to the newest entry seen; returns the marks that moved."""
+        moved: Dict[str, int] = {}
+        for entry in entries:
+            epoch = entry.published_epoch
+            if epoch is None:
+                continue
+            current = moved.get(entry.source_key, self.marks.get(entry.source_key))
+            if current is None or epoch > current:
+                moved[entry.source_key] = epoch
+        self.marks.update(moved)
+        return moved
+
+
+def source_cutoff(
+    source: Dict[str, Any],
+    config: Dict[str, Any],
+    now: float,
+    since: float | None = None,
+    marks: Watermarks | None = None,
+) -> float | None:
+    """The latest of ``--since``, ``now - max_age`` and the mark; None when nothing applies.
+
+    來源自己的 ``max_age`` 優先於 feeds.yml 頂層的 ``max_age``。
+    """
+    candidates = [since] if since is not None else []
+    max_age = source.get("max_age", config.get("max_age"))
+    if max_age is not None:
+        candidates.append(now - parse_duration(max_age))
+    if marks is not None:
+        mark = marks.get(source.get("key", ""))
+        if mark is not None:
+            # 與 mark 同一秒的 entry 已在上次收過
+            candidates.append(mark + 1)
+    return max(candidates) if candidates else None
+
+
+def describe(cutoff: float) -> str:
+    return dt.datetime.fromtimestamp(cutoff, dt.timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
@@ -3,40 +3,65 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+import io
 import json
 import logging
+import os
 import pathlib
 import sys
-from typing import Any, Dict, List, Tuple
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, TextIO, Tuple
+
+import chunking
+import collector
+import incremental
+import logutil
+import metrics
+import profiles
+import ranking
+import renderers
+import rollup
+import templating
+import trends
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 OUT_DIR = ROOT / "out"
+FEEDS_PATH = ROOT / "ops" / "feeds.yml"
 LOGS_DIR = ROOT / "logs"
 RAW_PREFIX = "raw"
+WRITE_BUFFER_SIZE = 64 * 1024
+# Markdown 版面變更時遞增，backfill 會據此重建所有日期
+RENDERER_VERSION = 2
 LOGGER = logging.getLogger("digest")
 
 
-def setup_logging(verbose: bool = False, log_file: pathlib.Path | None = None) -> None:
-    level = logging.DEBUG if verbose else logging.INFO
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    console_handler.setFormatter(
-        logging.Formatter("%(asctime)s | %(levelname)s | %(message)s", datefmt="%H:%M:%S")
-    )
+def setup_logging(
+    verbose: bool = False, log_file: pathlib.Path | None = None, json_lines: bool = False
+) -> None:
+    logutil.setup_logging(verbose=verbose, log_file=log_file, json_lines=json_lines)
 
-    handlers = [console_handler]
-    if log_file:
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(
-            logging.Formatter(
-                "%(asctime)s | %(levelname)s | %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-            )
-        )
-        handlers.append(file_handler)
 
-    logging.basicConfig(level=level, handlers=handlers)
+def parse_formats(value: str) -> List[str]:
+    formats = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in formats if item not in renderers.RENDERERS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"不支援的輸出格式：{value}")
+    return list(dict.fromkeys(formats))
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"必須是正整數：{value}")
+    return number
+
+
+def non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"必須是非負整數：{value}")
+    return number
 
 
 def parse_args() -> argparse.Namespace:
@@ -68,6 +93,76 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="顯示 DEBUG 級別日誌",
     )
+    parser.add_argument(
+        "--top-k",
+        type=non_negative_int,
+        help="依相關性評分後，每個分類只保留前 K 筆（0 表示只排序不截斷）",
+    )
+    parser.add_argument(
+        "--config",
+        type=pathlib.Path,
+        default=FEEDS_PATH,
+        help="讀取 ranking 權重的設定檔（預設：ops/feeds.yml）",
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        type=pathlib.Path,
+        help="輸出 Prometheus textfile（digest.prom）的目錄",
+    )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        help="log 檔改寫為 JSON lines（含 source_key/attempt/latency_ms 欄位）",
+    )
+    parser.add_argument(
+        "--formats",
+        type=parse_formats,
+        default=["markdown"],
+        help=f"輸出格式，以逗號分隔（可用：{', '.join(renderers.RENDERERS)}；預設 markdown）",
+    )
+    parser.add_argument(
+        "--template",
+        type=pathlib.Path,
+        help=f"以模板取代內建 Markdown 版面（範例：{templating.DEFAULT_TEMPLATE.relative_to(ROOT)}）",
+    )
+    parser.add_argument(
+        "--template-engine",
+        choices=templating.ENGINES,
+        default="builtin",
+        help="模板引擎：builtin（內建 Jinja2 語法子集）或 jinja2（需另外安裝）",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "日內增量模式：只 render 新 entry，更新完整 digest 並輸出 -delta 檔"
+            "（狀態存於輸出旁的 .state.json）"
+        ),
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=positive_int,
+        help=(
+            "另外把 Markdown 依來源邊界切成不超過 N bytes 的 -partNN 檔與 -index 索引"
+            f"（GitHub issue 建議 {chunking.DEFAULT_MAX_BYTES}）"
+        ),
+    )
+    parser.add_argument(
+        "--range",
+        type=str,
+        help="產出多日彙總 START..END（例：2025-12-01..2025-12-31），合併每日快取的 aggregate",
+    )
+    parser.add_argument(
+        "--weekly",
+        action="store_true",
+        help="產出以 --date 為最後一天的 7 日彙總",
+    )
+    parser.add_argument(
+        "--profiles",
+        nargs="*",
+        metavar="NAME",
+        help="依 feeds.yml 的 profiles 為各團隊分別產出 digest（未指定名稱時產出全部），raw 檔只讀一次",
+    )
     return parser.parse_args()
 
 
@@ -112,130 +207,412 @@ def load_entries(path: pathlib.Path) -> Tuple[List[Dict[str, Any]], Dict[str, An
     return entries, meta
 
 
+def load_ranking_config(path: pathlib.Path) -> ranking.RankingConfig:
+    """Read ranking weights from feeds.yml; a missing file falls back to defaults."""
+    if not path.exists():
+        LOGGER.warning(f"找不到設定檔 {path}，使用預設排序權重")
+        return ranking.RankingConfig()
+    return ranking.RankingConfig.from_config(collector.load_config(path))
+
+
+def write_markdown(
+    entries: List[Dict[str, Any]],
+    date: str,
+    meta: Dict[str, Any] | None,
+    out: TextIO,
+    bursts: List[trends.Burst] | None = None,
+) -> None:
+    """Stream the digest to ``out`` section by section instead of building one string."""
+    model = renderers.build_model(entries, date, meta, bursts)
+    renderers.RENDERERS["markdown"].render(model, out)
+
+
 def generate_markdown(
     entries: List[Dict[str, Any]],
     date: str,
     meta: Dict[str, Any] | None = None,
+    bursts: List[trends.Burst] | None = None,
 ) -> str:
-    lines = [f"# 技術資訊摘要 - {date}", ""]
-
-    if meta:
-        lines.append("## 摘要指標")
-        lines.append("")
-        raw_entries = meta.get("raw_entries")
-        unique_entries = meta.get("unique_entries", len(entries))
-        dedup_rate = meta.get("dedup_rate")
-        if raw_entries is not None or dedup_rate is not None:
-            dedup_text = (
-                f"{float(dedup_rate) * 100:.2f}%"
-                if isinstance(dedup_rate, (int, float))
-                else "N/A"
-            )
-            if raw_entries is not None:
-                lines.append(
-                    f"- 去重率：{dedup_text}（原始 {raw_entries} → 去重 {unique_entries}）"
-                )
-            else:
-                lines.append(f"- 去重率：{dedup_text}")
-
-        category_counts = meta.get("category_counts") or {}
-        if isinstance(category_counts, dict) and category_counts:
-            parts = [f"{cat} {count} 筆" for cat, count in sorted(category_counts.items())]
-            lines.append(f"- 分類統計：{' / '.join(parts)}")
-
-        total_sources = meta.get("total_sources")
-        failed_count = meta.get("failed_source_count")
-        if isinstance(total_sources, int) and isinstance(failed_count, int):
-            success = total_sources - failed_count
-            lines.append(
-                f"- 來源健康度：成功 {success} / {total_sources}（失敗 {failed_count}）"
-            )
+    """In-memory wrapper around write_markdown (kept for callers that need a string)."""
+    buffer = io.StringIO()
+    write_markdown(entries, date, meta, buffer, bursts)
+    return buffer.getvalue()
 
-        failed_sources = meta.get("failed_sources") or []
-        if isinstance(failed_sources, list) and failed_sources:
-            failed_names = [
-                item.get("name") or item.get("key", "未知來源")
-                for item in failed_sources
-                if isinstance(item, dict)
-            ]
-            if failed_names:
-                lines.append(f"- 失敗來源：{', '.join(failed_names)}")
-
-        lines.append("")
-
-    by_category: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
-    for entry in entries:
-        category = entry.get("category", "未分類") or "未分類"
-        source = entry.get("source", "未知來源")
-        by_category.setdefault(category, {}).setdefault(source, []).append(entry)
-
-    for category in sorted(by_category):
-        lines.append(f"## {category}")
-        lines.append("")
-        sources = by_category[category]
-        for source in sorted(sources):
-            lines.append(f"### {source}")
-            lines.append("")
-            for item in sources[source]:
-                title = item.get("title", "無標題")
-                url = item.get("url", "")
-                summary_full = item.get("summary_raw", "")
-                summary = summary_full[:200]
-                published = item.get("published_at", "未知時間")
-                tags = " ".join(f"#{tag}" for tag in item.get("tags", []))
-
-                lines.append(f"#### [{title}]({url})" if url else f"#### {title}")
-                lines.append(f"發布於：{published}")
-                lines.append("")
-                if summary:
-                    suffix = "..." if len(summary_full) > 200 else ""
-                    lines.append(summary + suffix)
-                    lines.append("")
-                lines.append(f"**來源**：{source}")
-                if tags:
-                    lines.append(f"**標籤**：{tags}")
-                lines.append("")
-                lines.append("---")
-                lines.append("")
+
+def write_atomic(path: pathlib.Path, render: Callable[[TextIO], None]) -> None:
+    """Stream into a temp file next to ``path`` and rename, so readers never see partial output."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as fh:
+            render(fh)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_day_aggregate(
+    raw_path: pathlib.Path, date: str, ranking_config: ranking.RankingConfig
+) -> Dict[str, Any] | None:
+    """Return the cached aggregate for one day, rebuilding it only when the raw file changed."""
+    if not raw_path.exists():
+        LOGGER.warning(f"缺少 {date} 的原始資料：{raw_path}")
+        return None
+    stat = raw_path.stat()
+    stamp = f"{stat.st_mtime_ns}:{stat.st_size}"
+    agg_path = rollup.aggregate_path(raw_path)
+    cached = rollup.read_aggregate(agg_path)
+    if cached is not None and rollup.is_fresh(
+        cached, stamp, rollup.config_fingerprint(ranking_config)
+    ):
+        LOGGER.debug(f"使用快取彙總：{agg_path}")
+        return cached
+
+    entries, meta = load_entries(raw_path)
+    aggregate = rollup.build_aggregate(entries, meta, date, ranking_config, stamp)
+    try:
+        rollup.write_aggregate(agg_path, aggregate)
+    except OSError as exc:
+        LOGGER.warning(f"寫入彙總快取失敗：{exc}")
+    return aggregate
+
+
+def write_rollup_markdown(summary: Dict[str, Any], out: TextIO) -> None:
+    """Render a merged multi-day rollup (see rollup.merge_aggregates)."""
+    write = out.write
+    dates = summary["dates"]
+    write(f"# 技術資訊彙總 - {dates[0]} ~ {dates[-1]}\n\n")
+    write("## 摘要指標\n\n")
+    write(f"- 涵蓋天數：{len(summary['covered'])} / {len(dates)}\n")
+    if summary["missing"]:
+        write(f"- 缺少資料：{', '.join(summary['missing'])}\n")
+    write(f"- 總筆數：{summary['entries']}（原始 {summary['raw_entries']}）\n")
+    category_counts = summary["category_counts"]
+    if category_counts:
+        parts = [f"{cat} {count} 筆" for cat, count in category_counts.items()]
+        write(f"- 分類統計：{' / '.join(parts)}\n")
+    write(f"- 跨日重複主題：{summary['recurring_clusters']} 個\n\n")
+
+    for category in sorted(summary["top"]):
+        write(f"## {category}\n\n")
+        for item in summary["top"][category]:
+            renderers.write_entry(item, item.get("source", "未知來源"), out)
 
     now = dt.datetime.now().strftime("%Y-%m-%d %H:%M")
-    lines.append(f"*本摘要由自動化系統產生於 {now}*")
-    return "\n".join(lines)
+    write(f"*本摘要由自動化系統產生於 {now}*")
+
+
+def text_writer(text: str) -> Callable[[TextIO], None]:
+    """``write_atomic`` callback for an already rendered string."""
+
+    def render(out: TextIO) -> None:
+        out.write(text)
+
+    return render
+
+
+def write_chunks(
+    model: renderers.DigestModel, base_path: pathlib.Path, max_bytes: int
+) -> List[chunking.Part]:
+    """Write ``-partNN`` files plus an index next to ``base_path``; drops stale parts."""
+    parts = chunking.chunk_markdown(model, max_bytes)
+    for part in parts:
+        if part.size > max_bytes:
+            LOGGER.warning(f"第 {part.number} 部分 {part.size} bytes 超過上限（單筆 entry 過大）")
+        write_atomic(chunking.part_path(base_path, part.number), text_writer(part.text))
+    for stale in chunking.stale_parts(base_path, len(parts)):
+        stale.unlink(missing_ok=True)
+    index = chunking.index_path(base_path)
+    text = chunking.render_index(parts, model.date, max_bytes, base_path)
+    write_atomic(index, text_writer(text))
+    LOGGER.info(f"分段輸出：{len(parts)} 部分，索引 {index}")
+    return parts
+
+
+def update_trends(
+    entries: List[Dict[str, Any]], date: str, input_path: pathlib.Path, dry_run: bool
+) -> List[trends.Burst]:
+    """Fold today's term counts into the rolling store next to the raw JSON and return bursts."""
+    if not trends.is_iso_date(date):
+        return []
+    path = trends.store_path(input_path.parent)
+    store = trends.TrendStore.load(path)
+    if not store.update(date, trends.count_terms(entries)):
+        LOGGER.warning(f"{date} 早於趨勢統計的保留區間，略過趨勢")
+        return []
+    if not dry_run:
+        try:
+            store.save(path)
+        except OSError as exc:
+            LOGGER.warning(f"無法寫入趨勢統計 {path}：{exc}")
+    bursts = store.bursts(date)
+    LOGGER.info(
+        f"趨勢：{len(bursts)} 個升溫詞（統計 {len(store.days)} 天、{len(store.counts)} 個詞）"
+    )
+    return bursts
+
+
+def write_incremental(
+    model: renderers.DigestModel, base_path: pathlib.Path, dry_run: bool = False
+) -> renderers.DigestModel:
+    """Append new entries to the day's cached sections; returns a model of the new entries."""
+    path = incremental.state_path(base_path)
+    state = incremental.DigestState.load(path, model.date, RENDERER_VERSION)
+    delta = incremental.update(state, model)
+    LOGGER.info(f"增量更新：新增 {delta.entry_count} 筆（累計 {len(state.ids)} 筆）")
+    if dry_run:
+        incremental.write_delta(delta, sys.stdout)
+        sys.stdout.write("\n")
+        return delta
+
+    write_atomic(base_path, lambda fh: incremental.write_full(state, model, fh))
+    delta_file = incremental.delta_path(base_path)
+    if delta.entry_count:
+        write_atomic(delta_file, lambda fh: incremental.write_delta(delta, fh))
+        LOGGER.info(f"產出增量摘要：{delta_file}")
+    else:
+        # 沒有新 entry 時移除舊的 delta，避免通知重送
+        delta_file.unlink(missing_ok=True)
+    state.save(path)
+    return delta
+
+
+def resolve_renderers(args: argparse.Namespace) -> Dict[str, renderers.Renderer]:
+    """Map each requested format to its renderer; --template replaces the Markdown layout."""
+    selected = {fmt: renderers.RENDERERS[fmt] for fmt in args.formats}
+    if args.template and "markdown" in selected:
+        try:
+            selected["markdown"] = templating.TemplateRenderer(args.template, args.template_engine)
+        except (OSError, templating.TemplateError) as exc:
+            LOGGER.error(f"模板載入失敗：{exc}")
+            sys.exit(1)
+    return selected
+
+
+def load_profiles(args: argparse.Namespace) -> List[profiles.Profile]:
+    config = collector.load_config(args.config)
+    try:
+        chosen = profiles.choose(profiles.parse_profiles(config), args.profiles)
+    except ValueError as exc:
+        LOGGER.error(f"profiles 設定錯誤：{exc}")
+        sys.exit(1)
+    if not chosen:
+        LOGGER.error(f"{args.config} 沒有定義 profiles")
+        sys.exit(1)
+    return chosen
+
+
+def profile_renderers(profile: profiles.Profile) -> Dict[str, renderers.Renderer]:
+    unknown = [fmt for fmt in profile.formats if fmt not in renderers.RENDERERS]
+    if unknown:
+        LOGGER.error(f"profile '{profile.name}' 不支援的輸出格式：{', '.join(unknown)}")
+        sys.exit(1)
+    selected = {fmt: renderers.RENDERERS[fmt] for fmt in profile.formats}
+    if profile.template and "markdown" in selected:
+        try:
+            selected["markdown"] = templating.TemplateRenderer(
+                ROOT / profile.template, profile.template_engine
+            )
+        except (OSError, templating.TemplateError) as exc:
+            LOGGER.error(f"profile '{profile.name}' 模板載入失敗：{exc}")
+            sys.exit(1)
+    return selected
+
+
+def render_profiles(
+    args: argparse.Namespace,
+    entries: List[Dict[str, Any]],
+    meta: Dict[str, Any],
+    bursts: List[trends.Burst],
+) -> None:
+    """Render every selected profile from the one loaded payload."""
+    # 先載入所有模板，任一個失敗都在寫檔前結束
+    plans = [(profile, profile_renderers(profile)) for profile in load_profiles(args)]
+    ranking_config = None
+    for profile, selected in plans:
+        items = profile.select(entries)
+        top_k = profile.top_k if profile.top_k is not None else args.top_k
+        if top_k is not None and items:
+            ranking_config = ranking_config or load_ranking_config(args.config)
+            items = ranking.rank_entries(items, ranking_config, args.date, top_k or None)
+        profile_meta = dict(meta)
+        if meta:
+            # 去重/來源統計沿用整體 payload，分類統計改為此 profile 實際收錄的筆數
+            category_counts = Counter(item.get("category", "") for item in items)
+            profile_meta["category_counts"] = dict(sorted(category_counts.items()))
+        model = renderers.build_model(items, args.date, profile_meta, bursts)
+        base_path = profile.output_path(OUT_DIR, ROOT, args.date)
+        if args.dry_run:
+            LOGGER.info(f"Dry-run：profile {profile.name} 將輸出 {len(items)} 筆至 {base_path}")
+            continue
+        for fmt, renderer in selected.items():
+            output_path = base_path if fmt == "markdown" else base_path.with_suffix(renderer.extension)
+            try:
+                write_atomic(output_path, lambda fh: renderer.render(model, fh))
+            except OSError as exc:
+                LOGGER.error(f"寫入檔案失敗：{exc}")
+                sys.exit(3)
+            LOGGER.info(f"產出摘要（{profile.name}/{fmt}，{len(items)} 筆）：{output_path}")
+        if args.max_bytes:
+            try:
+                write_chunks(model, base_path, args.max_bytes)
+            except OSError as exc:
+                LOGGER.error(f"寫入分段檔案失敗：{exc}")
+                sys.exit(3)
+
+
+def run_rollup(args: argparse.Namespace) -> None:
+    try:
+        dates = rollup.parse_range(args.range) if args.range else rollup.week_ending(args.date)
+    except ValueError as exc:
+        LOGGER.error(f"日期區間錯誤：{exc}")
+        sys.exit(1)
+
+    ranking_config = load_ranking_config(args.config)
+    aggregates = []
+    for date in dates:
+        aggregate = load_day_aggregate(
+            OUT_DIR / f"{RAW_PREFIX}-{date}.json", date, ranking_config
+        )
+        if aggregate is not None:
+            aggregates.append(aggregate)
+    if not aggregates:
+        LOGGER.error("區間內沒有任何原始資料，無法產出彙總")
+        sys.exit(2)
+
+    top_k = rollup.DEFAULT_TOP_K if args.top_k is None else args.top_k or None
+    summary = rollup.merge_aggregates(aggregates, dates, top_k)
+    LOGGER.info(f"合併 {len(aggregates)} / {len(dates)} 天彙總，共 {summary['entries']} 筆")
+
+    if args.dry_run:
+        if hasattr(sys.stdout, "reconfigure"):
+            sys.stdout.reconfigure(encoding="utf-8")
+        write_rollup_markdown(summary, sys.stdout)
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+        return
+
+    output_path = args.output or OUT_DIR / f"digest-{dates[0]}_{dates[-1]}.md"
+    try:
+        write_atomic(output_path, lambda fh: write_rollup_markdown(summary, fh))
+        LOGGER.info(f"產出彙總：{output_path}")
+    except OSError as exc:
+        LOGGER.error(f"寫入檔案失敗：{exc}")
+        sys.exit(3)
+
+
+def export_metrics(
+    metrics_dir: pathlib.Path | None,
+    entries: List[Dict[str, Any]],
+    meta: Dict[str, Any],
+    render_seconds: float,
+) -> None:
+    """Write digest.prom when --metrics-dir is given; failures only warn."""
+    if metrics_dir is None:
+        return
+    registry = metrics.Registry()
+    registry.set("digest_render_seconds", render_seconds, "Time spent rendering the digest")
+    registry.set("digest_entries", len(entries), "Entries rendered into the digest")
+    dedup_rate = meta.get("dedup_rate")
+    if isinstance(dedup_rate, (int, float)):
+        registry.set("digest_dedup_rate", dedup_rate, "meta.dedup_rate of the input payload")
+    failed_count = meta.get("failed_source_count")
+    if isinstance(failed_count, int):
+        registry.set("digest_failed_sources", failed_count, "meta.failed_source_count of the input")
+    registry.set("digest_last_run_timestamp_seconds", time.time(), "Unix time of the last run")
+    try:
+        metrics.write_textfile(registry, metrics_dir / "digest.prom")
+    except OSError as exc:
+        LOGGER.warning(f"寫入指標檔失敗：{exc}")
 
 
 def main() -> None:
     args = parse_args()
     log_file = LOGS_DIR / f"digest-{args.date}.log"
-    setup_logging(verbose=args.verbose, log_file=log_file)
+    setup_logging(verbose=args.verbose, log_file=log_file, json_lines=args.log_json)
 
     LOGGER.info("=" * 50)
     LOGGER.info("開始產出 digest")
     LOGGER.info(f"日期：{args.date}")
     LOGGER.info("=" * 50)
 
+    if args.range or args.weekly:
+        run_rollup(args)
+        LOGGER.info("digest 執行完成")
+        return
+
     input_path = args.input or OUT_DIR / f"{RAW_PREFIX}-{args.date}.json"
     entries, meta = load_entries(input_path)
     if not entries:
         LOGGER.error("JSON 沒有資料，無法產出摘要")
         sys.exit(2)
 
-    markdown = generate_markdown(entries, args.date, meta)
+    # 以排序前的完整 payload 計數，top-K 不影響趨勢
+    bursts = update_trends(entries, args.date, input_path, args.dry_run)
 
+    if args.profiles is not None:
+        if args.incremental:
+            LOGGER.error("--profiles 不支援 --incremental")
+            sys.exit(1)
+        render_started = time.perf_counter()
+        render_profiles(args, entries, meta, bursts)
+        export_metrics(args.metrics_dir, entries, meta, time.perf_counter() - render_started)
+        LOGGER.info("digest 執行完成")
+        return
+
+    if args.top_k is not None:
+        ranking_config = load_ranking_config(args.config)
+        total = len(entries)
+        entries = ranking.rank_entries(entries, ranking_config, args.date, args.top_k or None)
+        LOGGER.info(f"依相關性排序：保留 {len(entries)} / {total} 筆")
+
+    selected = resolve_renderers(args)
+    render_started = time.perf_counter()
+    # 只分組一次，所有輸出格式共用同一個 model
+    model = renderers.build_model(entries, args.date, meta, bursts)
     if args.dry_run:
         LOGGER.info("Dry-run 模式，輸出預覽在 stdout")
         if hasattr(sys.stdout, "reconfigure"):
             sys.stdout.reconfigure(encoding="utf-8")
-        print(markdown)
+        for fmt, renderer in selected.items():
+            if fmt == "markdown" and args.incremental:
+                write_incremental(model, args.output or OUT_DIR / f"digest-{args.date}.md", True)
+                continue
+            renderer.render(model, sys.stdout)
+            sys.stdout.write("\n")
+        sys.stdout.flush()
+        if args.max_bytes:
+            parts = chunking.chunk_markdown(model, args.max_bytes)
+            sizes = ", ".join(str(part.size) for part in parts)
+            LOGGER.info(f"分段預覽：{len(parts)} 部分（{sizes} bytes）")
     else:
-        output_path = args.output or OUT_DIR / f"digest-{args.date}.md"
-        try:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_text(markdown, encoding="utf-8")
-            LOGGER.info(f"產出摘要：{output_path}")
-        except OSError as exc:
-            LOGGER.error(f"寫入檔案失敗：{exc}")
-            sys.exit(3)
-
+        base_path = args.output or OUT_DIR / f"digest-{args.date}.md"
+        for fmt, renderer in selected.items():
+            output_path = base_path
+            if fmt != "markdown":
+                output_path = base_path.with_suffix(renderer.extension)
+            try:
+                if fmt == "markdown" and args.incremental:
+                    if args.template:
+                        LOGGER.warning("增量模式使用內建 Markdown 版面，不套用 --template")
+                    write_incremental(model, output_path)
+                    continue
+                write_atomic(output_path, lambda fh: renderer.render(model, fh))
+                LOGGER.info(f"產出摘要（{fmt}）：{output_path}")
+            except OSError as exc:
+                LOGGER.error(f"寫入檔案失敗：{exc}")
+                sys.exit(3)
+        if args.max_bytes:
+            if args.template:
+                LOGGER.warning("分段輸出使用內建 Markdown 版面，不套用 --template")
+            try:
+                write_chunks(model, base_path, args.max_bytes)
+            except OSError as exc:
+                LOGGER.error(f"寫入分段檔案失敗：{exc}")
+                sys.exit(3)
+    render_seconds = time.perf_counter() - render_started
+
+    export_metrics(args.metrics_dir, entries, meta, render_seconds)
     LOGGER.info("digest 執行完成")
 
 
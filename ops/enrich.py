@@ -0,0 +1,348 @@
+"""連結補充：摘要過短的 entry 另抓連結頁面的 OpenGraph/meta description。
+
+- 以有上限的 thread pool 並行抓取，同一主機的請求至少間隔 ``per_host_interval`` 秒
+- 每個頁面只讀前 ``max_kb`` KB，解析到 ``<body>`` 即停止
+- 結果依正規化 URL 存入持久快取並設 TTL；失敗也會快取（較短 TTL），跨日重複的連結不會重抓
+- 整個階段受 ``budget_seconds`` 限制，超過時未完成的連結直接略過，不拖延整體執行
+"""
+from __future__ import annotations
+
+import codecs
+import concurrent.futures
+import json
+import logging
+import os
+import pathlib
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import htmltext
+import models
+from lazyimport import LazyModule
+
+requests = LazyModule("requests", "請先安裝 requests：pip install requests")
+
+LOGGER = logging.getLogger("collector")
+USER_AGENT = "tech-digest-enricher/1.0 (+link preview)"
+READ_CHUNK_BYTES = 8192
+# 依優先順序：OpenGraph、Twitter card、一般 meta description
+DESCRIPTION_KEYS = ("og:description", "twitter:description", "description")
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "ref_src")
+# HTML 規範要求 <meta charset> 出現在前 1024 bytes，多看一點以容納較長的 <head> 開頭
+CHARSET_SNIFF_BYTES = 4096
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class EnrichConfig:
+    """feeds.yml 的 ``enrich`` 區塊。"""
+
+    max_workers: int = 8
+    per_host_interval: float = 1.0
+    max_kb: int = 64
+    timeout: float = 10.0
+    ttl_hours: float = 7 * 24
+    failure_ttl_hours: float = 12
+    budget_seconds: float = 60.0
+    min_summary_chars: int = 40
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "EnrichConfig":
+        """Build from a loaded feeds.yml; raises ValueError on malformed values."""
+        section = config.get("enrich") or {}
+        if not isinstance(section, dict):
+            raise ValueError("'enrich' 必須是物件")
+        values: Dict[str, Any] = {}
+        for spec in fields(cls):
+            if spec.name not in section:
+                continue
+            value = section[spec.name]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"'enrich.{spec.name}' 必須是數字")
+            if spec.type == "int" and not isinstance(value, int):
+                raise ValueError(f"'enrich.{spec.name}' 必須是整數")
+            if value < 0 or (value == 0 and spec.name != "per_host_interval"):
+                raise ValueError(f"'enrich.{spec.name}' 必須大於 0")
+            values[spec.name] = value
+        unknown = sorted(set(section) - {spec.name for spec in fields(cls)})
+        if unknown:
+            raise ValueError(f"'enrich' 有未知欄位：{', '.join(unknown)}")
+        return cls(**values)
+
+
+def canonical_url(url: str) -> str:
+    """快取鍵：小寫 scheme/host、去掉預設 port、fragment 與追蹤參數，其餘 query 排序。"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and (scheme, port) not in {("http", 80), ("https", 443)}:
+        host = f"{host}:{port}"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def needs_enrichment(entry: models.Entry, config: EnrichConfig) -> bool:
+    return entry.url.startswith(("http://", "https://")) and (
+        len(entry.summary_raw.strip()) < config.min_summary_chars
+    )
+
+
+class _MetaExtractor(HTMLParser):
+    """只看 ``<head>`` 的 ``<meta>``，遇到 ``<body>`` 或 ``</head>`` 即停止。"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.found: Dict[str, str] = {}
+        self.done = False
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, str | None]]) -> None:
+        if tag == "body":
+            self.done = True
+        elif tag == "meta" and not self.done:
+            values = {name: value or "" for name, value in attrs}
+            key = (values.get("property") or values.get("name") or "").lower()
+            if key in DESCRIPTION_KEYS and values.get("content"):
+                self.found.setdefault(key, values["content"])
+
+    handle_startendtag = handle_starttag
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head":
+            self.done = True
+
+
+def extract_description(markup: str) -> str:
+    """Best description in the page head, as plain text ('' when none)."""
+    parser = _MetaExtractor()
+    for start in range(0, len(markup), htmltext.CHUNK_CHARS):
+        parser.feed(markup[start : start + htmltext.CHUNK_CHARS])
+        if parser.done:
+            break
+    for key in DESCRIPTION_KEYS:
+        if parser.found.get(key, "").strip():
+            # content 屬性偶爾還帶有標籤，一併清掉
+            return htmltext.html_to_text(parser.found[key]).text
+    return ""
+
+
+def page_encoding(content_type: str, head: bytes) -> str:
+    """Charset from the Content-Type header, else ``<meta charset>``, else UTF-8.
+
+    requests 對沒有 charset 的 ``text/html`` 一律回報 ISO-8859-1，因此不採用 ``response.encoding``。
+    """
+    candidates = [_HEADER_CHARSET.search(content_type), _META_CHARSET.search(head[:CHARSET_SNIFF_BYTES])]
+    for match in candidates:
+        if match is None:
+            continue
+        name = match.group(1)
+        label = name.decode("ascii", "ignore") if isinstance(name, bytes) else name
+        try:
+            return codecs.lookup(label).name
+        except LookupError:
+            continue
+    return "utf-8"
+
+
+def fetch_description(url: str, config: EnrichConfig, deadline: float) -> str:
+    """GET ``url`` and read at most ``max_kb`` KB of HTML; raises on HTTP/network errors."""
+    timeout = max(min(config.timeout, deadline - time.monotonic()), 0.1)
+    limit = config.max_kb * 1024
+    with requests.get(
+        url,
+        stream=True,
+        timeout=timeout,
+        headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+    ) as response:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "")
+        if content_type and "html" not in content_type.lower():
+            return ""
+        chunks: List[bytes] = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=READ_CHUNK_BYTES):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= limit or time.monotonic() >= deadline:
+                break
+    body = b"".join(chunks)[:limit]
+    return extract_description(body.decode(page_encoding(content_type, body), errors="replace"))
+
+
+class LinkCache:
+    """``{canonical_url: {"description", "fetched_at", "ok"}}`` JSON；過期項目在存檔時清除。"""
+
+    def __init__(self, records: Dict[str, Dict[str, Any]] | None = None) -> None:
+        self.records: Dict[str, Dict[str, Any]] = dict(records or {})
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "LinkCache":
+        """A missing or corrupt file starts empty (every link is fetched again)."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls()
+        if not isinstance(data, dict):
+            return cls()
+        return cls({key: value for key, value in data.items() if isinstance(value, dict)})
+
+    def save(self, path: pathlib.Path, config: EnrichConfig, now: float) -> None:
+        self.records = {
+            key: record
+            for key, record in self.records.items()
+            if self._fresh(record, config, now)
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self.records, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _fresh(record: Dict[str, Any], config: EnrichConfig, now: float) -> bool:
+        ttl_hours = config.ttl_hours if record.get("ok") else config.failure_ttl_hours
+        fetched_at = record.get("fetched_at")
+        return isinstance(fetched_at, (int, float)) and now - fetched_at < ttl_hours * 3600
+
+    def get(self, key: str, config: EnrichConfig, now: float) -> Dict[str, Any] | None:
+        record = self.records.get(key)
+        if record is None or not self._fresh(record, config, now):
+            return None
+        return record
+
+    def put(self, key: str, description: str, ok: bool, now: float) -> None:
+        self.records[key] = {"description": description, "fetched_at": now, "ok": ok}
+
+
+class HostLimiter:
+    """每個主機一個時間槽序列；預約時間超過期限的請求直接放棄。"""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, host: str, deadline: float) -> float | None:
+        """Monotonic time at which ``host`` may be contacted, or None past ``deadline``."""
+        with self._lock:
+            slot = max(time.monotonic(), self._next.get(host, 0.0))
+            if slot >= deadline:
+                return None
+            self._next[host] = slot + self.interval
+            return slot
+
+
+@dataclass
+class EnrichStats:
+    candidates: int = 0
+    cache_hits: int = 0
+    fetched: int = 0
+    failed: int = 0
+    skipped: int = 0
+    enriched: int = 0
+    seconds: float = 0.0
+
+    def to_meta(self) -> Dict[str, Any]:
+        return {**asdict(self), "seconds": round(self.seconds, 3)}
+
+
+_SKIPPED = object()
+
+
+def enrich_entries(
+    entries: List[models.Entry],
+    config: EnrichConfig,
+    cache: LinkCache,
+    max_chars: int,
+    fetch: Callable[[str, EnrichConfig, float], str] = fetch_description,
+) -> EnrichStats:
+    """Fill short ``summary_raw`` values in place from cached or freshly fetched descriptions."""
+    started = time.monotonic()
+    deadline = started + config.budget_seconds
+    now = time.time()
+    stats = EnrichStats()
+
+    # 同一正規化 URL 的 entry 共用一次抓取
+    pending: Dict[str, List[models.Entry]] = {}
+    for entry in entries:
+        if not needs_enrichment(entry, config):
+            continue
+        try:
+            key = canonical_url(entry.url)
+        except ValueError:
+            # 例如 port 不是數字（http://a:xx/）；略過這筆，不影響其他連結
+            LOGGER.debug(f"略過無法解析的連結：{entry.url}")
+            continue
+        pending.setdefault(key, []).append(entry)
+    stats.candidates = len(pending)
+
+    def apply(key: str, description: str) -> None:
+        if not description:
+            return
+        summary = htmltext.clip(description, max_chars)
+        for entry in pending[key]:
+            if len(summary) > len(entry.summary_raw.strip()):
+                entry.summary_raw = summary
+                stats.enriched += 1
+
+    to_fetch: List[str] = []
+    for key in pending:
+        record = cache.get(key, config, now)
+        if record is None:
+            to_fetch.append(key)
+            continue
+        stats.cache_hits += 1
+        apply(key, str(record.get("description", "")))
+
+    limiter = HostLimiter(config.per_host_interval)
+
+    def work(key: str) -> Any:
+        slot = limiter.reserve(urlsplit(key).hostname or "", deadline)
+        if slot is None:
+            return _SKIPPED
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        if time.monotonic() >= deadline:
+            return _SKIPPED
+        return fetch(pending[key][0].url, config, deadline)
+
+    if to_fetch:
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(config.max_workers, len(to_fetch)), thread_name_prefix="enrich"
+        )
+        futures = {executor.submit(work, key): key for key in to_fetch}
+        done, not_done = concurrent.futures.wait(
+            futures, timeout=max(deadline - time.monotonic(), 0)
+        )
+        # 超過時間預算：尚未開始的取消，進行中的結果直接捨棄（請求本身的 timeout 不超過預算）
+        executor.shutdown(wait=False, cancel_futures=True)
+        stats.skipped += len(not_done)
+        finished = time.time()
+        for future in done:
+            key = futures[future]
+            try:
+                description = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.debug(f"連結補充失敗：{pending[key][0].url}：{exc}")
+                stats.failed += 1
+                cache.put(key, "", False, finished)
+                continue
+            if description is _SKIPPED:
+                stats.skipped += 1
+                continue
+            stats.fetched += 1
+            cache.put(key, description, True, finished)
+            apply(key, description)
+
+    stats.seconds = time.monotonic() - started
+    return stats
@@ -0,0 +1,201 @@
+"""feeds.yml ``filters`` 規則：所有關鍵字編譯成單一 Aho-Corasick automaton。"""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+
+import models
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and (char.isalnum() or char == "_")
+
+
+class Automaton:
+    """Multi-pattern matcher: 一次掃描文字即可找出所有命中的關鍵字。
+
+    關鍵字一律 casefold。首尾為英數字的關鍵字需落在單字邊界（避免 ``ai`` 命中 ``said``），
+    CJK 等其他字元不檢查邊界，因此中文關鍵字可直接比對連續文字。
+    """
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        self.patterns = [pattern.casefold() for pattern in patterns]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            self._insert(pattern, pattern_id)
+        self._build_fail_links()
+
+    def _insert(self, pattern: str, pattern_id: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(pattern_id)
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[
+                    self._fail[next_state]
+                ]
+
+    def search(self, text: str) -> Set[int]:
+        """Return the ids of all patterns found in ``text``."""
+        text = text.casefold()
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        found: Set[int] = set()
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                if pattern_id in found:
+                    continue
+                pattern = patterns[pattern_id]
+                start = end - len(pattern) + 1
+                if _is_word_char(pattern[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if (
+                    _is_word_char(pattern[-1])
+                    and end + 1 < len(text)
+                    and _is_word_char(text[end + 1])
+                ):
+                    continue
+                found.add(pattern_id)
+        return found
+
+
+@dataclass
+class FilterRule:
+    """單一規則；``sources``/``categories`` 為空代表套用到所有 entry。"""
+
+    name: str
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+    sources: Set[str] = field(default_factory=set)
+    categories: Set[str] = field(default_factory=set)
+
+    def applies_to(self, entry: models.Entry) -> bool:
+        if self.sources and entry.source_key not in self.sources:
+            return False
+        if self.categories and entry.category not in self.categories:
+            return False
+        return True
+
+
+def _string_list(rule: Dict[str, Any], name: str, field_name: str) -> List[str]:
+    value = rule.get(field_name) or []
+    if not isinstance(value, list) or not all(isinstance(item, str) and item for item in value):
+        raise ValueError(f"filters '{name}' 的 {field_name} 必須是非空字串列表")
+    return value
+
+
+def parse_rules(config: Dict[str, Any]) -> List[FilterRule]:
+    """Validate the ``filters`` section; raises ValueError on malformed rules."""
+    section = config.get("filters") or []
+    if not isinstance(section, list):
+        raise ValueError("'filters' 必須是列表")
+
+    rules: List[FilterRule] = []
+    for idx, rule in enumerate(section):
+        if not isinstance(rule, dict):
+            raise ValueError(f"filters #{idx} 格式錯誤（預期為物件）")
+        name = str(rule.get("name") or f"rule-{idx}")
+        include = _string_list(rule, name, "include")
+        exclude = _string_list(rule, name, "exclude")
+        if not include and not exclude:
+            raise ValueError(f"filters '{name}' 至少需要 include 或 exclude")
+        rules.append(
+            FilterRule(
+                name=name,
+                include=include,
+                exclude=exclude,
+                sources=set(_string_list(rule, name, "sources")),
+                categories=set(_string_list(rule, name, "categories")),
+            )
+        )
+    return rules
+
+
+class FilterEngine:
+    """把所有規則的關鍵字合併成一個 automaton，每筆 entry 只掃描一次。"""
+
+    def __init__(self, rules: Sequence[FilterRule]) -> None:
+        self.rules = list(rules)
+        keywords: Dict[str, int] = {}
+        # pattern id -> [(rule index, 是否為 include)]
+        self._targets: List[List[Tuple[int, bool]]] = []
+        for rule_idx, rule in enumerate(self.rules):
+            for keyword, is_include in [(k, True) for k in rule.include] + [
+                (k, False) for k in rule.exclude
+            ]:
+                folded = keyword.casefold()
+                if folded not in keywords:
+                    keywords[folded] = len(keywords)
+                    self._targets.append([])
+                self._targets[keywords[folded]].append((rule_idx, is_include))
+        self.automaton = Automaton(list(keywords))
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "FilterEngine":
+        return cls(parse_rules(config))
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    @staticmethod
+    def entry_text(entry: models.Entry) -> str:
+        # 以換行分隔欄位，避免關鍵字跨欄位誤判
+        return "\n".join([entry.title, entry.summary_raw, *entry.tags])
+
+    def apply(
+        self, entries: Iterable[models.Entry]
+    ) -> Tuple[List[models.Entry], Dict[str, Dict[str, int]]]:
+        """Return kept entries and per-rule hit counts (include/exclude/dropped)."""
+        hits = {rule.name: {"include": 0, "exclude": 0, "dropped": 0} for rule in self.rules}
+        kept: List[models.Entry] = []
+        for entry in entries:
+            applicable = [idx for idx, rule in enumerate(self.rules) if rule.applies_to(entry)]
+            if not applicable:
+                kept.append(entry)
+                continue
+
+            included: Set[int] = set()
+            excluded: Set[int] = set()
+            for pattern_id in self.automaton.search(self.entry_text(entry)):
+                for rule_idx, is_include in self._targets[pattern_id]:
+                    (included if is_include else excluded).add(rule_idx)
+
+            dropped_by: str | None = None
+            for rule_idx in applicable:
+                rule = self.rules[rule_idx]
+                if rule_idx in included:
+                    hits[rule.name]["include"] += 1
+                if rule_idx in excluded:
+                    hits[rule.name]["exclude"] += 1
+                rejected = rule_idx in excluded or (rule.include and rule_idx not in included)
+                if rejected and dropped_by is None:
+                    dropped_by = rule.name
+            if dropped_by is None:
+                kept.append(entry)
+            else:
+                hits[dropped_by]["dropped"] += 1
+        return kept, hits
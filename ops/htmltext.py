@@ -0,0 +1,195 @@
+"""RSS 摘要的 HTML 轉純文字：串流解析、去除標籤與 entity，達字元上限即停止。
+
+大型 description 只解析到湊滿上限為止，不會整份掃描；需要全文時另以 zlib + base64
+壓縮後存放在獨立欄位，``summary_raw`` 只保留上限內的純文字。
+"""
+from __future__ import annotations
+
+import base64
+import html
+import zlib
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+DEFAULT_MAX_CHARS = 500
+# 每次餵給 parser 的字元數；湊滿上限後最多多解析一個區塊
+CHUNK_CHARS = 4096
+ELLIPSIS = "…"
+
+# 內容不屬於可讀文字的元素
+SKIP_TAGS = {"script", "style", "noscript", "template", "head", "title"}
+BLOCK_TAGS = {
+    "address",
+    "article",
+    "aside",
+    "blockquote",
+    "dd",
+    "div",
+    "dl",
+    "dt",
+    "figcaption",
+    "figure",
+    "footer",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "header",
+    "hr",
+    "li",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "table",
+    "tr",
+    "ul",
+}
+
+
+@dataclass(frozen=True)
+class SummaryConfig:
+    """feeds.yml 的 ``summary`` 區塊。"""
+
+    max_chars: int = DEFAULT_MAX_CHARS
+    keep_full: bool = False
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SummaryConfig":
+        """Build from a loaded feeds.yml; raises ValueError on malformed values."""
+        section = config.get("summary") or {}
+        if not isinstance(section, dict):
+            raise ValueError("'summary' 必須是物件")
+        max_chars = section.get("max_chars", DEFAULT_MAX_CHARS)
+        if isinstance(max_chars, bool) or not isinstance(max_chars, int) or max_chars <= 0:
+            raise ValueError("'summary.max_chars' 必須是正整數")
+        keep_full = section.get("keep_full", False)
+        if not isinstance(keep_full, bool):
+            raise ValueError("'summary.keep_full' 必須是 true 或 false")
+        return cls(max_chars=max_chars, keep_full=keep_full)
+
+
+class CleanText(NamedTuple):
+    text: str
+    truncated: bool
+
+
+class _TextExtractor(HTMLParser):
+    """收集可見文字；連續空白合併為一格，區塊元素之間以空行分隔。"""
+
+    def __init__(self, limit: int | None) -> None:
+        # entity 自行處理，文字才會隨 feed() 立即送出，而不是緩衝到下一個標籤
+        super().__init__(convert_charrefs=False)
+        self.limit = limit
+        self.parts: List[str] = []
+        self.size = 0
+        self.skip = 0
+        self.pending = ""
+        self.done = False
+
+    def _separate(self, separator: str) -> None:
+        if self.parts and len(separator) > len(self.pending):
+            self.pending = separator
+
+    def _emit(self, text: str) -> None:
+        if self.pending:
+            text = self.pending + text
+            self.pending = ""
+        if self.limit is not None and self.size + len(text) > self.limit:
+            text = text[: self.limit - self.size]
+            self.done = True
+        self.parts.append(text)
+        self.size += len(text)
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        if tag in SKIP_TAGS:
+            self.skip += 1
+        elif tag == "br":
+            self._separate("\n")
+        elif tag in BLOCK_TAGS:
+            self._separate("\n\n")
+
+    def handle_startendtag(self, tag: str, attrs: Any) -> None:
+        if tag == "br":
+            self._separate("\n")
+        elif tag in BLOCK_TAGS:
+            self._separate("\n\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIP_TAGS:
+            self.skip = max(self.skip - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self._separate("\n\n")
+
+    def handle_data(self, data: str) -> None:
+        if self.skip or self.done or not data:
+            return
+        if data[0].isspace():
+            self._separate(" ")
+        words = data.split()
+        if words:
+            self._emit(" ".join(words))
+            if data[-1].isspace():
+                self._separate(" ")
+
+    def handle_entityref(self, name: str) -> None:
+        self.handle_data(html.unescape(f"&{name};"))
+
+    def handle_charref(self, name: str) -> None:
+        self.handle_data(html.unescape(f"&#{name};"))
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def html_to_text(markup: str, limit: int | None = None) -> CleanText:
+    """Visible text of ``markup``, stopping once more than ``limit`` characters are found.
+
+    ``truncated`` 為 True 時 ``text`` 恰為 ``limit`` 個字元，且原文還有更多文字。
+    """
+    parser = _TextExtractor(limit)
+    for start in range(0, len(markup), CHUNK_CHARS):
+        parser.feed(markup[start : start + CHUNK_CHARS])
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return CleanText(parser.text(), parser.done)
+
+
+def clip(text: str, limit: int) -> str:
+    """Cut ``text`` to ``limit`` characters, ending with an ellipsis when something was cut."""
+    if len(text) <= limit:
+        return text
+    return text[: limit - len(ELLIPSIS)].rstrip() + ELLIPSIS
+
+
+def clean_summary(markup: str, config: SummaryConfig) -> Tuple[str, str]:
+    """``(summary, compressed_full_text)``；未啟用 ``keep_full`` 時第二項為空字串。"""
+    if not markup:
+        return "", ""
+    if config.keep_full:
+        full = html_to_text(markup).text
+        return clip(full, config.max_chars), compress_text(full)
+    # 解析到超過上限即停止；被截斷時以省略號結尾
+    text, truncated = html_to_text(markup, config.max_chars)
+    return (clip(text + ELLIPSIS, config.max_chars) if truncated else text), ""
+
+
+def compress_text(text: str) -> str:
+    if not text:
+        return ""
+    return base64.b64encode(zlib.compress(text.encode("utf-8"), 9)).decode("ascii")
+
+
+def decompress_text(value: str) -> str:
+    """Inverse of :func:`compress_text`; raises ValueError on corrupt data."""
+    if not value:
+        return ""
+    try:
+        return zlib.decompress(base64.b64decode(value, validate=True)).decode("utf-8")
+    except (zlib.error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("summary_full 欄位無法解壓縮") from exc
@@ -0,0 +1,120 @@
+"""日內增量更新：記錄已 render 的 entry，之後只 render 新增的部分。
+
+狀態檔保存每筆 entry 已 render 好的 Markdown 片段（依分類/來源分組），
+完整 digest 由這些片段重新拼接，新 entry 附加到對應分類/來源段落的末端。
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import pathlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, TextIO
+
+import renderers
+
+# 片段格式或狀態結構改變時遞增，舊狀態檔會被捨棄並整份重建
+STATE_VERSION = 1
+
+
+def entry_id(item: Dict[str, Any]) -> str:
+    """URL 為主鍵；沒有 URL 時以來源 + 標題雜湊。"""
+    url = str(item.get("url", "") or "")
+    if url:
+        return url
+    key = f"{item.get('source', '')}\n{item.get('title', '')}"
+    return "sha:" + hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def state_path(base_path: pathlib.Path) -> pathlib.Path:
+    """``out/digest-2025-12-22.md`` -> ``out/.digest-2025-12-22.state.json``."""
+    return base_path.with_name(f".{base_path.stem}.state.json")
+
+
+def delta_path(base_path: pathlib.Path) -> pathlib.Path:
+    return base_path.with_name(f"{base_path.stem}-delta{base_path.suffix}")
+
+
+@dataclass
+class DigestState:
+    date: str
+    renderer: int
+    ids: List[str] = field(default_factory=list)
+    # category -> source -> 已 render 的 entry 片段
+    sections: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: pathlib.Path, date: str, renderer: int) -> "DigestState":
+        """Read the state file; a missing, corrupt or outdated file starts fresh."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(date=date, renderer=renderer)
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != STATE_VERSION
+            or data.get("renderer") != renderer
+            or data.get("date") != date
+        ):
+            return cls(date=date, renderer=renderer)
+        return cls(
+            date=date,
+            renderer=renderer,
+            ids=list(data.get("ids", [])),
+            sections=data.get("sections", {}),
+        )
+
+    def save(self, path: pathlib.Path) -> None:
+        document = {
+            "version": STATE_VERSION,
+            "renderer": self.renderer,
+            "date": self.date,
+            "ids": self.ids,
+            "sections": self.sections,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(document, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def update(state: DigestState, model: renderers.DigestModel) -> renderers.DigestModel:
+    """Render entries not yet in ``state`` into their sections; returns a model of the new ones."""
+    seen = set(state.ids)
+    new_entries: List[Dict[str, Any]] = []
+    for category, source, item in model.iter_entries():
+        item_id = entry_id(item)
+        if item_id in seen:
+            continue
+        seen.add(item_id)
+        buffer = io.StringIO()
+        renderers.write_entry(item, source.name, buffer)
+        state.sections.setdefault(category.name, {}).setdefault(source.name, []).append(
+            buffer.getvalue()
+        )
+        state.ids.append(item_id)
+        new_entries.append(item)
+    return renderers.build_model(new_entries, model.date)
+
+
+def write_full(state: DigestState, model: renderers.DigestModel, out: TextIO) -> None:
+    """Same layout as MarkdownRenderer, assembled from cached fragments."""
+    write = out.write
+    renderers.MarkdownRenderer.write_header(model, out)
+    for category in sorted(state.sections):
+        write(f"## {category}\n\n")
+        sources = state.sections[category]
+        for source in sorted(sources):
+            write(f"### {source}\n\n")
+            for fragment in sources[source]:
+                write(fragment)
+    renderers.MarkdownRenderer.write_footer(model, out)
+
+
+def write_delta(delta: renderers.DigestModel, out: TextIO) -> None:
+    """只含本次新增 entry 的通知用摘要。"""
+    out.write(f"# 技術資訊摘要 - {delta.date} 新增 {delta.entry_count} 筆\n\n")
+    renderers.MarkdownRenderer.write_sections(delta, out)
+    renderers.MarkdownRenderer.write_footer(delta, out)
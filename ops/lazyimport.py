@@ -0,0 +1,49 @@
+"""延遲載入第三方套件，讓 --help、設定檢查等短指令不必付出 import 成本。"""
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule:
+    """第一次存取屬性時才 import 模組；缺少套件時以 SystemExit 提示安裝方式。
+
+    屬性設定/刪除會轉交給真正的模組，因此 ``monkeypatch.setattr(collector.requests, ...)``
+    的行為與直接 import 時一致。
+    """
+
+    def __init__(self, name: str, install_hint: str) -> None:
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_install_hint", install_hint)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self) -> ModuleType:
+        module: ModuleType | None = object.__getattribute__(self, "_module")
+        if module is None:
+            name = object.__getattribute__(self, "_name")
+            try:
+                module = importlib.import_module(name)
+            except ImportError as exc:
+                hint = object.__getattribute__(self, "_install_hint")
+                raise SystemExit(hint) from exc
+            object.__setattr__(self, "_module", module)
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return object.__getattribute__(self, "_module") is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        delattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        name = object.__getattribute__(self, "_name")
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {name!r} ({state})>"
@@ -0,0 +1,156 @@
+"""collector/digest 共用的非阻塞 logging：QueueHandler + 背景 QueueListener。"""
+from __future__ import annotations
+
+import atexit
+import datetime as dt
+import json
+import logging
+import logging.handlers
+import pathlib
+import queue
+import sys
+import time
+from typing import Any, Dict, List
+
+CONSOLE_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
+CONSOLE_DATEFMT = "%H:%M:%S"
+FILE_DATEFMT = "%Y-%m-%d %H:%M:%S"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_ROTATE_SECONDS = 24 * 60 * 60
+# 透過 LOGGER.xxx(..., extra={...}) 傳入、會被寫進 JSON log 的欄位
+STRUCTURED_FIELDS = ("source_key", "attempt", "latency_ms")
+
+_LISTENER: logging.handlers.QueueListener | None = None
+
+
+class SizedTimedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """超過 max_bytes 或距上次輪替超過 interval 秒時輪替（沿用 .1/.2 編號備份）。
+
+    CLI 每次執行都很短，因此時間起點取自既有 log 檔的 mtime（同 TimedRotatingFileHandler）：
+    上次寫入已超過 interval 秒的 log 會在本次第一筆紀錄時輪替。
+    """
+
+    def __init__(
+        self,
+        filename: pathlib.Path,
+        max_bytes: int = LOG_MAX_BYTES,
+        backup_count: int = LOG_BACKUP_COUNT,
+        interval: float = LOG_ROTATE_SECONDS,
+        encoding: str = "utf-8",
+    ) -> None:
+        super().__init__(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding
+        )
+        self.interval = interval
+        try:
+            started = pathlib.Path(filename).stat().st_mtime
+        except OSError:
+            started = time.time()
+        self.rollover_at = started + interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> int:  # noqa: N802
+        if self.interval > 0 and time.time() >= self.rollover_at:
+            return 1
+        return super().shouldRollover(record)
+
+    def doRollover(self) -> None:  # noqa: N802
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """寫到 stderr，不與 stdout 上的 digest/查詢結果交錯。
+
+    每次寫入時才取 ``sys.stderr``（同 logging.lastResort），pytest 等替換後不會寫到已關閉的串流。
+    """
+
+    def __init__(self) -> None:
+        super().__init__(sys.stderr)
+
+    @property
+    def stream(self) -> Any:
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, _value: Any) -> None:
+        pass
+
+
+class JsonFormatter(logging.Formatter):
+    """每行一個 JSON 物件，附帶 STRUCTURED_FIELDS 中有提供的欄位。"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": dt.datetime.fromtimestamp(record.created, dt.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+def build_handlers(
+    verbose: bool = False,
+    log_file: pathlib.Path | None = None,
+    json_lines: bool = False,
+) -> List[logging.Handler]:
+    """Create the console/file handlers that the QueueListener drains into."""
+    level = logging.DEBUG if verbose else logging.INFO
+    console_handler = ConsoleHandler()
+    console_handler.setLevel(level)
+    console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT, datefmt=CONSOLE_DATEFMT))
+
+    handlers: List[logging.Handler] = [console_handler]
+    if log_file:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = SizedTimedRotatingFileHandler(log_file)
+        file_handler.setLevel(logging.DEBUG)
+        if json_lines:
+            file_handler.setFormatter(JsonFormatter())
+        else:
+            file_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT, datefmt=FILE_DATEFMT))
+        handlers.append(file_handler)
+    return handlers
+
+
+def setup_logging(
+    verbose: bool = False,
+    log_file: pathlib.Path | None = None,
+    json_lines: bool = False,
+) -> logging.handlers.QueueListener:
+    """Attach a QueueHandler to the root logger; I/O happens on the listener thread."""
+    global _LISTENER
+    stop_logging()
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handlers = build_handlers(verbose=verbose, log_file=log_file, json_lines=json_lines)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _LISTENER = listener
+    atexit.register(stop_logging)
+
+    # QueueHandler 只合併 msg/args，實際格式交給 listener 端的 handler
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    level = logging.DEBUG if verbose else logging.INFO
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+    return listener
+
+
+def stop_logging() -> None:
+    """Flush pending records and close handlers (safe to call repeatedly)."""
+    global _LISTENER
+    listener = _LISTENER
+    if listener is None:
+        return
+    _LISTENER = None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
@@ -0,0 +1,210 @@
+"""輸出 Prometheus/OpenMetrics textfile 指標，並可於本機埠號提供 scrape。"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import pathlib
+import sys
+import threading
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import http.server
+
+LOGGER = logging.getLogger("metrics")
+DEFAULT_PORT = 9108
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SUPPORTED_KINDS = {"gauge", "counter", "histogram"}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelKey, extra: Tuple[str, str] | None = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Family:
+    """單一指標名稱下、依 label 區分的所有樣本。"""
+
+    def __init__(
+        self, name: str, kind: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        if kind not in SUPPORTED_KINDS:
+            raise ValueError(f"不支援的指標型別：{kind}")
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[LabelKey, float] = {}
+        self.histograms: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, labels: LabelKey, value: float) -> None:
+        # 每個 label 組合存 [各 bucket 累計數..., sum, count]
+        state = self.histograms.setdefault(labels, [0.0] * (len(self.buckets) + 2))
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[idx] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        if self.kind != "histogram":
+            for labels, value in self.values.items():
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+            return lines
+
+        for labels, state in self.histograms.items():
+            for bound, count in zip(self.buckets, state):
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(labels, le)} {_format_value(count)}")
+            inf = ("le", "+Inf")
+            lines.append(f"{self.name}_bucket{_format_labels(labels, inf)} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {_format_value(state[-1])}")
+        return lines
+
+
+class Registry:
+    """收集一次執行的指標並輸出為 Prometheus text exposition format。"""
+
+    def __init__(self) -> None:
+        self._families: Dict[str, _Family] = {}
+        self._lock = threading.Lock()
+
+    def _family(
+        self, name: str, kind: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> _Family:
+        family = self._families.get(name)
+        if family is None:
+            family = _Family(name, kind, help_text, buckets)
+            self._families[name] = family
+        elif family.kind != kind:
+            raise ValueError(f"指標 {name} 已註冊為 {family.kind}")
+        return family
+
+    def set(self, name: str, value: float, help_text: str = "", **labels: str) -> None:
+        with self._lock:
+            family = self._family(name, "gauge", help_text or name)
+            family.values[tuple(sorted(labels.items()))] = float(value)
+
+    def inc(self, name: str, value: float = 1.0, help_text: str = "", **labels: str) -> None:
+        with self._lock:
+            family = self._family(name, "counter", help_text or name)
+            key = tuple(sorted(labels.items()))
+            family.values[key] = family.values.get(key, 0.0) + float(value)
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        help_text: str = "",
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        **labels: str,
+    ) -> None:
+        with self._lock:
+            family = self._family(name, "histogram", help_text or name, buckets)
+            family.observe(tuple(sorted(labels.items())), float(value))
+
+    def render(self) -> str:
+        with self._lock:
+            lines: List[str] = []
+            for family in self._families.values():
+                lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+def write_textfile(registry: Registry, path: pathlib.Path) -> None:
+    """以暫存檔 + rename 原子寫入，避免 node-exporter 讀到半份檔案。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(registry.render(), encoding="utf-8")
+    os.replace(tmp_path, path)
+    LOGGER.info(f"產出指標檔：{path}")
+
+
+def read_textfiles(directory: pathlib.Path) -> str:
+    """合併目錄下所有 .prom 檔，供 HTTP scrape 使用。"""
+    if not directory.exists():
+        return ""
+    parts = [path.read_text(encoding="utf-8") for path in sorted(directory.glob("*.prom"))]
+    return "".join(parts)
+
+
+def serve(
+    directory: pathlib.Path, port: int = DEFAULT_PORT, host: str = DEFAULT_HOST
+) -> http.server.ThreadingHTTPServer:
+    """在背景執行緒啟動 /metrics 端點，每次請求即時讀取最新 .prom 檔。"""
+    import http.server  # 只有常駐模式需要，避免拖慢 collector/digest 啟動
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server 介面
+            if self.path.split("?", 1)[0] not in {"/", "/metrics"}:
+                self.send_error(404)
+                return
+            body = read_textfiles(directory).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            LOGGER.debug(format % args)
+
+    server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    LOGGER.info(f"指標端點啟動：http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="以 HTTP 提供 .prom 指標檔")
+    parser.add_argument(
+        "--dir",
+        type=pathlib.Path,
+        required=True,
+        help="collector/digest 的 --metrics-dir 目錄",
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="監聽埠號")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help="監聽位址")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+        datefmt="%H:%M:%S",
+        stream=sys.stdout,
+    )
+    server = serve(args.dir, args.port, args.host)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Collector 內部使用的精簡 entry 結構，只在序列化時轉成 dict。"""
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Tuple
+
+DEFAULT_CATEGORY = "未分類"
+DEFAULT_SOURCE = "未知來源"
+DEFAULT_TITLE = "無標題"
+
+# 相同的 tag 組合共用同一個 tuple，避免每筆 entry 各自複製一份 list
+_TAG_TUPLES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def intern_tags(tags: Iterable[str]) -> Tuple[str, ...]:
+    key = tuple(sys.intern(str(tag)) for tag in tags)
+    return _TAG_TUPLES.setdefault(key, key)
+
+
+@dataclass(slots=True)
+class Entry:
+    """單筆標準化資料；欄位名稱與 raw JSON 的 entries 欄位一致。"""
+
+    source_key: str
+    source: str
+    title: str
+    url: str
+    summary_raw: str
+    tags: Tuple[str, ...]
+    category: str
+    published_at: str = ""
+    fetched_at: str = ""
+    # published_at 的 UTC epoch 秒數；無法解析時為 None
+    published_epoch: int | None = None
+    # 完整摘要純文字（zlib + base64）；只在設定 summary.keep_full 時填入
+    summary_full: str = ""
+
+    @classmethod
+    def create(
+        cls,
+        *,
+        source_key: str,
+        source: str,
+        category: str,
+        tags: Iterable[str],
+        title: str,
+        url: str,
+        summary_raw: str,
+        published_at: str = "",
+        published_epoch: int | None = None,
+        summary_full: str = "",
+    ) -> "Entry":
+        """Build an entry with interned source/key/category strings and shared tags."""
+        return cls(
+            source_key=sys.intern(source_key),
+            source=sys.intern(source),
+            title=title,
+            url=url,
+            summary_raw=summary_raw,
+            tags=intern_tags(tags),
+            category=sys.intern(category or DEFAULT_CATEGORY),
+            published_at=published_at,
+            published_epoch=published_epoch,
+            summary_full=summary_full,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Entry":
+        """Rebuild an entry from a raw JSON dict, applying the same defaults as the collector."""
+        entry = cls.create(
+            source_key=data.get("source_key", "unknown"),
+            source=data.get("source", DEFAULT_SOURCE),
+            category=data.get("category", DEFAULT_CATEGORY),
+            tags=data.get("tags", ()),
+            title=data.get("title", DEFAULT_TITLE),
+            url=data.get("url", ""),
+            summary_raw=data.get("summary_raw", ""),
+            published_at=data.get("published_at", ""),
+            published_epoch=data.get("published_epoch"),
+            summary_full=data.get("summary_full", ""),
+        )
+        entry.fetched_at = data.get("fetched_at", "")
+        return entry
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "source_key": self.source_key,
+            "source": self.source,
+            "title": self.title,
+            "url": self.url,
+            "summary_raw": self.summary_raw,
+            "tags": list(self.tags),
+            "category": self.category,
+            "fetched_at": self.fetched_at,
+            "published_at": self.published_at,
+            "published_epoch": self.published_epoch,
+        }
+        if self.summary_full:
+            data["summary_full"] = self.summary_full
+        return data
+
+
+def json_default(obj: Any) -> Any:
+    """``json.dumps(default=...)`` hook：遇到 Entry 時才轉為 dict。"""
+    if isinstance(obj, Entry):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
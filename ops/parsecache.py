@@ -0,0 +1,161 @@
+"""RSS/Atom 解析結果快取：以回應 body 雜湊 + 解析器版本為鍵，相同 body 不再解析。
+
+許多 feed 在兩次執行之間回傳完全相同的 bytes（即使伺服器不支援 conditional GET）。
+命中時跳過 ``feedparser.parse`` 與時間正規化、摘要清理，只由快取的成品列建立實際收錄的 entry。
+快取的是上次實際掃描過的前綴：依 feed 順序、到 ``limit`` 額滿為止的項目（含因過舊而略過、
+未清理摘要的項目），不存原始 HTML，檔案大小隨輸出筆數而非 feed 長度成長。前綴不足以涵蓋
+本次的 ``limit``/截止時間（例如共用 URL 的來源 limit 較大，或截止時間變早）時視為未命中並重新解析。
+以 LRU 限制筆數，整份存成一個 JSON 檔。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+import htmltext
+
+# 解析/正規化/摘要清理規則或 Item 欄位改變時遞增，使舊的快取失效
+PARSER_VERSION = 3
+MAX_ENTRIES = 256
+
+
+def cache_key(body: bytes, summary: htmltext.SummaryConfig) -> str:
+    """Body hash plus everything else that changes the parsed items."""
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return f"v{PARSER_VERSION}:{summary.max_chars}:{int(summary.keep_full)}:{digest}"
+
+
+@dataclass
+class Item:
+    """One finished feed item: normalized time and cleaned summary."""
+
+    title: str
+    url: str
+    published_at: str = ""
+    published_epoch: int | None = None
+    # 因早於截止時間而略過、從未清理時為 None
+    summary: str | None = None
+    summary_full: str = ""
+
+    def to_row(self) -> List[Any]:
+        return [
+            self.title,
+            self.url,
+            self.published_at,
+            self.published_epoch,
+            self.summary,
+            self.summary_full,
+        ]
+
+
+@dataclass
+class Feed:
+    """The scanned prefix of one feed body; ``total`` is the number of items in the body."""
+
+    total: int
+    items: List[Item] = field(default_factory=list)
+
+    def select(
+        self, limit: int, too_old: Callable[[int | None], bool]
+    ) -> Tuple[List[Item], int] | None:
+        """``(kept, too_old_count)`` like a fresh scan, or None when the prefix does not cover it."""
+        kept: List[Item] = []
+        skipped = 0
+        for item in self.items:
+            if len(kept) >= limit:
+                return kept, skipped
+            if too_old(item.published_epoch):
+                skipped += 1
+                continue
+            if item.summary is None:
+                return None
+            kept.append(item)
+        if len(kept) >= limit or len(self.items) >= self.total:
+            return kept, skipped
+        return None
+
+
+class ParseCache:
+    """LRU：``get`` 命中時移到最新，``put`` 超過 ``max_entries`` 時淘汰最久未用的項目。"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Feed]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @classmethod
+    def load(cls, path: pathlib.Path, max_entries: int = MAX_ENTRIES) -> "ParseCache":
+        """A missing, corrupt or outdated file starts empty."""
+        cache = cls(max_entries)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cache
+        if not isinstance(data, dict) or data.get("version") != PARSER_VERSION:
+            return cache
+        try:
+            for key, total, rows in data.get("entries", []):
+                cache._items[key] = Feed(int(total), [Item(*row) for row in rows])
+        except (TypeError, ValueError):
+            return cls(max_entries)
+        while len(cache._items) > max_entries:
+            cache._items.popitem(last=False)
+        return cache
+
+    def save(self, path: pathlib.Path) -> None:
+        # 依 LRU 順序（最舊在前）存檔，下次載入後淘汰順序不變
+        document = {
+            "version": PARSER_VERSION,
+            "entries": [
+                [key, feed.total, [item.to_row() for item in feed.items]]
+                for key, feed in self._items.items()
+            ],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(document, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> Feed | None:
+        """Plain lookup; does not touch the LRU order or the statistics."""
+        return self._items.get(key)
+
+    def select(
+        self, key: str, limit: int, too_old: Callable[[int | None], bool]
+    ) -> Tuple[List[Item], int] | None:
+        """``Feed.select`` on the cached prefix; a missing or too short prefix counts as a miss."""
+        feed = self._items.get(key)
+        selected = feed.select(limit, too_old) if feed is not None else None
+        if selected is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return selected
+
+    def put(self, key: str, feed: Feed) -> None:
+        self._items[key] = feed
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._items),
+        }
@@ -0,0 +1,116 @@
+"""多團隊 digest 設定檔：feeds.yml 的 ``profiles`` 區塊。
+
+每個 profile 從同一份 raw 檔挑出自己的來源與分類，各自指定輸出格式、模板與輸出路徑。
+collector 只抓一次所有啟用的來源；digest 以 ``--profiles`` 在同一個行程內讀檔一次、
+依序 render 所有 profile，因此抓取成本只隨不重複的來源數增加，不隨團隊數增加。
+"""
+from __future__ import annotations
+
+import pathlib
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]*$")
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    # 空 tuple 表示不限制
+    sources: Tuple[str, ...] = ()
+    categories: Tuple[str, ...] = ()
+    exclude_categories: Tuple[str, ...] = ()
+    formats: Tuple[str, ...] = ("markdown",)
+    template: str | None = None
+    template_engine: str = "builtin"
+    # 可含 ``{date}``；未設定時為 ``out/<name>/digest-{date}.md``
+    output: str | None = None
+    top_k: int | None = None
+
+    def matches(self, entry: Dict[str, Any]) -> bool:
+        if self.sources and entry.get("source_key") not in self.sources:
+            return False
+        category = entry.get("category", "")
+        if self.categories and category not in self.categories:
+            return False
+        return category not in self.exclude_categories
+
+    def select(self, entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [entry for entry in entries if self.matches(entry)]
+
+    def output_path(self, out_dir: pathlib.Path, root: pathlib.Path, date: str) -> pathlib.Path:
+        if self.output is None:
+            return out_dir / self.name / f"digest-{date}.md"
+        return root / self.output.format(date=date)
+
+
+def _strings(section: Dict[str, Any], field: str, name: str) -> Tuple[str, ...]:
+    value = section.get(field) or []
+    if isinstance(value, str) or not isinstance(value, list):
+        raise ValueError(f"profile '{name}' 的 {field} 必須是字串列表")
+    return tuple(str(item) for item in value)
+
+
+def parse_profiles(config: Dict[str, Any]) -> List[Profile]:
+    """Profiles declared in a loaded feeds.yml; raises ValueError on malformed entries."""
+    section = config.get("profiles") or []
+    if not isinstance(section, list):
+        raise ValueError("'profiles' 必須是列表")
+    source_keys = {source.get("key") for source in config.get("sources") or []}
+    profiles: List[Profile] = []
+    seen: set[str] = set()
+    for idx, item in enumerate(section):
+        if not isinstance(item, dict) or not isinstance(item.get("name"), str):
+            raise ValueError(f"profile #{idx} 必須是含 name 的物件")
+        name = item["name"]
+        if not _NAME.match(name):
+            raise ValueError(f"profile 名稱 '{name}' 只能包含英數字、- 與 _")
+        if name in seen:
+            raise ValueError(f"profile '{name}' 重複")
+        seen.add(name)
+        unknown = [key for key in _strings(item, "sources", name) if key not in source_keys]
+        if unknown:
+            raise ValueError(f"profile '{name}' 引用了不存在的來源：{', '.join(unknown)}")
+        formats = _strings(item, "formats", name) or ("markdown",)
+        output = item.get("output")
+        if output is not None:
+            if not isinstance(output, str) or not output.endswith(".md"):
+                raise ValueError(f"profile '{name}' 的 output 必須是 .md 路徑")
+            try:
+                output.format(date="2000-01-01")
+            except (KeyError, IndexError, ValueError) as exc:
+                raise ValueError(f"profile '{name}' 的 output 只能使用 {{date}}") from exc
+        top_k = item.get("top_k")
+        if top_k is not None and (
+            isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 0
+        ):
+            raise ValueError(f"profile '{name}' 的 top_k 必須是非負整數")
+        template = item.get("template")
+        if template is not None and not isinstance(template, str):
+            raise ValueError(f"profile '{name}' 的 template 必須是路徑字串")
+        profiles.append(
+            Profile(
+                name=name,
+                sources=_strings(item, "sources", name),
+                categories=_strings(item, "categories", name),
+                exclude_categories=_strings(item, "exclude_categories", name),
+                formats=tuple(dict.fromkeys(formats)),
+                template=template,
+                template_engine=str(item.get("template_engine", "builtin")),
+                output=output,
+                top_k=top_k,
+            )
+        )
+    return profiles
+
+
+def choose(profiles: Sequence[Profile], names: Sequence[str]) -> List[Profile]:
+    """``names`` 為空時回傳全部；有不存在的名稱時 raise ValueError。"""
+    if not names:
+        return list(profiles)
+    by_name = {profile.name: profile for profile in profiles}
+    missing = [name for name in names if name not in by_name]
+    if missing:
+        raise ValueError(f"找不到 profile：{', '.join(missing)}")
+    return [by_name[name] for name in dict.fromkeys(names)]
@@ -0,0 +1,202 @@
+"""Digest entry 相關性評分與各分類 top-K 篩選。"""
+from __future__ import annotations
+
+import datetime as dt
+import functools
+import heapq
+import math
+import re
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Dict, List, Sequence
+
+import timeutil
+
+DEFAULT_HALF_LIFE_HOURS = 24.0
+DEFAULT_WEIGHTS = {"recency": 1.0, "coverage": 0.5}
+_TITLE_NOISE = re.compile(r"\W+")
+
+
+@functools.lru_cache(maxsize=1)
+def _numpy() -> ModuleType | None:
+    """NumPy 為選用依賴；未安裝時退回純 Python 計算。"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@dataclass
+class RankingConfig:
+    """feeds.yml 的 ``ranking`` 區塊與各來源 ``weight``。"""
+
+    half_life_hours: float = DEFAULT_HALF_LIFE_HOURS
+    weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_WEIGHTS))
+    tag_weights: Dict[str, float] = field(default_factory=dict)
+    keyword_weights: Dict[str, float] = field(default_factory=dict)
+    source_weights: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RankingConfig":
+        """Build from a loaded feeds.yml; raises ValueError on malformed values."""
+        section = config.get("ranking") or {}
+        if not isinstance(section, dict):
+            raise ValueError("'ranking' 必須是物件")
+
+        def weight_map(name: str) -> Dict[str, float]:
+            value = section.get(name) or {}
+            if not isinstance(value, dict):
+                raise ValueError(f"'ranking.{name}' 必須是物件")
+            try:
+                return {str(key): float(weight) for key, weight in value.items()}
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"'ranking.{name}' 的權重必須是數字") from exc
+
+        source_weights = weight_map("source_weights")
+        for source in config.get("sources", []):
+            if "weight" in source:
+                try:
+                    source_weights.setdefault(source["key"], float(source["weight"]))
+                except (TypeError, ValueError) as exc:
+                    raise ValueError(f"來源 '{source['key']}' 的 weight 必須是數字") from exc
+
+        try:
+            half_life = float(section.get("half_life_hours", DEFAULT_HALF_LIFE_HOURS))
+        except (TypeError, ValueError) as exc:
+            raise ValueError("'ranking.half_life_hours' 必須是數字") from exc
+        if half_life <= 0:
+            raise ValueError("'ranking.half_life_hours' 必須大於 0")
+
+        return cls(
+            half_life_hours=half_life,
+            weights={**DEFAULT_WEIGHTS, **weight_map("weights")},
+            tag_weights={key.casefold(): value for key, value in weight_map("tag_weights").items()},
+            keyword_weights={
+                key.casefold(): value for key, value in weight_map("keyword_weights").items()
+            },
+            source_weights=source_weights,
+        )
+
+
+# 已移至 timeutil，保留舊名稱供既有呼叫端使用
+parse_timestamp = timeutil.parse_timestamp
+
+
+def reference_timestamp(date: str) -> float:
+    """End of the digest day in UTC; falls back to now for non-ISO dates."""
+    try:
+        day = dt.date.fromisoformat(date)
+    except ValueError:
+        return dt.datetime.now(dt.timezone.utc).timestamp()
+    end = dt.datetime.combine(day + dt.timedelta(days=1), dt.time(), dt.timezone.utc)
+    return end.timestamp()
+
+
+def title_key(title: str) -> str:
+    return _TITLE_NOISE.sub(" ", title.casefold()).strip()
+
+
+def _signals(
+    entries: Sequence[Dict[str, Any]], config: RankingConfig, reference: float
+) -> Dict[str, List[float]]:
+    """單次掃描抽出各項訊號，之後再一次性（向量化）組合成分數。"""
+    sources_by_title: Dict[str, set[str]] = {}
+    keys: List[str] = []
+    for entry in entries:
+        key = title_key(entry.get("title", ""))
+        keys.append(key)
+        if key:
+            source_id = entry.get("source_key") or entry.get("source", "")
+            sources_by_title.setdefault(key, set()).add(source_id)
+
+    ages: List[float] = []
+    has_time: List[float] = []
+    coverage: List[float] = []
+    boosts: List[float] = []
+    source_weights: List[float] = []
+    for entry, key in zip(entries, keys):
+        published = timeutil.entry_epoch(entry)
+        ages.append(max(reference - published, 0.0) / 3600 if published is not None else 0.0)
+        has_time.append(1.0 if published is not None else 0.0)
+        coverage.append(float(len(sources_by_title.get(key, ())) - 1) if key else 0.0)
+
+        boost = sum(
+            config.tag_weights.get(str(tag).casefold(), 0.0) for tag in entry.get("tags", [])
+        )
+        if config.keyword_weights:
+            text = f"{entry.get('title', '')} {entry.get('summary_raw', '')}".casefold()
+            boost += sum(
+                weight for keyword, weight in config.keyword_weights.items() if keyword in text
+            )
+        boosts.append(boost)
+        source_weights.append(config.source_weights.get(entry.get("source_key", ""), 1.0))
+
+    return {
+        "ages": ages,
+        "has_time": has_time,
+        "coverage": coverage,
+        "boosts": boosts,
+        "source_weights": source_weights,
+    }
+
+
+def score_entries(
+    entries: Sequence[Dict[str, Any]], config: RankingConfig, reference: float
+) -> List[float]:
+    """score = source_weight × (w_recency·0.5^(age/half_life) + w_coverage·ln(1+coverage) + boosts)."""
+    if not entries:
+        return []
+    signals = _signals(entries, config, reference)
+    w_recency = config.weights.get("recency", 0.0)
+    w_coverage = config.weights.get("coverage", 0.0)
+
+    np = _numpy()
+    if np is not None:
+        ages = np.asarray(signals["ages"])
+        recency = np.power(0.5, ages / config.half_life_hours) * np.asarray(signals["has_time"])
+        coverage = np.log1p(np.asarray(signals["coverage"]))
+        scores = np.asarray(signals["source_weights"]) * (
+            w_recency * recency + w_coverage * coverage + np.asarray(signals["boosts"])
+        )
+        result: List[float] = scores.tolist()
+        return result
+
+    scores_list: List[float] = []
+    for age, has_time, cover, boost, weight in zip(
+        signals["ages"],
+        signals["has_time"],
+        signals["coverage"],
+        signals["boosts"],
+        signals["source_weights"],
+    ):
+        recency_score = has_time * 0.5 ** (age / config.half_life_hours)
+        scores_list.append(
+            weight * (w_recency * recency_score + w_coverage * math.log1p(cover) + boost)
+        )
+    return scores_list
+
+
+def select_top_k(
+    entries: Sequence[Dict[str, Any]], scores: Sequence[float], top_k: int | None
+) -> List[Dict[str, Any]]:
+    """Keep the ``top_k`` best entries per category, ordered by score (ties keep input order)."""
+    by_category: Dict[str, List[int]] = {}
+    for idx, entry in enumerate(entries):
+        by_category.setdefault(entry.get("category", "未分類") or "未分類", []).append(idx)
+
+    selected: List[Dict[str, Any]] = []
+    for indices in by_category.values():
+        if top_k:
+            best = heapq.nlargest(top_k, indices, key=lambda idx: (scores[idx], -idx))
+        else:
+            best = sorted(indices, key=lambda idx: (-scores[idx], idx))
+        selected.extend(entries[idx] for idx in best)
+    return selected
+
+
+def rank_entries(
+    entries: Sequence[Dict[str, Any]], config: RankingConfig, date: str, top_k: int | None
+) -> List[Dict[str, Any]]:
+    scores = score_entries(entries, config, reference_timestamp(date))
+    return select_top_k(entries, scores, top_k)
@@ -0,0 +1,345 @@
+"""Digest 輸出格式：一次分組成 DigestModel，再交給各 renderer 輸出。"""
+from __future__ import annotations
+
+import datetime as dt
+import html
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Protocol, TextIO, Tuple
+from xml.sax.saxutils import escape as xml_escape, quoteattr
+
+import htmltext
+import timeutil
+import trends
+
+DEFAULT_CATEGORY = "未分類"
+DEFAULT_SOURCE = "未知來源"
+SUMMARY_LIMIT = 200
+
+
+@dataclass
+class SourceGroup:
+    name: str
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class CategoryGroup:
+    name: str
+    sources: List[SourceGroup] = field(default_factory=list)
+
+
+@dataclass
+class DigestModel:
+    """分類 → 來源 → entries 的中介結構（皆已排序），所有 renderer 共用。"""
+
+    date: str
+    meta: Dict[str, Any] | None
+    categories: List[CategoryGroup]
+    entry_count: int
+    generated_at: dt.datetime = field(default_factory=lambda: dt.datetime.now().astimezone())
+    trends: List[trends.Burst] = field(default_factory=list)
+
+    def iter_entries(self) -> Iterator[Tuple[CategoryGroup, SourceGroup, Dict[str, Any]]]:
+        for category in self.categories:
+            for source in category.sources:
+                for entry in source.entries:
+                    yield category, source, entry
+
+
+def build_model(
+    entries: List[Dict[str, Any]],
+    date: str,
+    meta: Dict[str, Any] | None = None,
+    bursts: List[trends.Burst] | None = None,
+) -> DigestModel:
+    """Group entries by category then source in a single pass."""
+    by_category: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for entry in entries:
+        category = entry.get("category", DEFAULT_CATEGORY) or DEFAULT_CATEGORY
+        source = entry.get("source", DEFAULT_SOURCE)
+        by_category.setdefault(category, {}).setdefault(source, []).append(entry)
+
+    categories = [
+        CategoryGroup(
+            name=category,
+            sources=[
+                SourceGroup(name=source, entries=items)
+                for source, items in sorted(by_category[category].items())
+            ],
+        )
+        for category in sorted(by_category)
+    ]
+    return DigestModel(
+        date=date,
+        meta=meta,
+        categories=categories,
+        entry_count=len(entries),
+        trends=list(bursts or []),
+    )
+
+
+def meta_lines(meta: Dict[str, Any], entry_count: int) -> List[str]:
+    """摘要指標的各行文字（不含 Markdown/HTML 標記）。"""
+    lines: List[str] = []
+    raw_entries = meta.get("raw_entries")
+    unique_entries = meta.get("unique_entries", entry_count)
+    dedup_rate = meta.get("dedup_rate")
+    if raw_entries is not None or dedup_rate is not None:
+        dedup_text = (
+            f"{float(dedup_rate) * 100:.2f}%" if isinstance(dedup_rate, (int, float)) else "N/A"
+        )
+        if raw_entries is not None:
+            lines.append(f"去重率：{dedup_text}（原始 {raw_entries} → 去重 {unique_entries}）")
+        else:
+            lines.append(f"去重率：{dedup_text}")
+
+    filtered_entries = meta.get("filtered_entries")
+    if isinstance(filtered_entries, int) and filtered_entries:
+        lines.append(f"關鍵字過濾：排除 {filtered_entries} 筆")
+
+    category_counts = meta.get("category_counts") or {}
+    if isinstance(category_counts, dict) and category_counts:
+        parts = [f"{cat} {count} 筆" for cat, count in sorted(category_counts.items())]
+        lines.append(f"分類統計：{' / '.join(parts)}")
+
+    total_sources = meta.get("total_sources")
+    failed_count = meta.get("failed_source_count")
+    if isinstance(total_sources, int) and isinstance(failed_count, int):
+        success = total_sources - failed_count
+        lines.append(f"來源健康度：成功 {success} / {total_sources}（失敗 {failed_count}）")
+
+    failed_sources = meta.get("failed_sources") or []
+    if isinstance(failed_sources, list) and failed_sources:
+        failed_names = [
+            item.get("name") or item.get("key", DEFAULT_SOURCE)
+            for item in failed_sources
+            if isinstance(item, dict)
+        ]
+        if failed_names:
+            lines.append(f"失敗來源：{', '.join(failed_names)}")
+    return lines
+
+
+def trend_lines(bursts: List[trends.Burst]) -> List[str]:
+    return [
+        f"{burst.label}：今日 {burst.count} 筆（前 {burst.history_days} 日平均 {burst.mean:.1f}，"
+        f"z={burst.zscore:.1f}）"
+        for burst in bursts
+    ]
+
+
+def truncate_summary(item: Dict[str, Any]) -> str:
+    summary_full = item.get("summary_raw", "")
+    if "<" in summary_full:
+        # 摘要清理之前產生的 raw 檔仍是 HTML，只解析到顯示所需的長度
+        summary_full = htmltext.html_to_text(summary_full, SUMMARY_LIMIT + 1).text
+    suffix = "..." if len(summary_full) > SUMMARY_LIMIT else ""
+    return f"{summary_full[:SUMMARY_LIMIT]}{suffix}"
+
+
+def footer_text(model: DigestModel) -> str:
+    return f"本摘要由自動化系統產生於 {model.generated_at:%Y-%m-%d %H:%M}"
+
+
+def iso_timestamp(entry: Dict[str, Any]) -> str | None:
+    """entry 的發布時間轉成 RFC 3339（UTC）；無法解析時回傳 None。"""
+    timestamp = timeutil.entry_epoch(entry)
+    if timestamp is None:
+        return None
+    return timeutil.format_utc(timestamp)
+
+
+class Renderer(Protocol):
+    name: str
+    extension: str
+
+    def render(self, model: DigestModel, out: TextIO) -> None: ...
+
+
+def write_entry(item: Dict[str, Any], source: str, out: TextIO) -> None:
+    title = item.get("title", "無標題")
+    url = item.get("url", "")
+    summary = truncate_summary(item)
+    published = item.get("published_at", "未知時間")
+    tags = " ".join(f"#{tag}" for tag in item.get("tags", []))
+
+    out.write(f"#### [{title}]({url})\n" if url else f"#### {title}\n")
+    out.write(f"發布於：{published}\n\n")
+    if summary:
+        out.write(f"{summary}\n\n")
+    out.write(f"**來源**：{source}\n")
+    days = item.get("days", 1)
+    if days > 1:
+        out.write(f"**出現天數**：{days}\n")
+    if tags:
+        out.write(f"**標籤**：{tags}\n")
+    out.write("\n---\n\n")
+
+
+class MarkdownRenderer:
+    name = "markdown"
+    extension = ".md"
+
+    def render(self, model: DigestModel, out: TextIO) -> None:
+        self.write_header(model, out)
+        self.write_sections(model, out)
+        self.write_footer(model, out)
+
+    @staticmethod
+    def write_sections(model: DigestModel, out: TextIO) -> None:
+        write = out.write
+        for category in model.categories:
+            write(f"## {category.name}\n\n")
+            for source in category.sources:
+                write(f"### {source.name}\n\n")
+                for item in source.entries:
+                    write_entry(item, source.name, out)
+
+    @staticmethod
+    def write_header(model: DigestModel, out: TextIO, title_suffix: str = "") -> None:
+        write = out.write
+        write(f"# 技術資訊摘要 - {model.date}{title_suffix}\n\n")
+        if model.meta:
+            write("## 摘要指標\n\n")
+            for line in meta_lines(model.meta, model.entry_count):
+                write(f"- {line}\n")
+            write("\n")
+        if model.trends:
+            write("## 趨勢\n\n")
+            for line in trend_lines(model.trends):
+                write(f"- {line}\n")
+            write("\n")
+
+    @staticmethod
+    def write_footer(model: DigestModel, out: TextIO) -> None:
+        out.write(f"*{footer_text(model)}*")
+
+
+class HtmlRenderer:
+    name = "html"
+    extension = ".html"
+
+    def render(self, model: DigestModel, out: TextIO) -> None:
+        write = out.write
+        title = html.escape(f"技術資訊摘要 - {model.date}")
+        write('<!DOCTYPE html>\n<html lang="zh-Hant">\n<head>\n<meta charset="utf-8">\n')
+        write(f"<title>{title}</title>\n</head>\n<body>\n<h1>{title}</h1>\n")
+        if model.meta:
+            write('<section class="metrics">\n<h2>摘要指標</h2>\n<ul>\n')
+            for line in meta_lines(model.meta, model.entry_count):
+                write(f"<li>{html.escape(line)}</li>\n")
+            write("</ul>\n</section>\n")
+        if model.trends:
+            write('<section class="trends">\n<h2>趨勢</h2>\n<ul>\n')
+            for line in trend_lines(model.trends):
+                write(f"<li>{html.escape(line)}</li>\n")
+            write("</ul>\n</section>\n")
+
+        for category in model.categories:
+            write(f'<section class="category">\n<h2>{html.escape(category.name)}</h2>\n')
+            for source in category.sources:
+                write(f"<h3>{html.escape(source.name)}</h3>\n")
+                for item in source.entries:
+                    self._write_entry(item, out)
+            write("</section>\n")
+
+        write(f"<footer><em>{html.escape(footer_text(model))}</em></footer>\n</body>\n</html>\n")
+
+    @staticmethod
+    def _write_entry(item: Dict[str, Any], out: TextIO) -> None:
+        write = out.write
+        title = html.escape(item.get("title", "無標題"))
+        url = item.get("url", "")
+        write("<article>\n")
+        if url:
+            write(f'<h4><a href="{html.escape(url, quote=True)}">{title}</a></h4>\n')
+        else:
+            write(f"<h4>{title}</h4>\n")
+        published = html.escape(item.get("published_at", "未知時間"))
+        write(f'<p class="published">發布於：{published}</p>\n')
+        summary = truncate_summary(item)
+        if summary:
+            write(f"<p>{html.escape(summary)}</p>\n")
+        tags = " ".join(f"#{tag}" for tag in item.get("tags", []))
+        if tags:
+            write(f'<p class="tags">{html.escape(tags)}</p>\n')
+        write("</article>\n")
+
+
+class JsonFeedRenderer:
+    """JSON Feed 1.1；分類與來源放在 ``_digest`` 擴充欄位。"""
+
+    name = "jsonfeed"
+    extension = ".json"
+
+    def render(self, model: DigestModel, out: TextIO) -> None:
+        items = []
+        for idx, (category, source, entry) in enumerate(model.iter_entries()):
+            url = entry.get("url", "")
+            item: Dict[str, Any] = {
+                "id": url or f"{model.date}-{idx}",
+                "title": entry.get("title", "無標題"),
+                "content_text": entry.get("summary_raw", ""),
+            }
+            if url:
+                item["url"] = url
+            published = iso_timestamp(entry)
+            if published:
+                item["date_published"] = published
+            if entry.get("tags"):
+                item["tags"] = list(entry["tags"])
+            item["_digest"] = {"category": category.name, "source": source.name}
+            items.append(item)
+
+        feed = {
+            "version": "https://jsonfeed.org/version/1.1",
+            "title": f"技術資訊摘要 - {model.date}",
+            "items": items,
+        }
+        json.dump(feed, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+
+
+class AtomRenderer:
+    name = "atom"
+    extension = ".xml"
+
+    def render(self, model: DigestModel, out: TextIO) -> None:
+        write = out.write
+        updated = model.generated_at.astimezone(dt.timezone.utc).isoformat()
+        write('<?xml version="1.0" encoding="utf-8"?>\n')
+        write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        write(f"  <id>urn:tech-digest:{xml_escape(model.date)}</id>\n")
+        write(f"  <title>{xml_escape(f'技術資訊摘要 - {model.date}')}</title>\n")
+        write(f"  <updated>{updated}</updated>\n")
+        for idx, (category, source, entry) in enumerate(model.iter_entries()):
+            url = entry.get("url", "")
+            write("  <entry>\n")
+            write(f"    <id>{xml_escape(url or f'urn:tech-digest:{model.date}:{idx}')}</id>\n")
+            write(f"    <title>{xml_escape(entry.get('title', '無標題'))}</title>\n")
+            if url:
+                write(f"    <link href={quoteattr(url)}/>\n")
+            write(f"    <updated>{iso_timestamp(entry) or updated}</updated>\n")
+            write(f"    <author><name>{xml_escape(source.name)}</name></author>\n")
+            write(f"    <category term={quoteattr(category.name)}/>\n")
+            for tag in entry.get("tags", []):
+                write(f"    <category term={quoteattr(str(tag))}/>\n")
+            summary = entry.get("summary_raw", "")
+            if summary:
+                write(f"    <summary>{xml_escape(summary)}</summary>\n")
+            write("  </entry>\n")
+        write("</feed>\n")
+
+
+RENDERERS: Dict[str, Renderer] = {}
+
+
+def register(renderer: Renderer) -> Renderer:
+    """Add a renderer under ``renderer.name`` (later registrations win)."""
+    RENDERERS[renderer.name] = renderer
+    return renderer
+
+
+for _renderer in (MarkdownRenderer(), HtmlRenderer(), JsonFeedRenderer(), AtomRenderer()):
+    register(_renderer)
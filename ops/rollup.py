@@ -0,0 +1,183 @@
+"""多日彙總：每個 raw JSON 旁快取一份精簡 aggregate，週報/區間報只合併 aggregate。"""
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import heapq
+import json
+import os
+import pathlib
+from collections import Counter
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, List, Sequence
+
+import ranking
+
+# 調整 aggregate 結構或評分方式時遞增，使舊快取失效
+AGGREGATE_VERSION = 1
+TOP_PER_DAY = 20
+DEFAULT_TOP_K = 10
+MAX_RANGE_DAYS = 366
+# write_entry 只顯示前 200 字，並以長度是否超過 200 決定加上 "..."
+SUMMARY_CHARS = 201
+ENTRY_FIELDS = ("source_key", "source", "title", "url", "tags", "category", "published_at")
+
+
+def aggregate_path(raw_path: pathlib.Path) -> pathlib.Path:
+    """``out/raw-2025-12-22.json`` -> ``out/raw-2025-12-22.agg.json``."""
+    return raw_path.with_name(f"{raw_path.stem}.agg.json")
+
+
+def parse_range(text: str) -> List[str]:
+    """Expand ``START..END`` (inclusive, ISO dates) to a list of dates."""
+    start_text, sep, end_text = text.partition("..")
+    if not sep:
+        raise ValueError(f"預期格式為 START..END：{text}")
+    start = dt.date.fromisoformat(start_text.strip())
+    end = dt.date.fromisoformat(end_text.strip())
+    if end < start:
+        raise ValueError(f"結束日期早於開始日期：{text}")
+    days = (end - start).days + 1
+    if days > MAX_RANGE_DAYS:
+        raise ValueError(f"區間最多 {MAX_RANGE_DAYS} 天（目前 {days} 天）")
+    return [(start + dt.timedelta(days=offset)).isoformat() for offset in range(days)]
+
+
+def week_ending(date: str) -> List[str]:
+    """The seven days ending at ``date`` (inclusive)."""
+    end = dt.date.fromisoformat(date)
+    return [(end - dt.timedelta(days=offset)).isoformat() for offset in range(6, -1, -1)]
+
+
+def config_fingerprint(config: ranking.RankingConfig) -> str:
+    data = json.dumps(asdict(config), sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def cluster_id(entry: Dict[str, Any]) -> str:
+    """同標題（忽略大小寫與標點）視為同一主題；無標題時退回 URL。"""
+    key = ranking.title_key(entry.get("title", "")) or entry.get("url", "")
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def build_aggregate(
+    entries: Sequence[Dict[str, Any]],
+    meta: Dict[str, Any],
+    date: str,
+    config: ranking.RankingConfig,
+    stamp: str,
+) -> Dict[str, Any]:
+    """Summarize one day: counts, cluster ids and the best entries per category."""
+    scores = ranking.score_entries(entries, config, ranking.reference_timestamp(date))
+    by_category: Dict[str, List[int]] = {}
+    clusters: Counter[str] = Counter()
+    cluster_ids: List[str] = []
+    for idx, entry in enumerate(entries):
+        by_category.setdefault(entry.get("category", "未分類") or "未分類", []).append(idx)
+        cid = cluster_id(entry)
+        cluster_ids.append(cid)
+        clusters[cid] += 1
+
+    top: List[Dict[str, Any]] = []
+    for indices in by_category.values():
+        for idx in heapq.nlargest(TOP_PER_DAY, indices, key=lambda i: (scores[i], -i)):
+            entry = entries[idx]
+            item = {field: entry.get(field, "") for field in ENTRY_FIELDS}
+            item["tags"] = list(entry.get("tags", []))
+            item["summary_raw"] = entry.get("summary_raw", "")[:SUMMARY_CHARS]
+            item["score"] = round(scores[idx], 6)
+            item["cluster"] = cluster_ids[idx]
+            top.append(item)
+
+    failed_count = meta.get("failed_source_count")
+    return {
+        "version": AGGREGATE_VERSION,
+        "date": date,
+        "stamp": stamp,
+        "config": config_fingerprint(config),
+        "entries": len(entries),
+        "raw_entries": meta.get("raw_entries", len(entries)),
+        "failed_source_count": failed_count if isinstance(failed_count, int) else 0,
+        "category_counts": dict(
+            sorted(Counter(item.get("category", "未分類") or "未分類" for item in entries).items())
+        ),
+        "source_counts": dict(
+            sorted(Counter(item.get("source", "未知來源") for item in entries).items())
+        ),
+        "clusters": dict(clusters),
+        "top": top,
+    }
+
+
+def is_fresh(aggregate: Dict[str, Any], stamp: str, fingerprint: str) -> bool:
+    return (
+        aggregate.get("version") == AGGREGATE_VERSION
+        and aggregate.get("stamp") == stamp
+        and aggregate.get("config") == fingerprint
+    )
+
+
+def read_aggregate(path: pathlib.Path) -> Dict[str, Any] | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def write_aggregate(path: pathlib.Path, aggregate: Dict[str, Any]) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(aggregate, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _rollup_key(item: Dict[str, Any]) -> tuple[int, float]:
+    # 跨多日出現的主題優先，其次看單日最高分
+    return item["days"], item["score"]
+
+
+def merge_aggregates(
+    aggregates: Iterable[Dict[str, Any]], dates: Sequence[str], top_k: int | None
+) -> Dict[str, Any]:
+    """Merge daily aggregates; a cluster seen on several days keeps its best-scoring entry."""
+    category_counts: Counter[str] = Counter()
+    cluster_days: Counter[str] = Counter()
+    best: Dict[str, Dict[str, Any]] = {}
+    covered: List[str] = []
+    entries = raw_entries = failed = 0
+    for aggregate in aggregates:
+        covered.append(aggregate["date"])
+        entries += aggregate.get("entries", 0)
+        raw_entries += aggregate.get("raw_entries", 0)
+        failed += aggregate.get("failed_source_count", 0)
+        category_counts.update(aggregate.get("category_counts", {}))
+        cluster_days.update(aggregate.get("clusters", {}).keys())
+        for item in aggregate.get("top", []):
+            current = best.get(item["cluster"])
+            if current is None or item["score"] > current["score"]:
+                best[item["cluster"]] = item
+
+    by_category: Dict[str, List[Dict[str, Any]]] = {}
+    for cid, item in best.items():
+        by_category.setdefault(item.get("category") or "未分類", []).append(
+            {**item, "days": cluster_days[cid]}
+        )
+    top: Dict[str, List[Dict[str, Any]]] = {}
+    for category, items in by_category.items():
+        if top_k:
+            top[category] = heapq.nlargest(top_k, items, key=_rollup_key)
+        else:
+            top[category] = sorted(items, key=_rollup_key, reverse=True)
+
+    seen = set(covered)
+    return {
+        "dates": list(dates),
+        "covered": covered,
+        "missing": [date for date in dates if date not in seen],
+        "entries": entries,
+        "raw_entries": raw_entries,
+        "failed_source_count": failed,
+        "category_counts": dict(sorted(category_counts.items())),
+        "recurring_clusters": sum(1 for days in cluster_days.values() if days > 1),
+        "top": top,
+    }
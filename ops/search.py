@@ -0,0 +1,374 @@
+"""歷史 raw JSON 的全文檢索：SQLite FTS5 + 中文 bigram 斷詞。
+
+FTS5 內建的 unicode61 斷詞會把整串中文當成一個詞，因此寫入與查詢前先在 Python 端
+把中日韓文字切成重疊的 bigram（「語言模型」→「語言 言模 模型」），英數字則保留整個單字。
+每個 raw 檔只在內容改變（mtime/大小不同）時重新索引，collector 每次寫檔後會呼叫 ``index_file``。
+
+用法：python ops/search.py 語言模型 --since 2025-12-01 --category news
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import logging
+import pathlib
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+import logutil
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+OUT_DIR = ROOT / "out"
+RAW_PREFIX = "raw"
+# 斷詞規則或資料表結構改變時遞增，舊索引會整份重建
+SCHEMA_VERSION = 1
+DEFAULT_LIMIT = 20
+# bm25 欄位權重：title, summary, tags, source
+COLUMN_WEIGHTS = (4.0, 1.0, 2.0, 0.5)
+LOGGER = logging.getLogger("search")
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_CJK_CHAR = re.compile(f"[{_CJK}]")
+_WORD = re.compile(rf"([{_CJK}]+)|[^\W{_CJK}]+")
+_RAW_DATE = re.compile(rf"^{RAW_PREFIX}-(\d{{4}}-\d{{2}}-\d{{2}})\.json$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    published_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_date ON documents(date);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, summary, tags, source, tokenize = 'unicode61'
+);
+CREATE TABLE IF NOT EXISTS indexed_files (
+    date TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    stamp TEXT NOT NULL,
+    entries INTEGER NOT NULL
+);
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """英數字整字（小寫），連續中日韓文字切成 bigram；單一個字則保留原字。"""
+    tokens: List[str] = []
+    for match in _WORD.finditer(text):
+        run = match.group(1)
+        if run is None:
+            tokens.append(match.group(0).casefold())
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[idx:idx + 2] for idx in range(len(run) - 1))
+    return tokens
+
+
+def build_query(text: str) -> str:
+    """Turn user input into an FTS5 query: every word must match, CJK runs as bigram phrases.
+
+    結尾為 ``*`` 的英文單字做前綴比對（``kube*``）。沒有可搜尋的詞時回傳空字串。
+    """
+    clauses: List[str] = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        tokens = tokenize(word)
+        if not tokens:
+            continue
+        phrase = '"' + " ".join(token.replace('"', '""') for token in tokens) + '"'
+        if prefix and not _CJK_CHAR.match(tokens[-1]):
+            phrase += " *"
+        clauses.append(phrase)
+    return " AND ".join(clauses)
+
+
+def store_path(raw_dir: pathlib.Path) -> pathlib.Path:
+    return raw_dir / "search.sqlite3"
+
+
+def remove_store(path: pathlib.Path) -> None:
+    """Delete the database together with its WAL and shared-memory files."""
+    for target in (path, path.with_name(f"{path.name}-wal"), path.with_name(f"{path.name}-shm")):
+        target.unlink(missing_ok=True)
+
+
+def connect(path: pathlib.Path) -> sqlite3.Connection:
+    """Open (and create or migrate) the index database."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        with conn:
+            conn.executescript(
+                "DROP TABLE IF EXISTS documents; DROP TABLE IF EXISTS documents_fts;"
+                "DROP TABLE IF EXISTS indexed_files;"
+            )
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def file_stamp(path: pathlib.Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def load_raw_entries(path: pathlib.Path) -> List[Dict[str, Any]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    entries = data.get("entries", []) if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError(f"{path} 的 entries 不是列表")
+    return [entry for entry in entries if isinstance(entry, dict)]
+
+
+def replace_day(
+    conn: sqlite3.Connection,
+    date: str,
+    entries: Iterable[Dict[str, Any]],
+    path: pathlib.Path,
+    stamp: str,
+) -> int:
+    """Replace everything indexed for ``date`` with ``entries`` in one transaction."""
+    count = 0
+    with conn:
+        delete_documents(conn, date)
+        for entry in entries:
+            title = str(entry.get("title", "") or "")
+            source = str(entry.get("source", "") or "")
+            tags = " ".join(str(tag) for tag in entry.get("tags", []) or [])
+            cursor = conn.execute(
+                "INSERT INTO documents (date, category, source, title, url, published_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    date,
+                    str(entry.get("category", "") or ""),
+                    source,
+                    title,
+                    str(entry.get("url", "") or ""),
+                    str(entry.get("published_at", "") or ""),
+                ),
+            )
+            conn.execute(
+                "INSERT INTO documents_fts (rowid, title, summary, tags, source) VALUES (?, ?, ?, ?, ?)",
+                (
+                    cursor.lastrowid,
+                    " ".join(tokenize(title)),
+                    " ".join(tokenize(str(entry.get("summary_raw", "") or ""))),
+                    " ".join(tokenize(tags)),
+                    " ".join(tokenize(source)),
+                ),
+            )
+            count += 1
+        conn.execute(
+            "INSERT OR REPLACE INTO indexed_files (date, path, stamp, entries) VALUES (?, ?, ?, ?)",
+            (date, str(path), stamp, count),
+        )
+    return count
+
+
+def delete_documents(conn: sqlite3.Connection, date: str) -> None:
+    """Delete the rows of ``date`` from both tables; the caller owns the transaction."""
+    stale = [row[0] for row in conn.execute("SELECT id FROM documents WHERE date = ?", (date,))]
+    conn.executemany("DELETE FROM documents_fts WHERE rowid = ?", ((rowid,) for rowid in stale))
+    conn.execute("DELETE FROM documents WHERE date = ?", (date,))
+
+
+def drop_day(conn: sqlite3.Connection, date: str) -> None:
+    """Forget a date whose raw file no longer exists."""
+    with conn:
+        delete_documents(conn, date)
+        conn.execute("DELETE FROM indexed_files WHERE date = ?", (date,))
+
+
+def index_file(
+    raw_path: pathlib.Path, date: str, db_path: pathlib.Path | None = None
+) -> int | None:
+    """Index one raw JSON unless it is unchanged since the last run.
+
+    回傳寫入筆數；未變更時回傳 None。索引預設放在 raw 檔旁的 ``search.sqlite3``。
+    """
+    stamp = file_stamp(raw_path)
+    conn = connect(db_path or store_path(raw_path.parent))
+    try:
+        row = conn.execute("SELECT stamp FROM indexed_files WHERE date = ?", (date,)).fetchone()
+        if row is not None and row[0] == stamp:
+            return None
+        return replace_day(conn, date, load_raw_entries(raw_path), raw_path, stamp)
+    finally:
+        conn.close()
+
+
+def raw_files(raw_dir: pathlib.Path) -> Iterator[tuple[str, pathlib.Path]]:
+    for path in sorted(raw_dir.glob(f"{RAW_PREFIX}-*.json")):
+        match = _RAW_DATE.match(path.name)
+        if match:
+            yield match.group(1), path
+
+
+def sync(conn: sqlite3.Connection, raw_dir: pathlib.Path) -> int:
+    """Index raw files that are new or changed since they were indexed; returns files indexed.
+
+    raw 檔已刪除的日期同時從索引移除，不再出現在搜尋結果中。
+    """
+    known = dict(conn.execute("SELECT date, stamp FROM indexed_files"))
+    files = list(raw_files(raw_dir))
+    for date in sorted(set(known) - {date for date, _path in files}):
+        drop_day(conn, date)
+        LOGGER.info(f"{date} 的 raw 檔已不存在，自索引移除")
+    indexed = 0
+    for date, path in files:
+        stamp = file_stamp(path)
+        if known.get(date) == stamp:
+            continue
+        try:
+            entries = load_raw_entries(path)
+        except (OSError, ValueError) as exc:
+            LOGGER.warning(f"略過無法讀取的檔案 {path}：{exc}")
+            continue
+        replace_day(conn, date, entries, path, stamp)
+        indexed += 1
+    return indexed
+
+
+@dataclass
+class Hit:
+    date: str
+    category: str
+    source: str
+    title: str
+    url: str
+    published_at: str
+    score: float
+
+
+def search(
+    conn: sqlite3.Connection,
+    text: str,
+    since: str | None = None,
+    until: str | None = None,
+    categories: Sequence[str] = (),
+    sources: Sequence[str] = (),
+    limit: int = DEFAULT_LIMIT,
+) -> List[Hit]:
+    """bm25 ranking (title weighted highest), newer first on ties; one hit per URL."""
+    query = build_query(text)
+    if not query:
+        return []
+    weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+    sql = [
+        "SELECT d.date, d.category, d.source, d.title, d.url, d.published_at,",
+        f"bm25(documents_fts, {weights}) AS score",
+        "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid",
+        "WHERE documents_fts MATCH ?",
+    ]
+    params: List[Any] = [query]
+    if since:
+        sql.append("AND d.date >= ?")
+        params.append(since)
+    if until:
+        sql.append("AND d.date <= ?")
+        params.append(until)
+    for column, values in (("category", categories), ("source", sources)):
+        if values:
+            sql.append(f"AND d.{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+    sql.append("ORDER BY score, d.date DESC")
+
+    hits: List[Hit] = []
+    seen = set()
+    # 同一篇文章可能連續幾天出現在 raw 檔中，只保留排名最前（通常是最新）的一筆
+    for row in conn.execute(" ".join(sql), params):
+        hit = Hit(*row)
+        key = hit.url or (hit.source, hit.title)
+        if key in seen:
+            continue
+        seen.add(key)
+        hits.append(hit)
+        if len(hits) >= limit:
+            break
+    return hits
+
+
+def iso_date(value: str) -> str:
+    try:
+        return dt.date.fromisoformat(value).isoformat()
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"日期格式應為 YYYY-MM-DD：{value}") from exc
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="搜尋歷史 raw JSON（SQLite FTS5 全文索引）")
+    parser.add_argument("query", nargs="+", help="關鍵字；多個詞需同時符合，英文結尾加 * 為前綴比對")
+    parser.add_argument("--since", type=iso_date, help="起始日期（含）")
+    parser.add_argument("--until", type=iso_date, help="結束日期（含）")
+    parser.add_argument("--category", action="append", default=[], help="只搜尋此分類（可重複）")
+    parser.add_argument("--source", action="append", default=[], help="只搜尋此來源名稱（可重複）")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="最多顯示幾筆")
+    parser.add_argument(
+        "--raw-dir",
+        type=pathlib.Path,
+        default=OUT_DIR,
+        help="raw JSON 與索引所在目錄（預設：out/）",
+    )
+    parser.add_argument("--reindex", action="store_true", help="捨棄現有索引並全部重建")
+    parser.add_argument("--json", action="store_true", help="以 JSON lines 輸出結果")
+    parser.add_argument("--verbose", "-v", action="store_true", help="顯示 DEBUG 級別日誌")
+    return parser.parse_args(argv)
+
+
+def format_hit(hit: Hit) -> str:
+    return f"{hit.date}  [{hit.category}] {hit.title}\n            {hit.url or '-'}（{hit.source}）"
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    logutil.setup_logging(verbose=args.verbose)
+
+    db_path = store_path(args.raw_dir)
+    if args.reindex:
+        remove_store(db_path)
+    if not db_path.exists() and not any(True for _ in raw_files(args.raw_dir)):
+        LOGGER.error(f"{args.raw_dir} 沒有可索引的 raw JSON")
+        sys.exit(2)
+
+    try:
+        conn = connect(db_path)
+        started = time.perf_counter()
+        indexed = sync(conn, args.raw_dir)
+        if indexed:
+            LOGGER.debug(f"補索引 {indexed} 個檔案（{time.perf_counter() - started:.2f}s）")
+        started = time.perf_counter()
+        hits = search(
+            conn,
+            " ".join(args.query),
+            since=args.since,
+            until=args.until,
+            categories=args.category,
+            sources=args.source,
+            limit=args.limit,
+        )
+    except sqlite3.Error as exc:
+        LOGGER.error(f"搜尋失敗：{exc}")
+        sys.exit(1)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logutil.stop_logging()
+
+    for hit in hits:
+        print(json.dumps(asdict(hit), ensure_ascii=False) if args.json else format_hit(hit))
+    if not args.json:
+        print(f"共 {len(hits)} 筆（{elapsed_ms:.1f} ms）")
+
+
+if __name__ == "__main__":
+    main()
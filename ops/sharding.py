@@ -0,0 +1,168 @@
+"""多節點分片收集：``--shard i/N`` 以一致性雜湊分配來源，``--merge-shards`` 合併結果。
+
+來源依 ``source["key"]`` 落在雜湊環上，N 改變時只有約 1/N 的來源換到其他分片，
+各節點的 high-water mark 與快取大多仍然有效。分片輸出為
+``out/shards/raw-YYYY-MM-DD.shard-i-of-N.json``，不會被 digest/search 的 raw 檔樣式誤讀。
+"""
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import functools
+import hashlib
+import pathlib
+import re
+from collections import Counter
+from typing import Any, Dict, List, Sequence, Tuple
+
+# 每個分片在環上的虛擬節點數；越多分配越平均
+VIRTUAL_NODES = 64
+_SHARD = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+_SHARD_FILE = re.compile(r"\.shard-(\d+)-of-(\d+)\.json$")
+# 分片 meta 中直接加總的計數欄位
+SUMMED_FIELDS = (
+    "raw_entries",
+    "filtered_entries",
+    "too_old_entries",
+    "total_sources",
+    "succeeded_sources",
+    "failed_source_count",
+)
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """``"2/4"`` -> ``(2, 4)``；分片編號從 1 開始。"""
+    match = _SHARD.match(value or "")
+    if not match:
+        raise ValueError(f"無效的分片：{value!r}（格式為 i/N，例如 1/3）")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"無效的分片：{value!r}（i 必須介於 1 與 N 之間）")
+    return index, count
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+@functools.lru_cache(maxsize=8)
+def _ring(count: int) -> Tuple[List[int], List[int]]:
+    points = sorted(
+        (_hash(f"shard-{shard}#{replica}"), shard)
+        for shard in range(1, count + 1)
+        for replica in range(VIRTUAL_NODES)
+    )
+    return [point for point, _ in points], [shard for _, shard in points]
+
+
+def shard_of(key: str, count: int) -> int:
+    """Shard (1..count) owning ``key``: the first ring point clockwise from its hash."""
+    hashes, shards = _ring(count)
+    position = bisect.bisect(hashes, _hash(key)) % len(hashes)
+    return shards[position]
+
+
+def select_sources(
+    sources: Sequence[Dict[str, Any]], index: int, count: int
+) -> List[Dict[str, Any]]:
+    return [source for source in sources if shard_of(source["key"], count) == index]
+
+
+def shard_path(out_dir: pathlib.Path, date: str, index: int, count: int) -> pathlib.Path:
+    return out_dir / "shards" / f"raw-{date}.shard-{index}-of-{count}.json"
+
+
+def find_shards(out_dir: pathlib.Path, date: str) -> List[pathlib.Path]:
+    """Shard outputs of ``date`` under ``out_dir/shards``, ordered by shard index."""
+    found: List[Tuple[int, pathlib.Path]] = []
+    for path in (out_dir / "shards").glob(f"raw-{date}.shard-*-of-*.json"):
+        match = _SHARD_FILE.search(path.name)
+        if match is not None:
+            found.append((int(match.group(1)), path))
+    return [path for _index, path in sorted(found)]
+
+
+def _sum_nested(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    for key, value in source.items():
+        if isinstance(value, dict):
+            _sum_nested(target.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            target[key] = target.get(key, 0) + value
+
+
+def merge_documents(documents: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine shard ``{"meta", "entries"}`` documents into one raw document.
+
+    entries 依分片順序串接並以 URL 再去重一次（不同分片的來源可能收錄同一連結）；
+    ``unique_entries`` 以合併去重後的 entries 加上各分片過濾掉的筆數計算（同 collector：
+    ``unique_entries - filtered_entries`` 等於輸出筆數），再據此計算 ``dedup_rate``；
+    ``category_counts`` 依合併後的 entries 重算。分片不一致（N 不同、編號重複）時 raise ValueError，缺少的分片記在
+    ``meta.shards.missing``。
+    """
+    if not documents:
+        raise ValueError("沒有可合併的分片")
+    by_index: Dict[int, Dict[str, Any]] = {}
+    counts = set()
+    for document in documents:
+        shard = (document.get("meta") or {}).get("shard") or {}
+        index, count = shard.get("index"), shard.get("count")
+        if not isinstance(index, int) or not isinstance(count, int):
+            raise ValueError("輸入檔缺少 meta.shard，不是 --shard 的輸出")
+        if index in by_index:
+            raise ValueError(f"分片 {index}/{count} 重複")
+        counts.add(count)
+        by_index[index] = document
+    if len(counts) != 1:
+        raise ValueError(f"分片總數不一致：{sorted(counts)}")
+    (count,) = counts
+
+    entries: List[Dict[str, Any]] = []
+    seen_links: set[str] = set()
+    cross_duplicates = 0
+    totals = dict.fromkeys(SUMMED_FIELDS, 0)
+    failed_sources: List[Dict[str, Any]] = []
+    filter_hits: Dict[str, Any] = {}
+    enrichment: Dict[str, Any] = {}
+    for index in sorted(by_index):
+        document = by_index[index]
+        shard_meta = document.get("meta") or {}
+        for item in document.get("entries") or []:
+            link = item.get("url", "")
+            if link and link in seen_links:
+                cross_duplicates += 1
+                continue
+            seen_links.add(link)
+            entries.append(item)
+        for field in SUMMED_FIELDS:
+            totals[field] += int(shard_meta.get(field) or 0)
+        failed_sources.extend(shard_meta.get("failed_sources") or [])
+        _sum_nested(filter_hits, shard_meta.get("filter_hits") or {})
+        _sum_nested(enrichment, shard_meta.get("enrichment") or {})
+
+    unique_entries = len(entries) + totals["filtered_entries"]
+    raw_entries = totals["raw_entries"]
+    dedup_rate = 0.0 if raw_entries == 0 else (raw_entries - unique_entries) / raw_entries
+    category_counts = Counter(item.get("category", "") for item in entries)
+    meta: Dict[str, Any] = {
+        "generated_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "raw_entries": raw_entries,
+        "unique_entries": unique_entries,
+        "dedup_rate": round(dedup_rate, 4),
+        "filtered_entries": totals["filtered_entries"],
+        "too_old_entries": totals["too_old_entries"],
+        "filter_hits": filter_hits,
+        "total_sources": totals["total_sources"],
+        "succeeded_sources": totals["succeeded_sources"],
+        "failed_source_count": totals["failed_source_count"],
+        "failed_sources": failed_sources,
+        "category_counts": dict(sorted(category_counts.items())),
+        "shards": {
+            "count": count,
+            "merged": sorted(by_index),
+            "missing": [index for index in range(1, count + 1) if index not in by_index],
+            "cross_shard_duplicates": cross_duplicates,
+        },
+    }
+    if enrichment:
+        meta["enrichment"] = enrichment
+    return {"meta": meta, "entries": entries}
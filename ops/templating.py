@@ -0,0 +1,330 @@
+"""Digest 版面模板：內建精簡引擎（Jinja2 語法子集），或選用 Jinja2。
+
+模板在每個行程只編譯一次（依路徑與 mtime 快取），batch/backfill 重複 render 時直接重用。
+兩種引擎皆採用 ``trim_blocks``/``lstrip_blocks`` 規則：單獨佔一行的 ``{% ... %}`` 不輸出空行。
+"""
+from __future__ import annotations
+
+import ast
+import functools
+import html
+import pathlib
+import re
+from typing import Any, Callable, Dict, Iterable, List, TextIO
+
+import renderers
+from lazyimport import LazyModule
+
+jinja2 = LazyModule("jinja2", "請先安裝 Jinja2：pip install jinja2")
+
+TEMPLATES_DIR = pathlib.Path(__file__).resolve().parent / "templates"
+DEFAULT_TEMPLATE = TEMPLATES_DIR / "digest.md.j2"
+ENGINES = ("builtin", "jinja2")
+
+_TOKEN = re.compile(r"(\{\{.*?\}\}|\{%.*?%\})", re.DOTALL)
+_LSTRIP_BLOCK = re.compile(r"^[ \t]+(?=\{%)", re.MULTILINE)
+_TRIM_BLOCK = re.compile(r"%\}\n")
+
+
+class TemplateError(ValueError):
+    """模板語法錯誤或使用了不支援的運算式。"""
+
+
+FILTERS: Dict[str, Callable[..., Any]] = {
+    "e": html.escape,
+    "escape": html.escape,
+    "join": lambda value, sep="": sep.join(str(item) for item in value),
+    "length": len,
+    "lower": lambda value: str(value).lower(),
+    "upper": lambda value: str(value).upper(),
+    "trim": lambda value: str(value).strip(),
+}
+
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.Name,
+    ast.Load,
+    ast.Store,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Slice,
+    ast.Constant,
+    ast.Compare,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.In,
+    ast.NotIn,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.BinOp,
+    ast.BitOr,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Mod,
+    ast.Call,
+    ast.List,
+    ast.Tuple,
+    ast.keyword,
+)
+
+
+def _lookup(obj: Any, name: str) -> Any:
+    """``a.b``：dict 取 key，其他物件取屬性；不存在時回傳空字串（同 Jinja2 Undefined 的輸出）。"""
+    if isinstance(obj, dict):
+        return obj.get(name, "")
+    return getattr(obj, name, "")
+
+
+class _Translator(ast.NodeTransformer):
+    """把模板運算式改寫成只存取 context、迴圈變數與 filters 的 Python 運算式。"""
+
+    def __init__(self, local_names: Iterable[str]) -> None:
+        self.local_names = set(local_names)
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        if not isinstance(node.op, ast.BitOr):
+            return self.generic_visit(node)
+        # ``value|name`` 或 ``value|name(args)`` 為 filter
+        target = node.right
+        args: List[ast.expr] = []
+        keywords: List[ast.keyword] = []
+        if isinstance(target, ast.Call) and isinstance(target.func, ast.Name):
+            args, keywords = target.args, target.keywords
+            target = target.func
+        if not isinstance(target, ast.Name) or target.id not in FILTERS:
+            raise TemplateError(f"未知的 filter：{ast.unparse(node.right)}")
+        return ast.Call(
+            func=ast.Subscript(
+                value=ast.Name(id="_filters", ctx=ast.Load()),
+                slice=ast.Constant(target.id),
+                ctx=ast.Load(),
+            ),
+            args=[self.visit(node.left), *[self.visit(arg) for arg in args]],
+            keywords=[self.visit(keyword) for keyword in keywords],
+        )
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        raise TemplateError(f"模板不支援函式呼叫：{ast.unparse(node)}")
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        # 同 Jinja2 sandbox：底線開頭的屬性（__class__、__globals__ 等）可通往任意物件
+        if node.attr.startswith("_"):
+            raise TemplateError(f"模板不可存取底線開頭的屬性：{ast.unparse(node)}")
+        return ast.Call(
+            func=ast.Name(id="_lookup", ctx=ast.Load()),
+            args=[self.visit(node.value), ast.Constant(node.attr)],
+            keywords=[],
+        )
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in self.local_names:
+            return ast.Name(id=f"_v_{node.id}", ctx=node.ctx)
+        if node.id in {"true", "false", "none"}:
+            return ast.Constant({"true": True, "false": False, "none": None}[node.id])
+        return ast.Call(
+            func=ast.Attribute(value=ast.Name(id="_ctx", ctx=ast.Load()), attr="get", ctx=ast.Load()),
+            args=[ast.Constant(node.id), ast.Constant("")],
+            keywords=[],
+        )
+
+
+def _parse_expr(source: str, local_names: Iterable[str], line: int) -> str:
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise TemplateError(f"第 {line} 行運算式錯誤：{source.strip()}") from exc
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise TemplateError(f"第 {line} 行不支援的語法：{source.strip()}")
+    translated = _Translator(local_names).visit(tree)
+    return ast.unparse(ast.fix_missing_locations(translated))
+
+
+class BuiltinTemplate:
+    """把模板編譯成單一 Python 函式；render 時只剩字串寫入與 dict 查找。"""
+
+    def __init__(self, source: str, name: str = "<template>") -> None:
+        self.name = name
+        self.code = self._compile(source)
+        namespace: Dict[str, Any] = {}
+        exec(compile(self.code, name, "exec"), namespace)  # noqa: S102 - 程式碼由上方白名單產生
+        self._render: Callable[..., None] = namespace["_render"]
+
+    @staticmethod
+    def _compile(source: str) -> str:
+        # 同 Jinja2 預設：去掉檔尾一個換行
+        if source.endswith("\n"):
+            source = source[:-1]
+        source = _TRIM_BLOCK.sub("%}", _LSTRIP_BLOCK.sub("", source))
+
+        lines = ["def _render(_ctx, _w, _lookup, _filters):", "    pass"]
+        indent = 1
+        scopes: List[List[str]] = []
+        stack: List[str] = []
+        line = 1
+        for token in _TOKEN.split(source):
+            if not token:
+                continue
+            pad = "    " * indent
+            locals_in_scope = [name for scope in scopes for name in scope]
+            if token.startswith("{{"):
+                expr = _parse_expr(token[2:-2], locals_in_scope, line)
+                lines.append(f"{pad}_w(str({expr}))")
+            elif token.startswith("{%"):
+                words = token[2:-2].strip()
+                keyword, _, rest = words.partition(" ")
+                if keyword == "for":
+                    target, sep, iterable = rest.partition(" in ")
+                    names = [name.strip() for name in target.split(",")]
+                    if not sep or not all(name.isidentifier() for name in names):
+                        raise TemplateError(f"第 {line} 行 for 語法錯誤：{words}")
+                    expr = _parse_expr(iterable, locals_in_scope, line)
+                    targets = ", ".join(f"_v_{name}" for name in names)
+                    lines.append(f"{pad}for {targets} in {expr}:")
+                    lines.append(f"{pad}    pass")
+                    scopes.append(names)
+                    stack.append("for")
+                    indent += 1
+                elif keyword == "if":
+                    lines.append(f"{pad}if {_parse_expr(rest, locals_in_scope, line)}:")
+                    lines.append(f"{pad}    pass")
+                    stack.append("if")
+                    indent += 1
+                elif keyword in {"elif", "else"}:
+                    if not stack or stack[-1] != "if":
+                        raise TemplateError(f"第 {line} 行 {keyword} 沒有對應的 if")
+                    outer = "    " * (indent - 1)
+                    if keyword == "elif":
+                        lines.append(f"{outer}elif {_parse_expr(rest, locals_in_scope, line)}:")
+                    else:
+                        lines.append(f"{outer}else:")
+                    lines.append(f"{pad}pass")
+                elif keyword in {"endfor", "endif"}:
+                    if not stack or stack[-1] != keyword[3:]:
+                        raise TemplateError(f"第 {line} 行 {keyword} 沒有對應的區塊")
+                    if stack.pop() == "for":
+                        scopes.pop()
+                    indent -= 1
+                else:
+                    raise TemplateError(f"第 {line} 行不支援的標籤：{words}")
+            else:
+                lines.append(f"{pad}_w({token!r})")
+            line += token.count("\n")
+        if stack:
+            raise TemplateError(f"區塊 {stack[-1]} 未結束")
+        return "\n".join(lines) + "\n"
+
+    def stream(self, context: Dict[str, Any], out: TextIO) -> None:
+        self._render(context, out.write, _lookup, FILTERS)
+
+    def render(self, context: Dict[str, Any]) -> str:
+        chunks: List[str] = []
+        self._render(context, chunks.append, _lookup, FILTERS)
+        return "".join(chunks)
+
+
+class JinjaTemplate:
+    """Jinja2 模板包裝，提供與 BuiltinTemplate 相同的 stream/render 介面。"""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.template = _jinja_environment(str(path.parent)).get_template(path.name)
+
+    def stream(self, context: Dict[str, Any], out: TextIO) -> None:
+        for chunk in self.template.generate(context):
+            out.write(chunk)
+
+    def render(self, context: Dict[str, Any]) -> str:
+        rendered: str = self.template.render(context)
+        return rendered
+
+
+@functools.lru_cache(maxsize=None)
+def _jinja_environment(directory: str) -> Any:
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(directory),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        autoescape=False,
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _load(path: str, mtime_ns: int, engine: str) -> BuiltinTemplate | JinjaTemplate:
+    if engine == "jinja2":
+        return JinjaTemplate(pathlib.Path(path))
+    return BuiltinTemplate(pathlib.Path(path).read_text(encoding="utf-8"), name=path)
+
+
+def load_template(
+    path: pathlib.Path = DEFAULT_TEMPLATE, engine: str = "builtin"
+) -> BuiltinTemplate | JinjaTemplate:
+    """Compile ``path`` once per process; an edited file (new mtime) is recompiled."""
+    if engine not in ENGINES:
+        raise TemplateError(f"不支援的模板引擎：{engine}")
+    resolved = path.resolve()
+    return _load(str(resolved), resolved.stat().st_mtime_ns, engine)
+
+
+def entry_context(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": item.get("title", "無標題"),
+        "url": item.get("url", ""),
+        "published": item.get("published_at", "未知時間"),
+        "summary": renderers.truncate_summary(item),
+        "summary_raw": item.get("summary_raw", ""),
+        "tags": " ".join(f"#{tag}" for tag in item.get("tags", [])),
+        "tag_list": list(item.get("tags", [])),
+        "days": item.get("days", 1),
+        "category": item.get("category", renderers.DEFAULT_CATEGORY),
+        "source": item.get("source", renderers.DEFAULT_SOURCE),
+    }
+
+
+def template_context(model: renderers.DigestModel) -> Dict[str, Any]:
+    """DigestModel 轉成模板可用的純 dict/list 結構。"""
+    return {
+        "date": model.date,
+        "meta": model.meta or {},
+        "has_meta": bool(model.meta),
+        "meta_lines": renderers.meta_lines(model.meta, model.entry_count) if model.meta else [],
+        "entry_count": model.entry_count,
+        "trend_lines": renderers.trend_lines(model.trends),
+        "categories": [
+            {
+                "name": category.name,
+                "sources": [
+                    {"name": source.name, "entries": [entry_context(item) for item in source.entries]}
+                    for source in category.sources
+                ],
+            }
+            for category in model.categories
+        ],
+        "footer": renderers.footer_text(model),
+    }
+
+
+class TemplateRenderer:
+    """以模板取代內建 Markdown 版面的 renderer。"""
+
+    def __init__(
+        self,
+        path: pathlib.Path = DEFAULT_TEMPLATE,
+        engine: str = "builtin",
+        name: str = "markdown",
+        extension: str = ".md",
+    ) -> None:
+        self.template = load_template(path, engine)
+        self.name = name
+        self.extension = extension
+
+    def render(self, model: renderers.DigestModel, out: TextIO) -> None:
+        self.template.stream(template_context(model), out)
@@ -0,0 +1,73 @@
+"""published_at 正規化：collector 收集時轉成 ISO 8601 UTC 與 epoch 秒數，下游只需比較整數。"""
+from __future__ import annotations
+
+import calendar
+import datetime as dt
+import email.utils
+import functools
+import time
+from typing import Any, Dict, Tuple
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_timestamp(value: str) -> float | None:
+    """Parse ISO 8601 or RFC 822 strings to a UTC epoch; unknown formats return None.
+
+    同一個 feed 的時間字串格式固定且常重複（例如只有日期），以 LRU 快取解析結果。
+    """
+    if not value:
+        return None
+    try:
+        parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        # RFC 822：parsedate_tz 直接回傳欄位 tuple，比建立 datetime 再轉換便宜
+        fields = email.utils.parsedate_tz(value)
+        if fields is None:
+            return None
+        if fields[9] is None:
+            return float(calendar.timegm(fields[:9]))
+        return float(email.utils.mktime_tz(fields))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+    return parsed.timestamp()
+
+
+def format_utc(epoch: float) -> str:
+    """``1766390400`` -> ``2025-12-22T08:00:00+00:00``."""
+    return dt.datetime.fromtimestamp(epoch, dt.timezone.utc).isoformat()
+
+
+def normalize(value: str, parsed: time.struct_time | None = None) -> Tuple[str, int | None]:
+    """Return ``(published_at, published_epoch)``.
+
+    ``parsed`` 為 feedparser 已解析好的 ``*_parsed``（UTC struct_time），有的話直接使用；
+    無法解析的字串原樣保留，epoch 為 None。
+    """
+    epoch: float | None = None
+    if parsed is not None:
+        try:
+            epoch = float(calendar.timegm(parsed))
+        except (TypeError, ValueError, OverflowError):
+            epoch = None
+    if epoch is None:
+        epoch = parse_timestamp(value or "")
+    if epoch is None:
+        return value or "", None
+    return format_utc(epoch), int(epoch)
+
+
+def feed_entry_time(entry: Dict[str, Any]) -> Tuple[str, int | None]:
+    """feedparser entry 的 published（沒有時用 updated），搭配對應的 ``*_parsed``。"""
+    for field in ("published", "updated"):
+        value = entry.get(field)
+        if value:
+            return normalize(value, entry.get(f"{field}_parsed"))
+    return "", None
+
+
+def entry_epoch(entry: Dict[str, Any]) -> float | None:
+    """Prefer the stored epoch; raw files written before normalization fall back to parsing."""
+    epoch = entry.get("published_epoch")
+    if isinstance(epoch, (int, float)) and not isinstance(epoch, bool):
+        return float(epoch)
+    return parse_timestamp(entry.get("published_at", "") or "")
@@ -0,0 +1,215 @@
+"""跨日趨勢：逐日累加標籤/網域/標題詞的出現次數，並以 z-score 找出突然升溫的詞。
+
+計數存在一份精簡的 JSON（每個詞一列、每天一欄，只保留最近 ``window`` 天），
+每天只把當日 payload 的計數寫入對應欄位，不需要重新掃描歷史 raw JSON。
+"""
+from __future__ import annotations
+
+import datetime as dt
+import functools
+import json
+import os
+import pathlib
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Sequence, Set
+from urllib.parse import urlsplit
+
+# 儲存格式改變時遞增，舊檔會被捨棄
+STORE_VERSION = 1
+DEFAULT_WINDOW = 28
+# 歷史天數不足時不判斷趨勢（避免第一週所有詞都是「新詞」）
+MIN_HISTORY_DAYS = 3
+MIN_COUNT = 3
+Z_THRESHOLD = 2.0
+# 標準差下限：歷史幾乎沒出現過的詞不會因為除以接近 0 的值而爆量
+STD_FLOOR = 1.0
+DEFAULT_LIMIT = 10
+
+_ASCII_WORD = re.compile(r"[a-z][a-z0-9+#]*(?:[.-][a-z0-9+#]+)*")
+_CJK_RUN = re.compile(r"[\u4e00-\u9fff]{2,}")
+STOPWORDS = frozenset(
+    "the and for with from into your you are how why what when new now its this that "
+    "will can has have not all our out via about more than using use".split()
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _numpy() -> ModuleType | None:
+    """NumPy 為選用依賴；未安裝時退回純 Python 計算。"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def store_path(raw_dir: pathlib.Path) -> pathlib.Path:
+    return raw_dir / "trends.json"
+
+
+def entry_terms(entry: Dict[str, Any]) -> Set[str]:
+    """``tag:``/``domain:``/``term:`` 前綴的詞；同一 entry 內重複只算一次。"""
+    terms = {f"tag:{str(tag).casefold()}" for tag in entry.get("tags", []) if str(tag).strip()}
+    host = urlsplit(entry.get("url", "") or "").hostname or ""
+    if host:
+        terms.add(f"domain:{host.removeprefix('www.')}")
+    title = (entry.get("title", "") or "").casefold()
+    for word in _ASCII_WORD.findall(title):
+        if len(word) >= 3 and word not in STOPWORDS:
+            terms.add(f"term:{word}")
+    # 中文沒有空白分詞，以 bigram 近似
+    for run in _CJK_RUN.findall(title):
+        terms.update(f"term:{run[idx:idx + 2]}" for idx in range(len(run) - 1))
+    return terms
+
+
+def count_terms(entries: Iterable[Dict[str, Any]]) -> Counter[str]:
+    counts: Counter[str] = Counter()
+    for entry in entries:
+        counts.update(entry_terms(entry))
+    return counts
+
+
+@dataclass
+class Burst:
+    term: str
+    count: int
+    mean: float
+    zscore: float
+    history_days: int
+
+    @property
+    def label(self) -> str:
+        kind, _, value = self.term.partition(":")
+        if kind == "tag":
+            return f"#{value}"
+        if kind == "term":
+            return f"「{value}」"
+        return value
+
+
+@dataclass
+class TrendStore:
+    window: int = DEFAULT_WINDOW
+    days: List[str] = field(default_factory=list)
+    # term -> 與 days 對齊的每日計數
+    counts: Dict[str, List[int]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: pathlib.Path, window: int = DEFAULT_WINDOW) -> "TrendStore":
+        """A missing, corrupt or outdated file starts an empty store."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(window=window)
+        if not isinstance(data, dict) or data.get("version") != STORE_VERSION:
+            return cls(window=window)
+        store = cls(window=window, days=list(data.get("days", [])), counts=data.get("terms", {}))
+        store._trim()
+        return store
+
+    def save(self, path: pathlib.Path) -> None:
+        document = {"version": STORE_VERSION, "days": self.days, "terms": self.counts}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps(document, ensure_ascii=False, separators=(",", ":")), encoding="utf-8"
+        )
+        os.replace(tmp_path, path)
+
+    def update(self, date: str, counts: Counter[str]) -> bool:
+        """Replace the column for ``date`` (reruns are idempotent).
+
+        Returns False when ``date`` is older than the retained window.
+        """
+        if date in self.days:
+            column = self.days.index(date)
+            for row in self.counts.values():
+                row[column] = 0
+        else:
+            if len(self.days) >= self.window and date < self.days[0]:
+                return False
+            column = sum(1 for day in self.days if day < date)
+            self.days.insert(column, date)
+            for row in self.counts.values():
+                row.insert(column, 0)
+        width = len(self.days)
+        for term, count in counts.items():
+            existing = self.counts.get(term)
+            if existing is None:
+                existing = self.counts[term] = [0] * width
+            existing[column] = count
+        self._trim()
+        return True
+
+    def _trim(self) -> None:
+        excess = len(self.days) - self.window
+        if excess > 0:
+            self.days = self.days[excess:]
+            for row in self.counts.values():
+                del row[:excess]
+        self.counts = {term: row for term, row in self.counts.items() if any(row)}
+
+    def bursts(
+        self,
+        date: str,
+        limit: int = DEFAULT_LIMIT,
+        min_count: int = MIN_COUNT,
+        threshold: float = Z_THRESHOLD,
+    ) -> List[Burst]:
+        """Terms whose count on ``date`` is ``threshold`` std devs above the prior days."""
+        if date not in self.days:
+            return []
+        column = self.days.index(date)
+        history = self.days[max(0, column - self.window + 1):column]
+        if len(history) < MIN_HISTORY_DAYS:
+            return []
+        start = column - len(history)
+        candidates = [term for term, row in self.counts.items() if row[column] >= min_count]
+        if not candidates:
+            return []
+        rows = [self.counts[term] for term in candidates]
+        scored = _zscores(rows, start, column)
+        bursts = [
+            Burst(term=term, count=count, mean=mean, zscore=z, history_days=len(history))
+            for term, (count, mean, z) in zip(candidates, scored)
+            if z >= threshold
+        ]
+        bursts.sort(key=lambda burst: (-burst.zscore, -burst.count, burst.term))
+        return bursts[:limit]
+
+
+def _zscores(rows: Sequence[List[int]], start: int, column: int) -> List[tuple[int, float, float]]:
+    """(當日計數, 歷史平均, z-score)；有 NumPy 時一次算完整個矩陣。"""
+    np = _numpy()
+    if np is not None:
+        matrix = np.asarray(rows, dtype=float)
+        history = matrix[:, start:column]
+        today = matrix[:, column]
+        mean = history.mean(axis=1)
+        std = np.maximum(history.std(axis=1), STD_FLOOR)
+        zscores = (today - mean) / std
+        return [
+            (int(count), float(avg), float(z))
+            for count, avg, z in zip(today.tolist(), mean.tolist(), zscores.tolist())
+        ]
+
+    results = []
+    for row in rows:
+        history = row[start:column]
+        mean = sum(history) / len(history)
+        variance = sum((value - mean) ** 2 for value in history) / len(history)
+        std = max(variance ** 0.5, STD_FLOOR)
+        results.append((row[column], mean, (row[column] - mean) / std))
+    return results
+
+
+def is_iso_date(value: str) -> bool:
+    try:
+        dt.date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
@@ -1,11 +1,48 @@
 """Pytest 配置與共用 fixtures。"""
+import argparse
+import json
 import pathlib
+import sys
 import tempfile
-from typing import Dict, Any, Generator
+from typing import Callable, Dict, Any, Generator, List
 
 import pytest
 import yaml
 
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+from models import Entry
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> None:
+    """collector 的快取寫到各測試的臨時目錄：不寫入 repo 的 cache/，替身 feedparser 的結果也不跨測試共用。"""
+    import collector
+    import configcache
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(collector, "CACHE_DIR", cache_dir)
+    monkeypatch.setattr(collector, "CONFIG_CACHE", configcache.ConfigCache(cache_dir / "config"))
+    monkeypatch.setattr(collector, "WATERMARKS_PATH", cache_dir / "watermarks.json")
+    monkeypatch.setattr(collector, "ENRICH_CACHE_PATH", cache_dir / "enrich.json")
+    monkeypatch.setattr(collector, "PARSE_CACHE_PATH", cache_dir / "parsed.json")
+    monkeypatch.setattr(collector, "PARSE_CACHE", None)
+
+
+@pytest.fixture
+def collector_args() -> Callable[..., argparse.Namespace]:
+    """以 collector.parse_args 建立參數：未指定的旗標一律取 CLI 的真實預設值。"""
+    import collector
+
+    # 先取出真正的 parse_args：測試稍後會把 collector.parse_args 換成回傳這些參數的替身
+    parse_args = collector.parse_args
+
+    def make(*argv: str) -> argparse.Namespace:
+        return parse_args(["--date", "2025-12-30", *argv])
+
+    return make
+
 
 @pytest.fixture
 def temp_dir() -> Generator[pathlib.Path, None, None]:
@@ -50,29 +87,29 @@ def sample_feeds_yml(temp_dir: pathlib.Path, sample_config: Dict[str, Any]) -> p
 
 
 @pytest.fixture
-def sample_entries() -> list[Dict[str, Any]]:
-    """範例 feed entries。"""
+def sample_entries() -> list[Entry]:
+    """範例 feed entries（collector 內部的 Entry 結構）。"""
     return [
-        {
-            "title": "Article 1",
-            "link": "https://example.com/1",
-            "summary": "Summary 1",
-            "published": "2025-12-22",
-            "source": "Test Source",
-            "tags": ["test"],
-            "source_key": "source_1",
-            "category": "community",
-        },
-        {
-            "title": "Article 2",
-            "link": "https://example.com/2",
-            "summary": "Summary 2",
-            "published": "2025-12-21",
-            "source": "Test Source",
-            "tags": ["example"],
-            "source_key": "source_1",
-            "category": "community",
-        },
+        Entry.create(
+            title="Article 1",
+            url="https://example.com/1",
+            summary_raw="Summary 1",
+            published_at="2025-12-22",
+            source="Test Source",
+            tags=["test"],
+            source_key="source_1",
+            category="community",
+        ),
+        Entry.create(
+            title="Article 2",
+            url="https://example.com/2",
+            summary_raw="Summary 2",
+            published_at="2025-12-21",
+            source="Test Source",
+            tags=["example"],
+            source_key="source_1",
+            category="community",
+        ),
     ]
 
 
@@ -89,7 +126,8 @@ def sample_payload_entries() -> list[Dict[str, Any]]:
             "tags": ["test"],
             "category": "community",
             "fetched_at": "2025-12-22T00:00:00+00:00",
-            "published_at": "2025-12-22",
+            "published_at": "2025-12-22T00:00:00+00:00",
+            "published_epoch": 1766361600,
         },
         {
             "source_key": "source_1",
@@ -100,6 +138,47 @@ def sample_payload_entries() -> list[Dict[str, Any]]:
             "tags": ["example"],
             "category": "community",
             "fetched_at": "2025-12-22T00:00:00+00:00",
-            "published_at": "2025-12-21",
+            "published_at": "2025-12-21T00:00:00+00:00",
+            "published_epoch": 1766275200,
         },
     ]
+
+
+@pytest.fixture
+def make_entry() -> Callable[..., Dict[str, Any]]:
+    """建立單筆 JSON entry：預設欄位與 sample_payload_entries 相同格式，測試只傳要覆寫的欄位。"""
+
+    def make(title: str = "Title", **overrides: Any) -> Dict[str, Any]:
+        entry: Dict[str, Any] = {
+            "source_key": "source_1",
+            "source": "Test Source",
+            "title": title,
+            "url": f"https://example.com/{title}",
+            "summary_raw": "",
+            "tags": [],
+            "category": "news",
+            "published_at": "2025-12-22",
+        }
+        entry.update(overrides)
+        return entry
+
+    return make
+
+
+@pytest.fixture
+def write_raw() -> Callable[..., pathlib.Path]:
+    """把 entries 寫成 out_dir/raw-<date>.json，回傳檔案路徑。"""
+
+    def write(
+        out_dir: pathlib.Path,
+        date: str,
+        entries: List[Dict[str, Any]],
+        meta: Dict[str, Any] | None = None,
+    ) -> pathlib.Path:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"raw-{date}.json"
+        document = {"meta": meta or {}, "entries": entries}
+        path.write_text(json.dumps(document, ensure_ascii=False), encoding="utf-8")
+        return path
+
+    return write
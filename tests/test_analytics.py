@@ -0,0 +1,168 @@
+"""測試 Parquet 分析匯出與彙總查詢。"""
+import json
+import pathlib
+import sys
+from typing import Any, Callable, Dict
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import analytics
+import collector
+from models import Entry
+
+
+def make_meta(date: str, hour: int, raw: int, unique: int) -> Dict[str, Any]:
+    return {
+        "generated_at": f"{date}T{hour:02d}:00:00+00:00",
+        "raw_entries": raw,
+        "unique_entries": unique,
+        "dedup_rate": round((raw - unique) / raw, 4),
+        "failed_sources": [{"key": "down", "name": "Down"}],
+        "category_counts": {"news": unique},
+    }
+
+
+class TestColumns:
+    """測試不需 pyarrow 的欄位轉換。"""
+
+    def test_entry_columns_accept_dicts_and_entries(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        columns = analytics.entry_columns(
+            [
+                make_entry(source_key="a"),
+                Entry.from_dict(make_entry(source_key="b", category="tools", tags=["AI"])),
+            ]
+        )
+
+        assert columns["source_key"] == ["a", "b"]
+        assert columns["category"] == ["news", "tools"]
+        assert columns["tags"] == [[], ["AI"]]
+        expected = set(analytics.ENTRY_STRING_FIELDS) | {"tags", "published_epoch"}
+        assert set(columns) == expected
+
+    def test_run_row(self) -> None:
+        row = analytics.run_row(make_meta("2025-12-22", 1, 10, 8))
+
+        assert row["raw_entries"] == 10
+        assert row["total_sources"] is None
+        assert row["dedup_rate"] == pytest.approx(0.2)
+        assert row["failed_sources"] == ["down"]
+        assert json.loads(row["category_counts"]) == {"news": 8}
+
+    def test_paths(self, tmp_path: pathlib.Path) -> None:
+        assert analytics.partition_dir(tmp_path, "entries", "2025-12-22") == (
+            tmp_path / "entries" / "date=2025-12-22"
+        )
+        assert analytics.run_file_name({"generated_at": "2025-12-22T01:02:03+00:00"}) == (
+            "run-20251222T0102030000.parquet"
+        )
+
+
+@pytest.fixture
+def dataset(tmp_path: pathlib.Path, make_entry: Callable[..., Dict[str, Any]]) -> pathlib.Path:
+    pytest.importorskip("pyarrow")
+    root = tmp_path / "analytics"
+    first_day = [
+        make_entry("a 0", source_key="a"),
+        make_entry("a 1", source_key="a"),
+        make_entry(source_key="b", category="tools"),
+    ]
+    analytics.export_run(root, "2025-12-01", first_day, make_meta("2025-12-01", 1, 4, 3))
+    second_day = [make_entry(source_key="a")]
+    analytics.export_run(root, "2025-12-02", second_day, make_meta("2025-12-02", 1, 1, 1))
+    # 同日重跑：entries 整份取代，meta 多一列
+    rerun = [make_entry(source_key="a"), make_entry(source_key="b", category="tools")]
+    analytics.export_run(root, "2025-12-02", rerun, make_meta("2025-12-02", 5, 4, 2))
+    return root
+
+
+class TestQueries:
+    """測試彙總查詢（需要 pyarrow）。"""
+
+    def test_source_yield(self, dataset: pathlib.Path) -> None:
+        rows = analytics.source_yield(dataset).to_pylist()
+
+        assert rows == [
+            {"source_key": "a", "source": "Test Source", "entries": 3, "days": 2, "per_day": 1.5},
+            {"source_key": "b", "source": "Test Source", "entries": 2, "days": 2, "per_day": 1.0},
+        ]
+
+    def test_category_mix_with_date_filter(self, dataset: pathlib.Path) -> None:
+        rows = analytics.category_mix(dataset, since="2025-12-02").to_pylist()
+
+        assert rows == [
+            {"date": "2025-12-02", "category": "news", "entries": 1},
+            {"date": "2025-12-02", "category": "tools", "entries": 1},
+        ]
+
+    def test_dedup_rates_keep_last_run_per_day(self, dataset: pathlib.Path) -> None:
+        rows = analytics.dedup_rates(dataset).to_pylist()
+
+        assert [(row["date"], row["raw_entries"], row["dedup_rate"]) for row in rows] == [
+            ("2025-12-01", 4, 0.25),
+            ("2025-12-02", 4, 0.5),
+        ]
+
+    def test_empty_dataset(self, tmp_path: pathlib.Path) -> None:
+        pytest.importorskip("pyarrow")
+
+        assert analytics.source_yield(tmp_path).num_rows == 0
+
+    def test_export_raw_and_cli(
+        self,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        pytest.importorskip("pyarrow")
+        monkeypatch.setattr(analytics.logutil, "setup_logging", lambda **_: None)
+        entries = [make_entry(source_key="c", source="C")]
+        write_raw(tmp_path, "2025-12-03", entries, make_meta("2025-12-03", 1, 2, 2))
+        root = tmp_path / "analytics"
+
+        analytics.main(["export", "--dir", str(root), "--raw-dir", str(tmp_path)])
+        analytics.main(["sources", "--dir", str(root)])
+
+        output = capsys.readouterr().out
+        header, row = output.splitlines()
+        assert header.split() == ["source_key", "source", "entries", "days", "per_day"]
+        assert row.split() == ["c", "C", "1", "1", "1.00"]
+
+    def test_export_without_raw_exits_2(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        pytest.importorskip("pyarrow")
+        monkeypatch.setattr(analytics.logutil, "setup_logging", lambda **_: None)
+
+        with pytest.raises(SystemExit) as exc_info:
+            analytics.main(["export", "--dir", str(tmp_path / "a"), "--raw-dir", str(tmp_path)])
+
+        assert exc_info.value.code == 2
+
+
+class TestCollectorExport:
+    """測試 collector --analytics-dir。"""
+
+    def test_disabled_by_default(self, tmp_path: pathlib.Path) -> None:
+        collector.export_analytics(None, "2025-12-22", {"entries": [], "meta": {}})
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_exports_collector_payload(
+        self, tmp_path: pathlib.Path, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        pytest.importorskip("pyarrow")
+        document = {
+            "meta": make_meta("2025-12-22", 1, 1, 1),
+            "entries": [Entry.from_dict(make_entry())],
+        }
+
+        collector.export_analytics(tmp_path, "2025-12-22", document)
+
+        assert analytics.source_yield(tmp_path).column("entries").to_pylist() == [1]
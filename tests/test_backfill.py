@@ -0,0 +1,147 @@
+"""測試 backfill 的平行重建與增量略過。"""
+import pathlib
+import sys
+from typing import Any, Callable, Dict
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import backfill
+import digest
+
+
+@pytest.fixture
+def out_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> pathlib.Path:
+    out = tmp_path / "out"
+    out.mkdir()
+    monkeypatch.setattr(digest, "OUT_DIR", out)
+    monkeypatch.setattr(backfill, "STATE_PATH", tmp_path / "cache" / "backfill.json")
+    return out
+
+
+DATES = ["2025-12-01", "2025-12-02", "2025-12-03"]
+
+
+class TestRun:
+    """測試批次重建流程。"""
+
+    def test_renders_in_pool_then_skips_unchanged(
+        self,
+        out_dir: pathlib.Path,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        write_raw(out_dir, "2025-12-01", [make_entry("A"), make_entry("B")])
+        write_raw(out_dir, "2025-12-02", [make_entry("C")])
+
+        result = backfill.run(DATES, 2, None, pathlib.Path("missing.yml"))
+
+        assert result == {"rendered": 2, "skipped": 0, "missing": 1, "failed": 0}
+        assert "#### [A](https://example.com/A)" in (out_dir / "digest-2025-12-01.md").read_text(
+            encoding="utf-8"
+        )
+        assert (out_dir / "digest-2025-12-02.md").exists()
+
+        write_raw(out_dir, "2025-12-02", [make_entry("C"), make_entry("D")])
+        result = backfill.run(DATES, 2, None, pathlib.Path("missing.yml"))
+
+        assert result == {"rendered": 1, "skipped": 1, "missing": 1, "failed": 0}
+
+    def test_renderer_version_change_rerenders(
+        self,
+        out_dir: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        write_raw(out_dir, "2025-12-01", [make_entry("A")])
+        backfill.run(DATES[:1], 1, None, pathlib.Path("missing.yml"))
+
+        monkeypatch.setattr(digest, "RENDERER_VERSION", digest.RENDERER_VERSION + 1)
+        todo, _missing = backfill.plan(DATES[:1], backfill.load_state(backfill.STATE_PATH), "")
+
+        assert [item[0] for item in todo] == ["2025-12-01"]
+
+    def test_top_k_uses_shared_config(
+        self,
+        out_dir: pathlib.Path,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        write_raw(out_dir, "2025-12-01", [make_entry("A"), make_entry("B"), make_entry("C")])
+
+        result = backfill.run(DATES[:1], 1, 1, pathlib.Path("missing.yml"))
+
+        assert result["rendered"] == 1
+        text = (out_dir / "digest-2025-12-01.md").read_text(encoding="utf-8")
+        assert text.count("#### ") == 1
+
+    def test_failed_day_is_reported(
+        self,
+        out_dir: pathlib.Path,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        (out_dir / "raw-2025-12-01.json").write_text("{broken", encoding="utf-8")
+        write_raw(out_dir, "2025-12-02", [make_entry("C")])
+
+        result = backfill.run(DATES[:2], 2, None, pathlib.Path("missing.yml"))
+
+        assert result["failed"] == 1
+        assert result["rendered"] == 1
+        state: Dict[str, Any] = backfill.load_state(backfill.STATE_PATH)
+        assert list(state) == ["2025-12-02"]
+
+
+class TestTrends:
+    """測試 backfill 的 digest 與一般執行同樣含趨勢段落。"""
+
+    def test_backfilled_digest_has_trends(
+        self,
+        out_dir: pathlib.Path,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        days = ["2025-12-01", "2025-12-02", "2025-12-03", "2025-12-04"]
+        for date in days[:3]:
+            write_raw(out_dir, date, [make_entry(f"alpha {date}")])
+        write_raw(out_dir, days[3], [make_entry(f"rust {word}") for word in ("one", "two", "three")])
+
+        result = backfill.run(days, 2, None, pathlib.Path("missing.yml"))
+
+        assert result["rendered"] == 4
+        text = (out_dir / "digest-2025-12-04.md").read_text(encoding="utf-8")
+        assert "## 趨勢" in text
+        assert "「rust」" in text
+        assert "## 趨勢" not in (out_dir / "digest-2025-12-03.md").read_text(encoding="utf-8")
+        store = digest.trends.TrendStore.load(digest.trends.store_path(out_dir))
+        assert store.days == days
+
+    def test_state_version_change_rerenders(
+        self,
+        out_dir: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        write_raw(out_dir, "2025-12-01", [make_entry("A")])
+        backfill.run(DATES[:1], 1, None, pathlib.Path("missing.yml"))
+
+        monkeypatch.setattr(backfill, "STATE_VERSION", backfill.STATE_VERSION + 1)
+        todo, _missing = backfill.plan(DATES[:1], backfill.load_state(backfill.STATE_PATH), "")
+
+        assert [item[0] for item in todo] == ["2025-12-01"]
+
+
+def test_main_exits_without_inputs(
+    monkeypatch: pytest.MonkeyPatch, out_dir: pathlib.Path
+) -> None:
+    monkeypatch.setattr(sys, "argv", ["backfill.py", "--range", "2025-12-01..2025-12-02"])
+    monkeypatch.setattr(digest, "setup_logging", lambda **_: None)
+
+    with pytest.raises(SystemExit) as exc:
+        backfill.main()
+
+    assert exc.value.code == 2
@@ -0,0 +1,171 @@
+"""測試 HTTP cassette 錄製與重播。"""
+import json
+import pathlib
+import sys
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+import requests
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import cassette
+import collector
+
+RSS_SOURCE = {"key": "feed/1", "name": "Feed", "url": "https://example.com/rss", "category": "news"}
+PH_SOURCE = {"key": "producthunt", "name": "PH", "category": "product", "limit": 1}
+PH_PAYLOAD = {
+    "data": {
+        "posts": {
+            "edges": [
+                {
+                    "node": {
+                        "name": "Tool",
+                        "tagline": "Tagline",
+                        "url": "https://producthunt.com/posts/tool",
+                        "createdAt": "2025-12-25T08:00:00Z",
+                    }
+                }
+            ]
+        }
+    }
+}
+
+
+def fake_parse(content: bytes) -> SimpleNamespace:
+    entries = [
+        {"title": title, "link": f"https://example.com/{title}", "summary": "<p>s</p>"}
+        for title in content.decode().split(",")
+    ]
+    return SimpleNamespace(entries=entries, bozo=False)
+
+
+class FakeResponse:
+    def __init__(self, content: bytes, status_code: int = 200) -> None:
+        self.content = content
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/rss+xml", "ETag": "abc"}
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+@pytest.fixture(autouse=True)
+def reset_cassette(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(collector, "CASSETTE", None)
+    monkeypatch.setattr(collector, "RETRY_DELAY", 0)
+    monkeypatch.setattr(collector.feedparser, "parse", fake_parse)
+
+
+def offline(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*_args: Any, **_kwargs: Any) -> None:
+        raise AssertionError("replay must not touch the network")
+
+    monkeypatch.setattr(collector.requests, "get", fail)
+    monkeypatch.setattr(collector.requests, "post", fail)
+
+
+class TestCassette:
+    """測試 cassette 檔案格式。"""
+
+    def test_round_trip(self, tmp_path: pathlib.Path) -> None:
+        tape = cassette.Cassette(tmp_path, "record")
+
+        tape.save("hn/front page", "GET", "https://hn/rss", FakeResponse(b"\x00raw bytes"))
+        document, response = cassette.Cassette(tmp_path, "replay").load("hn/front page")
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "hn_front_page.body",
+            "hn_front_page.json",
+        ]
+        assert document["url"] == "https://hn/rss"
+        assert response.content == b"\x00raw bytes"
+        assert response.headers["ETag"] == "abc"
+        assert response.status_code == 200
+
+    def test_replayed_error_status_raises(self, tmp_path: pathlib.Path) -> None:
+        tape = cassette.Cassette(tmp_path, "record")
+        tape.save("bad", "GET", "https://bad", FakeResponse(b"oops", status_code=503))
+
+        _document, response = tape.load("bad")
+
+        with pytest.raises(requests.HTTPError, match="503"):
+            response.raise_for_status()
+
+    def test_missing_or_outdated(self, tmp_path: pathlib.Path) -> None:
+        tape = cassette.Cassette(tmp_path, "replay")
+        with pytest.raises(cassette.CassetteMissing):
+            tape.load("nothing")
+
+        cassette.Cassette(tmp_path, "record").save("old", "GET", "u", FakeResponse(b""))
+        meta_path, _body = tape.paths("old")
+        meta_path.write_text(json.dumps({"version": 0}), encoding="utf-8")
+        with pytest.raises(cassette.CassetteMissing, match="版本"):
+            tape.load("old")
+
+    def test_rejects_unknown_mode(self, tmp_path: pathlib.Path) -> None:
+        with pytest.raises(ValueError):
+            cassette.Cassette(tmp_path, "rewind")
+
+
+class TestCollectorCassette:
+    """測試 collector 經由同一 fetch layer 錄製與重播。"""
+
+    def test_record_then_replay_rss(self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> None:
+        monkeypatch.setattr(collector.requests, "get", lambda url, timeout: FakeResponse(b"a,b"))
+        collector.configure_cassette(tmp_path, None)
+        recorded = collector.fetch_rss_or_atom(RSS_SOURCE)
+
+        offline(monkeypatch)
+        collector.configure_cassette(None, tmp_path)
+        replayed = collector.fetch_rss_or_atom(RSS_SOURCE)
+
+        assert [entry.to_dict() | {"fetched_at": ""} for entry in replayed] == [
+            entry.to_dict() | {"fetched_at": ""} for entry in recorded
+        ]
+        assert collector.FETCH_STATS["feed/1"]["bytes"] == 3
+
+    def test_replay_product_hunt_without_token(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+    ) -> None:
+        posted: List[Dict[str, Any]] = []
+
+        def fake_post(url: str, **kwargs: Any) -> FakeResponse:
+            posted.append(kwargs)
+            return FakeResponse(json.dumps(PH_PAYLOAD).encode())
+
+        monkeypatch.setattr(collector.os, "getenv", lambda _key: "secret-token")
+        monkeypatch.setattr(collector.requests, "post", fake_post)
+        collector.configure_cassette(tmp_path, None)
+        assert len(collector.fetch_producthunt(PH_SOURCE)) == 1
+        assert posted[0]["headers"]["Authorization"] == "Bearer secret-token"
+        assert "secret-token" not in (tmp_path / "producthunt.json").read_text(encoding="utf-8")
+
+        offline(monkeypatch)
+        monkeypatch.setattr(collector.os, "getenv", lambda _key: None)
+        collector.configure_cassette(None, tmp_path)
+        (entry,) = collector.fetch_producthunt(PH_SOURCE)
+
+        assert entry.title == "Tool"
+        assert entry.published_epoch == 1766649600
+
+    def test_missing_cassette_fails_without_retry(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+    ) -> None:
+        offline(monkeypatch)
+        collector.configure_cassette(None, tmp_path)
+
+        assert collector.fetch_rss_or_atom(RSS_SOURCE) == []
+        assert collector.FETCH_STATS["feed/1"]["attempts"] == 1
+
+    def test_missing_replay_dir_exits(self, tmp_path: pathlib.Path) -> None:
+        with pytest.raises(SystemExit) as exc_info:
+            collector.configure_cassette(None, tmp_path / "missing")
+
+        assert exc_info.value.code == 1
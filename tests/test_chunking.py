@@ -0,0 +1,104 @@
+"""測試依位元組上限切分 digest。"""
+import io
+import pathlib
+import sys
+from typing import Any, Dict, List
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import chunking
+import digest
+import renderers
+
+
+def make_entries(sources: Dict[str, int], category: str = "news") -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": f"{source} 第 {idx} 則",
+            "url": f"https://example.com/{source}/{idx}",
+            "summary_raw": "摘要" * 40,
+            "published_at": "2025-12-22",
+            "source": source,
+            "tags": [],
+            "category": category,
+        }
+        for source, count in sources.items()
+        for idx in range(count)
+    ]
+
+
+def render_full(model: renderers.DigestModel) -> str:
+    buffer = io.StringIO()
+    renderers.MarkdownRenderer().render(model, buffer)
+    return buffer.getvalue()
+
+
+class TestChunkMarkdown:
+    """測試切分規則。"""
+
+    def test_single_part_when_under_budget(self) -> None:
+        model = renderers.build_model(make_entries({"A": 2}), "2025-12-22", {"dedup_rate": 0.1})
+
+        parts = chunking.chunk_markdown(model, 1_000_000)
+
+        assert len(parts) == 1
+        assert parts[0].text.startswith("# 技術資訊摘要 - 2025-12-22（第 1 部分）\n\n## 摘要指標")
+        assert parts[0].size == len(parts[0].text.encode("utf-8"))
+        assert parts[0].text.endswith(renderers.footer_text(model) + "*")
+
+    def test_parts_respect_budget_and_keep_all_entries(self) -> None:
+        entries = make_entries({"A": 4, "B": 3}) + make_entries({"C": 5}, category="tools")
+        model = renderers.build_model(entries, "2025-12-22")
+        entry_size = len(render_full(renderers.build_model(entries[:1], "x")).encode("utf-8"))
+
+        parts = chunking.chunk_markdown(model, entry_size * 3)
+
+        assert len(parts) > 1
+        assert all(part.size <= entry_size * 3 for part in parts)
+        assert all(part.size == len(part.text.encode("utf-8")) for part in parts)
+        assert sum(part.entries for part in parts) == len(entries)
+        joined = "".join(part.text for part in parts)
+        for entry in entries:
+            assert entry["title"] in joined
+        assert parts[1].text.startswith("# 技術資訊摘要 - 2025-12-22（第 2 部分）\n\n## ")
+
+    def test_prefers_source_boundaries(self) -> None:
+        model = renderers.build_model(make_entries({"A": 2, "B": 2}), "2025-12-22")
+        full_size = len(render_full(model).encode("utf-8"))
+
+        parts = chunking.chunk_markdown(model, full_size * 3 // 4)
+
+        assert len(parts) == 2
+        assert "### B" not in parts[0].text
+        assert "### A" not in parts[1].text
+        assert parts[1].categories == ["news"]
+
+    def test_oversized_entry_gets_own_part(self) -> None:
+        model = renderers.build_model(make_entries({"A": 2}), "2025-12-22")
+
+        parts = chunking.chunk_markdown(model, 100)
+
+        assert [part.entries for part in parts] == [1, 1]
+        assert all(part.size > 100 for part in parts)
+
+    def test_rejects_non_positive_budget(self) -> None:
+        with pytest.raises(ValueError):
+            chunking.chunk_markdown(renderers.build_model([], "d"), 0)
+
+
+def test_write_chunks_creates_parts_and_index(tmp_path: pathlib.Path) -> None:
+    base = tmp_path / "digest-2025-12-22.md"
+    (tmp_path / "digest-2025-12-22-part09.md").write_text("stale", encoding="utf-8")
+    model = renderers.build_model(make_entries({"A": 3, "B": 3}), "2025-12-22")
+
+    parts = digest.write_chunks(model, base, 2000)
+
+    names = sorted(path.name for path in tmp_path.iterdir())
+    expected = [chunking.part_path(base, part.number).name for part in parts]
+    assert names == sorted(expected + ["digest-2025-12-22-index.md"])
+    index = (tmp_path / "digest-2025-12-22-index.md").read_text(encoding="utf-8")
+    assert f"共 {len(parts)} 部分（每部分上限 2000 bytes）" in index
+    assert "[digest-2025-12-22-part01.md](digest-2025-12-22-part01.md)" in index
@@ -1,10 +1,11 @@
 """測試 collector 的資料整併與抓取邏輯。"""
+import argparse
 import datetime as dt
 import json
 import pathlib
 import sys
 from types import SimpleNamespace
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 
 import pytest
 import requests
@@ -14,68 +15,79 @@ sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
 
 import collector
 from collector import build_payload, merge_entries
+from models import Entry
 
 
 def test_merge_empty_lists():
     assert merge_entries([]) == []
 
 
-def test_merge_deduplicates(sample_entries: list[Dict[str, Any]]):
+def test_merge_deduplicates(sample_entries: list[Entry]):
     dup = sample_entries + [
-        {
-            "title": "Dup",
-            "link": sample_entries[0]["link"],
-            "summary": "Summary",
-            "published": "2025-12-23",
-            "source": "Another",
-            "tags": [],
-            "source_key": "source_2",
-        }
+        Entry.create(
+            title="Dup",
+            url=sample_entries[0].url,
+            summary_raw="Summary",
+            published_at="2025-12-23",
+            source="Another",
+            tags=[],
+            source_key="source_2",
+            category="news",
+        )
     ]
 
     merged = merge_entries([dup])
 
     assert len(merged) == 2
-    assert merged[0]["title"] == "Article 1"
+    assert merged[0].title == "Article 1"
 
 
-def test_merge_preserves_order(sample_entries: list[Dict[str, Any]]):
+def test_merge_preserves_order(sample_entries: list[Entry]):
     merged = merge_entries([sample_entries])
-    titles = [item["title"] for item in merged]
+    titles = [item.title for item in merged]
     assert titles == ["Article 1", "Article 2"]
 
 
-def test_build_payload_structure(sample_entries: list[Dict[str, Any]]):
+def test_build_payload_structure(sample_entries: list[Entry]):
     payload = build_payload(sample_entries)
 
     assert len(payload) == 2
-    entry = payload[0]
+    entry = payload[0].to_dict()
     assert entry["source_key"] == "source_1"
     assert entry["summary_raw"] == "Summary 1"
     assert entry["url"] == "https://example.com/1"
     assert entry["category"] == "community"
-    assert "fetched_at" in entry
+    assert entry["fetched_at"]
     assert entry["published_at"] == "2025-12-22"
 
 
 def test_build_payload_handles_missing_fields():
-    raw_entries = [
-        {
-            "title": "Missing",
-            "link": "",
-            "summary": "",
-            "published": "",
-            "source": "Test",
-            "source_key": "key",
-            "tags": [],
-        }
-    ]
+    raw_entries = [Entry.from_dict({"title": "Missing", "source": "Test", "source_key": "key"})]
 
     payload = build_payload(raw_entries)
 
-    assert payload[0]["url"] == ""
-    assert payload[0]["source"] == "Test"
-    assert payload[0]["category"] == "未分類"
+    assert payload[0].url == ""
+    assert payload[0].source == "Test"
+    assert payload[0].category == "未分類"
+
+
+class TestEntryModel:
+    """測試 Entry 的字串 interning 與序列化。"""
+
+    def test_entries_share_interned_fields(self):
+        first = Entry.from_dict({"source": "".join(["Shared ", "Source"]), "tags": ["a", "b"]})
+        second = Entry.from_dict({"source": "".join(["Shared ", "Sou", "rce"]), "tags": ["a", "b"]})
+
+        assert first.source is second.source
+        assert first.tags is second.tags
+
+    def test_entry_has_no_instance_dict(self, sample_entries: list[Entry]):
+        assert not hasattr(sample_entries[0], "__dict__")
+
+    def test_to_dict_round_trip(self, sample_payload_entries: list[Dict[str, Any]]):
+        entry = Entry.from_dict(sample_payload_entries[0])
+
+        assert entry.to_dict() == sample_payload_entries[0]
 
 
 class DummyResponse:
@@ -129,9 +141,11 @@ class TestFetchRssOrAtom:
         entries = collector.fetch_rss_or_atom(source)
 
         assert len(entries) == 1
-        assert entries[0]["title"] == "Entry"
-        assert entries[0]["source"] == "Sample Feed"
-        assert entries[0]["category"] == "community"
+        assert entries[0].title == "Entry"
+        assert entries[0].source == "Sample Feed"
+        assert entries[0].category == "community"
+        assert entries[0].published_at == "2025-12-25T00:00:00+00:00"
+        assert entries[0].published_epoch == 1766620800
 
     def test_fetch_rss_or_atom_timeout(self, monkeypatch: pytest.MonkeyPatch) -> None:
         source = {"name": "Timeout Feed", "url": "https://example.com/rss"}
@@ -204,11 +218,12 @@ class TestFetchProductHunt:
 
         assert len(entries) == 1
         entry = entries[0]
-        assert entry["title"] == "Tool"
-        assert entry["link"] == "https://producthunt.com/tool"
+        assert entry.title == "Tool"
+        assert entry.url == "https://producthunt.com/tool"
         # tags 應包含來源 tags 與 topics，且去重後仍保留原始順序
-        assert entry["tags"] == ["startup", "AI"]
-        assert entry["category"] == "product"
+        assert entry.tags == ("startup", "AI")
+        assert entry.category == "product"
+        assert entry.published_epoch == 1766620800
 
     def test_fetch_producthunt_missing_token(self, monkeypatch: pytest.MonkeyPatch) -> None:
         source = {"name": "PH", "key": "producthunt_daily"}
@@ -248,11 +263,16 @@ class TestSetupLogging:
         log_file = tmp_path / "collector.log"
 
         collector.setup_logging(verbose=True, log_file=log_file)
+        listener = collector.logutil._LISTENER
+        collector.logutil.stop_logging()
 
         assert log_file.exists()
         assert "kwargs" in recorded
         handlers = recorded["kwargs"].get("handlers", [])
-        assert len(handlers) == 2
+        # root 只掛 QueueHandler，console/file 由背景 listener 寫出
+        assert len(handlers) == 1
+        assert isinstance(handlers[0], collector.logging.handlers.QueueHandler)
+        assert listener is not None and len(listener.handlers) == 2
         assert recorded["kwargs"].get("level") == collector.logging.DEBUG
 
 
@@ -261,7 +281,8 @@ def test_write_payload_writes_json(
 ) -> None:
     output = tmp_path / "raw-2025-12-25.json"
 
-    document = {"meta": {"foo": "bar"}, "entries": sample_payload_entries}
+    entries = [Entry.from_dict(sample_payload_entries[0]), sample_payload_entries[1]]
+    document = {"meta": {"foo": "bar"}, "entries": entries}
     collector.write_payload(document, output)
 
     assert output.exists()
@@ -314,9 +335,10 @@ class TestMain:
     def test_main_dry_run_success(
         self,
         monkeypatch: pytest.MonkeyPatch,
-        sample_entries: list[Dict[str, Any]],
+        sample_entries: list[Entry],
+        collector_args: Callable[..., argparse.Namespace],
     ) -> None:
-        fake_args = SimpleNamespace(date="2025-12-30", output=None, dry_run=True, verbose=False)
+        fake_args = collector_args("--dry-run")
         monkeypatch.setattr(collector, "parse_args", lambda: fake_args)
 
         monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
@@ -332,11 +354,12 @@ class TestMain:
     def test_main_writes_payload(
         self,
         monkeypatch: pytest.MonkeyPatch,
-        sample_entries: list[Dict[str, Any]],
+        sample_entries: list[Entry],
         tmp_path: pathlib.Path,
+        collector_args: Callable[..., argparse.Namespace],
     ) -> None:
         output_path = tmp_path / "raw.json"
-        fake_args = SimpleNamespace(date="2025-12-30", output=output_path, dry_run=False, verbose=True)
+        fake_args = collector_args("--output", str(output_path), "--verbose")
         monkeypatch.setattr(collector, "parse_args", lambda: fake_args)
         monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
         monkeypatch.setattr(
@@ -362,8 +385,10 @@ class TestMain:
         assert recorded["meta"]["raw_entries"] == len(sample_entries)
         assert recorded["meta"]["failed_source_count"] == 0
 
-    def test_main_exits_when_no_sources(self, monkeypatch: pytest.MonkeyPatch) -> None:
-        fake_args = SimpleNamespace(date="2025-12-30", output=None, dry_run=False, verbose=False)
+    def test_main_exits_when_no_sources(
+        self, monkeypatch: pytest.MonkeyPatch, collector_args: Callable[..., argparse.Namespace]
+    ) -> None:
+        fake_args = collector_args()
         monkeypatch.setattr(collector, "parse_args", lambda: fake_args)
         monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
         monkeypatch.setattr(collector, "load_config", lambda _path: {"sources": []})
@@ -373,8 +398,10 @@ class TestMain:
 
         assert exc_info.value.code == 2
 
-    def test_main_exits_when_all_sources_fail(self, monkeypatch: pytest.MonkeyPatch) -> None:
-        fake_args = SimpleNamespace(date="2025-12-30", output=None, dry_run=False, verbose=False)
+    def test_main_exits_when_all_sources_fail(
+        self, monkeypatch: pytest.MonkeyPatch, collector_args: Callable[..., argparse.Namespace]
+    ) -> None:
+        fake_args = collector_args()
         monkeypatch.setattr(collector, "parse_args", lambda: fake_args)
         monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
         monkeypatch.setattr(
@@ -389,8 +416,13 @@ class TestMain:
 
         assert exc_info.value.code == 2
 
-    def test_main_write_payload_error(self, monkeypatch: pytest.MonkeyPatch, sample_entries: list[Dict[str, Any]]) -> None:
-        fake_args = SimpleNamespace(date="2025-12-30", output=None, dry_run=False, verbose=False)
+    def test_main_write_payload_error(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        sample_entries: list[Entry],
+        collector_args: Callable[..., argparse.Namespace],
+    ) -> None:
+        fake_args = collector_args()
         monkeypatch.setattr(collector, "parse_args", lambda: fake_args)
         monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
         monkeypatch.setattr(
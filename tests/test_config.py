@@ -1,7 +1,7 @@
 """測試 digest.py 的配置載入功能。"""
 import pathlib
 import sys
-from typing import Dict, Any
+from typing import Any, Dict, List
 
 import pytest
 import yaml
@@ -9,7 +9,17 @@ import yaml
 # 將 ops/ 加入路徑
 sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
 
-from collector import load_config
+import collector
+import configcache
+from collector import load_config, reload_config
+
+
+@pytest.fixture(autouse=True)
+def isolated_config_cache(monkeypatch: pytest.MonkeyPatch, temp_dir: pathlib.Path) -> configcache.ConfigCache:
+    """每個測試使用獨立的設定快取，避免寫入專案的 cache/ 目錄。"""
+    cache = configcache.ConfigCache(temp_dir / "cache")
+    monkeypatch.setattr(collector, "CONFIG_CACHE", cache)
+    return cache
 
 
 class TestLoadConfig:
@@ -150,3 +160,149 @@ class TestLoadConfig:
         config = load_config(yml_path)
         
         assert config["sources"] == []
+
+    def test_load_config_normalizes_optional_fields(self, temp_dir: pathlib.Path):
+        """測試選填欄位會補上預設值。"""
+        minimal = {
+            "sources": [
+                {
+                    "key": "minimal",
+                    "name": "Test",
+                    "url": "https://example.com/feed.xml",
+                    "type": "rss",
+                    "category": "news",
+                }
+            ]
+        }
+        yml_path = temp_dir / "minimal.yml"
+        yml_path.write_text(yaml.dump(minimal), encoding="utf-8")
+
+        config = load_config(yml_path)
+
+        assert config["sources"][0]["enabled"] is True
+        assert config["sources"][0]["tags"] == []
+
+
+class TestConfigCache:
+    """測試設定編譯快取與熱重載。"""
+
+    def test_unchanged_file_skips_read(
+        self, sample_feeds_yml: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        first = load_config(sample_feeds_yml)
+
+        def fail_read(*_args: Any) -> bytes:
+            raise AssertionError("mtime/size 未變時不應重新讀檔")
+
+        monkeypatch.setattr(pathlib.Path, "read_bytes", fail_read)
+
+        assert load_config(sample_feeds_yml) is first
+
+    def test_disk_cache_skips_yaml_parse(
+        self,
+        sample_feeds_yml: pathlib.Path,
+        temp_dir: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        first = load_config(sample_feeds_yml)
+        # 模擬新的行程：記憶體快取為空，但磁碟上已有編譯結果
+        monkeypatch.setattr(collector, "CONFIG_CACHE", configcache.ConfigCache(temp_dir / "cache"))
+
+        def fail_parse(_data: bytes) -> Any:
+            raise AssertionError("雜湊命中時不應重新解析 YAML")
+
+        monkeypatch.setattr(configcache, "parse_yaml", fail_parse)
+
+        assert load_config(sample_feeds_yml) == first
+
+    def test_reload_reports_diff(self, sample_feeds_yml: pathlib.Path, sample_config: Dict[str, Any]):
+        _config, initial = reload_config(sample_feeds_yml)
+        assert initial.added == ["source_1", "source_2"]
+
+        sample_config["sources"][0]["url"] = "https://example.com/changed.xml"
+        sample_config["sources"].pop(1)
+        sample_config["sources"].append(
+            {
+                "key": "source_3",
+                "name": "Test Source 3",
+                "url": "https://example.com/feed3.xml",
+                "type": "rss",
+                "category": "news",
+            }
+        )
+        sample_feeds_yml.write_text(yaml.dump(sample_config) + "\n# edited\n", encoding="utf-8")
+
+        config, diff = reload_config(sample_feeds_yml)
+
+        assert diff.added == ["source_3"]
+        assert diff.removed == ["source_2"]
+        assert diff.changed == ["source_1"]
+        assert config["sources"][0]["url"] == "https://example.com/changed.xml"
+
+    def test_reload_still_rejects_invalid_changes(
+        self, sample_feeds_yml: pathlib.Path, sample_config: Dict[str, Any]
+    ):
+        load_config(sample_feeds_yml)
+        sample_config["sources"][1]["type"] = "invalid_type"
+        sample_feeds_yml.write_text(yaml.dump(sample_config) + "\n# edited\n", encoding="utf-8")
+
+        with pytest.raises(SystemExit) as exc_info:
+            load_config(sample_feeds_yml)
+
+        assert exc_info.value.code == 1
+
+    def test_parse_yaml_prefers_c_loader(self, monkeypatch: pytest.MonkeyPatch):
+        used: Dict[str, Any] = {}
+
+        class FakeLoader(yaml.SafeLoader):
+            def __init__(self, stream: Any) -> None:
+                used["loader"] = True
+                super().__init__(stream)
+
+        monkeypatch.setattr(yaml, "CSafeLoader", FakeLoader, raising=False)
+
+        assert configcache.parse_yaml(b"sources: []") == {"sources": []}
+        assert used == {"loader": True}
+
+    def test_disk_cache_is_bounded(self, temp_dir: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(configcache, "MAX_DISK_ENTRIES", 2)
+        cache = configcache.ConfigCache(temp_dir / "bounded")
+        for idx in range(4):
+            compiled = configcache.CompiledConfig(f"digest{idx}", idx, idx, {"sources": []})
+            cache.store(temp_dir / f"feeds{idx}.yml", compiled)
+
+        assert len(list((temp_dir / "bounded").glob("*.json"))) == 2
+
+    def test_unserializable_values_skip_disk_cache(self, temp_dir: pathlib.Path):
+        config_path = temp_dir / "feeds.yml"
+        config_path.write_text(
+            "sources:\n"
+            "  - {key: a, name: A, url: u, type: rss, category: news, added: 2025-01-01}\n",
+            encoding="utf-8",
+        )
+
+        config = load_config(config_path)
+
+        assert str(config["sources"][0]["added"]) == "2025-01-01"
+        assert not list((temp_dir / "cache").glob("*.json"))
+        assert load_config(config_path) is config
+
+    def test_older_compiler_version_is_not_reused(
+        self, sample_feeds_yml: pathlib.Path, temp_dir: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        load_config(sample_feeds_yml)
+        monkeypatch.setattr(configcache, "COMPILER_VERSION", configcache.COMPILER_VERSION + 1)
+        monkeypatch.setattr(collector, "CONFIG_CACHE", configcache.ConfigCache(temp_dir / "cache"))
+        parsed: List[bytes] = []
+        real_parse = configcache.parse_yaml
+
+        def counting_parse(data: bytes) -> Any:
+            parsed.append(data)
+            return real_parse(data)
+
+        monkeypatch.setattr(configcache, "parse_yaml", counting_parse)
+
+        load_config(sample_feeds_yml)
+
+        assert len(parsed) == 1
+        assert len(list((temp_dir / "cache").glob("*.json"))) == 2
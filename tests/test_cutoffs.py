@@ -0,0 +1,235 @@
+"""測試 --since、max_age 與 high-water mark 截止。"""
+import argparse
+import pathlib
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import collector
+import cutoffs
+from models import Entry
+
+NOW = 1766404800.0  # 2025-12-22T12:00:00Z
+HOUR = 3600
+
+
+class TestParsing:
+    """測試時間長度與 --since 解析。"""
+
+    @pytest.mark.parametrize(
+        "value, seconds",
+        [
+            ("90m", 5400),
+            ("36h", 36 * HOUR),
+            ("7d", 7 * 86400),
+            ("1w", 7 * 86400),
+            (2, 2 * HOUR),
+            ("36", 36 * HOUR),
+            ("1.5", 1.5 * HOUR),
+        ],
+    )
+    def test_parse_duration(self, value: Any, seconds: float) -> None:
+        assert cutoffs.parse_duration(value) == seconds
+
+    @pytest.mark.parametrize("value", ["", "soon", "0h", -1, True])
+    def test_parse_duration_rejects(self, value: Any) -> None:
+        with pytest.raises(ValueError):
+            cutoffs.parse_duration(value)
+
+    def test_parse_since(self) -> None:
+        assert cutoffs.parse_since("12h", NOW) == NOW - 12 * HOUR
+        assert cutoffs.parse_since("36", NOW) == NOW - 36 * HOUR
+        assert cutoffs.parse_since("2025-12-22", NOW) == NOW - 12 * HOUR
+        assert cutoffs.parse_since("2025-12-22T20:00:00+08:00", NOW) == NOW
+        with pytest.raises(ValueError):
+            cutoffs.parse_since("last week", NOW)
+
+    def test_validate_config(self) -> None:
+        cutoffs.validate_config({"max_age": "3d", "sources": [{"key": "a", "max_age": "12h"}]})
+        cutoffs.validate_config({"max_age": "36"})
+        with pytest.raises(ValueError, match="'a'"):
+            cutoffs.validate_config({"sources": [{"key": "a", "max_age": "forever"}]})
+
+
+class TestSourceCutoff:
+    """測試各截止條件取最晚者。"""
+
+    def test_nothing_configured(self) -> None:
+        assert cutoffs.source_cutoff({"key": "a"}, {}, NOW) is None
+
+    def test_source_max_age_overrides_global(self) -> None:
+        config = {"max_age": "3d"}
+
+        assert cutoffs.source_cutoff({"key": "a"}, config, NOW) == NOW - 3 * 86400
+        assert cutoffs.source_cutoff({"key": "a", "max_age": "6h"}, config, NOW) == NOW - 6 * HOUR
+
+    def test_latest_wins(self) -> None:
+        marks = cutoffs.Watermarks({"a": int(NOW - HOUR)})
+
+        cutoff = cutoffs.source_cutoff({"key": "a"}, {"max_age": "1d"}, NOW, NOW - 5 * HOUR, marks)
+
+        assert cutoff == NOW - HOUR + 1
+        assert cutoffs.source_cutoff({"key": "b"}, {}, NOW, NOW - 5 * HOUR, marks) == NOW - 5 * HOUR
+
+
+class TestWatermarks:
+    """測試 high-water mark 儲存。"""
+
+    def test_advance_only_moves_forward(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        marks = cutoffs.Watermarks({"a": 100, "b": 500})
+
+        entries = [
+            Entry.from_dict(make_entry(source_key=key, published_epoch=epoch))
+            for key, epoch in [("a", 150), ("a", 120), ("b", 400), ("c", None)]
+        ]
+
+        moved = marks.advance(entries)
+
+        assert moved == {"a": 150}
+        assert marks.marks == {"a": 150, "b": 500}
+
+    def test_round_trip_and_corrupt_file(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "watermarks.json"
+        cutoffs.Watermarks({"a": 1}).save(path)
+
+        assert cutoffs.Watermarks.load(path).marks == {"a": 1}
+        path.write_text("[", encoding="utf-8")
+        assert cutoffs.Watermarks.load(path).marks == {}
+
+
+class FakeFeed(SimpleNamespace):
+    pass
+
+
+class TestCollectorCutoffs:
+    """測試 collector 在解析時丟棄舊 entry。"""
+
+    @pytest.fixture(autouse=True)
+    def reset(self) -> None:
+        collector.CUTOFFS.clear()
+        yield
+        collector.CUTOFFS.clear()
+
+    def feed(self, monkeypatch: pytest.MonkeyPatch, hours_ago: List[int]) -> None:
+        entries = [
+            {
+                "title": f"{hours} hours ago",
+                "link": f"https://example.com/{hours}",
+                "published": time.strftime(
+                    "%a, %d %b %Y %H:%M:%S GMT", time.gmtime(NOW - hours * HOUR)
+                ),
+                "published_parsed": time.gmtime(NOW - hours * HOUR),
+            }
+            for hours in hours_ago
+        ]
+        monkeypatch.setattr(
+            collector.requests, "get", lambda url, timeout: SimpleNamespace(
+                content=b"<rss>", raise_for_status=lambda: None
+            )
+        )
+        monkeypatch.setattr(
+            collector.feedparser, "parse", lambda _content: FakeFeed(entries=entries, bozo=False)
+        )
+
+    def test_old_entries_dropped_before_limit(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.feed(monkeypatch, [30, 1, 40, 2, 3])
+        collector.CUTOFFS["feed"] = NOW - 24 * HOUR
+        source = {"key": "feed", "name": "Feed", "url": "https://example.com/rss", "limit": 2}
+
+        entries = collector.fetch_rss_or_atom(source)
+
+        assert [entry.title for entry in entries] == ["1 hours ago", "2 hours ago"]
+        assert collector.FETCH_STATS["feed"]["too_old"] == 2
+
+    def test_no_cutoff_keeps_everything(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.feed(monkeypatch, [30, 1])
+
+        entries = collector.fetch_rss_or_atom({"key": "feed", "name": "Feed", "url": "u"})
+
+        assert len(entries) == 2
+        assert collector.FETCH_STATS["feed"]["too_old"] == 0
+
+    def test_invalid_max_age_exits(self) -> None:
+        config = {
+            "max_age": "someday",
+            "sources": [
+                {"key": "a", "name": "A", "url": "u", "type": "rss", "category": "news"}
+            ],
+        }
+
+        with pytest.raises(SystemExit) as exc_info:
+            collector.compile_config(config)
+
+        assert exc_info.value.code == 1
+
+    def run_main(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        collector_args: Callable[..., argparse.Namespace],
+        fetched: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        args = collector_args(
+            "--date", "2025-12-22", "--output", str(tmp_path / "raw.json"), "--since-last-run"
+        )
+        sources = [
+            {"key": key, "name": key.upper(), "type": "rss", "enabled": True} for key in fetched
+        ]
+        recorded: Dict[str, Any] = {}
+
+        def fake_fetch(source: Dict[str, Any]) -> List[Entry]:
+            entries, too_old = fetched[source["key"]]
+            collector.FETCH_STATS[source["key"]] = {"attempts": 1, "bytes": 0, "too_old": too_old}
+            return entries
+
+        monkeypatch.setattr(collector, "parse_args", lambda: args)
+        monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
+        monkeypatch.setattr(collector, "load_config", lambda _path: {"sources": sources})
+        monkeypatch.setattr(collector, "fetch_source", fake_fetch)
+        monkeypatch.setattr(collector, "update_search_index", lambda *_: None)
+        monkeypatch.setattr(collector, "WATERMARKS_PATH", tmp_path / "watermarks.json")
+        monkeypatch.setattr(
+            collector, "write_payload", lambda document, _path: recorded.update(document)
+        )
+        collector.main()
+        return recorded
+
+    def test_main_advances_marks_and_counts_old_sources_as_ok(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        collector_args: Callable[..., argparse.Namespace],
+        make_entry: Callable[..., Dict[str, Any]],
+    ) -> None:
+        cutoffs.Watermarks({"quiet": 100}).save(tmp_path / "watermarks.json")
+        busy = [
+            Entry.from_dict(make_entry(f"busy {epoch}", source_key="busy", published_epoch=epoch))
+            for epoch in (200, 300)
+        ]
+
+        document = self.run_main(
+            monkeypatch, tmp_path, collector_args, {"busy": (busy, 1), "quiet": ([], 4)}
+        )
+
+        assert collector.CUTOFFS == {"quiet": 101}
+        assert document["meta"]["too_old_entries"] == 5
+        assert document["meta"]["failed_source_count"] == 0
+        marks = cutoffs.Watermarks.load(tmp_path / "watermarks.json").marks
+        assert marks == {"busy": 300, "quiet": 100}
+
+    def test_main_all_old_writes_empty_payload(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        collector_args: Callable[..., argparse.Namespace],
+    ) -> None:
+        document = self.run_main(monkeypatch, tmp_path, collector_args, {"quiet": ([], 3)})
+
+        assert document["entries"] == []
+        assert document["meta"]["failed_source_count"] == 0
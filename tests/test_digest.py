@@ -1,5 +1,6 @@
 """測試 digest.py 的資料處理功能。"""
 import datetime as dt
+import io
 import json
 import logging
 import pathlib
@@ -13,6 +14,7 @@ import pytest
 sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
 
 import digest
+import renderers
 from digest import LOGGER, generate_markdown, load_entries, parse_args, setup_logging
 
 
@@ -269,6 +271,52 @@ class TestGenerateMarkdown:
         assert "*本摘要由自動化系統產生於 " in markdown
 
 
+class TestStreamingRenderer:
+    """測試 write_markdown 串流輸出。"""
+
+    def test_writes_incrementally(self, sample_payload_entries: list[Dict[str, Any]]):
+        chunks: list[str] = []
+        writer = SimpleNamespace(write=chunks.append)
+
+        digest.write_markdown(sample_payload_entries, "2025-12-22", None, writer)
+
+        assert len(chunks) > 5
+        assert chunks[0] == "# 技術資訊摘要 - 2025-12-22\n\n"
+        assert "[Article 2](https://example.com/2)" in "".join(chunks)
+
+    def test_wrapper_matches_stream(self, sample_payload_entries: list[Dict[str, Any]]):
+        buffer = io.StringIO()
+        digest.write_markdown(sample_payload_entries, "2025-12-22", {"dedup_rate": 0.1}, buffer)
+
+        markdown = generate_markdown(sample_payload_entries, "2025-12-22", {"dedup_rate": 0.1})
+
+        # 兩者僅可能在時間戳記分鐘數不同
+        assert markdown.split("*本摘要")[0] == buffer.getvalue().split("*本摘要")[0]
+
+    def test_write_atomic_replaces_atomically(
+        self, tmp_path: pathlib.Path, sample_payload_entries: list[Dict[str, Any]]
+    ):
+        path = tmp_path / "out" / "digest.md"
+
+        digest.write_atomic(
+            path, lambda fh: digest.write_markdown(sample_payload_entries, "2025-12-22", None, fh)
+        )
+
+        assert path.read_text(encoding="utf-8").startswith("# 技術資訊摘要 - 2025-12-22")
+        assert [p.name for p in path.parent.iterdir()] == ["digest.md"]
+
+    def test_write_atomic_cleans_up_on_error(self, tmp_path: pathlib.Path):
+        def broken(_fh: Any) -> None:
+            raise OSError("disk full")
+
+        path = tmp_path / "digest.md"
+
+        with pytest.raises(OSError):
+            digest.write_atomic(path, broken)
+
+        assert list(tmp_path.iterdir()) == []
+
+
 class TestParseArgs:
     """測試 parse_args() 的 argparse 行為。"""
 
@@ -319,6 +367,21 @@ class TestParseArgs:
         with pytest.raises(SystemExit):
             parse_args()
 
+    @pytest.mark.parametrize("value, expected", [("0", 0), ("5", 5)])
+    def test_parse_args_top_k(self, monkeypatch: pytest.MonkeyPatch, value: str, expected: int) -> None:
+        monkeypatch.setattr(sys, "argv", ["prog", "--top-k", value])
+
+        assert parse_args().top_k == expected
+
+    @pytest.mark.parametrize("value", ["-1", "many"])
+    def test_parse_args_rejects_invalid_top_k(self, monkeypatch: pytest.MonkeyPatch, value: str) -> None:
+        monkeypatch.setattr(sys, "argv", ["prog", "--top-k", value])
+
+        with pytest.raises(SystemExit) as exc_info:
+            parse_args()
+
+        assert exc_info.value.code == 2
+
 
 class TestSetupLogging:
     """測試 setup_logging() 的 handler 與輸出。"""
@@ -339,10 +402,13 @@ class TestSetupLogging:
         setup_logging(verbose=True, log_file=log_file)
         LOGGER.debug("debug message")
         LOGGER.info("file message")
+        # 等待背景 listener 將佇列中的紀錄寫出
+        digest.logutil.stop_logging()
         captured = capsys.readouterr()
 
         assert LOGGER.isEnabledFor(logging.DEBUG)
-        assert "debug message" in captured.out
+        assert "debug message" in captured.err
+        assert "debug message" not in captured.out
         assert log_file.exists()
         assert "file message" in log_file.read_text(encoding="utf-8")
 
@@ -370,6 +436,18 @@ class TestMainFlow:
             output=None,
             dry_run=False,
             verbose=False,
+            metrics_dir=None,
+            log_json=False,
+            top_k=None,
+            config=None,
+            range=None,
+            weekly=False,
+            formats=["markdown"],
+            template=None,
+            template_engine="builtin",
+            max_bytes=None,
+            incremental=False,
+            profiles=None,
         )
         monkeypatch.setattr(digest, "parse_args", lambda: args)
 
@@ -385,7 +463,9 @@ class TestMainFlow:
             }
         ]
         monkeypatch.setattr(digest, "load_entries", lambda path: (entries, {"meta": True}))
-        monkeypatch.setattr(digest, "generate_markdown", lambda _entries, _date, _meta: "MARKDOWN")
+        monkeypatch.setattr(
+            renderers.MarkdownRenderer, "render", lambda _self, _model, out: out.write("MARKDOWN")
+        )
 
         digest.main()
 
@@ -410,6 +490,18 @@ class TestMainFlow:
             output=None,
             dry_run=True,
             verbose=True,
+            metrics_dir=None,
+            log_json=False,
+            top_k=None,
+            config=None,
+            range=None,
+            weekly=False,
+            formats=["markdown"],
+            template=None,
+            template_engine="builtin",
+            max_bytes=None,
+            incremental=False,
+            profiles=None,
         )
         monkeypatch.setattr(digest, "parse_args", lambda: args)
 
@@ -425,7 +517,7 @@ class TestMainFlow:
             }
         ]
         monkeypatch.setattr(digest, "load_entries", lambda path: (entries, {}))
-        monkeypatch.setattr(digest, "generate_markdown", lambda *_: "DRY")
+        monkeypatch.setattr(renderers.MarkdownRenderer, "render", lambda *args: args[-1].write("DRY"))
 
         digest.main()
 
@@ -448,6 +540,18 @@ class TestMainFlow:
             output=None,
             dry_run=False,
             verbose=False,
+            metrics_dir=None,
+            log_json=False,
+            top_k=None,
+            config=None,
+            range=None,
+            weekly=False,
+            formats=["markdown"],
+            template=None,
+            template_engine="builtin",
+            max_bytes=None,
+            incremental=False,
+            profiles=None,
         )
         monkeypatch.setattr(digest, "parse_args", lambda: args)
         monkeypatch.setattr(digest, "load_entries", lambda path: ([], {}))
@@ -0,0 +1,308 @@
+"""測試連結補充：meta description 解析、快取 TTL、主機限速與時間預算。"""
+import pathlib
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import collector
+import enrich
+from models import Entry
+
+NOW = 1766404800.0
+
+
+class TestParsing:
+    """測試 URL 正規化與 description 擷取。"""
+
+    def test_canonical_url(self) -> None:
+        assert (
+            enrich.canonical_url("HTTPS://Example.COM:443/a?b=2&utm_source=x&a=1#frag")
+            == "https://example.com/a?a=1&b=2"
+        )
+        assert enrich.canonical_url("http://example.com") == "http://example.com/"
+        assert enrich.canonical_url("http://example.com:8080/x") == "http://example.com:8080/x"
+
+    def test_prefers_open_graph(self) -> None:
+        markup = (
+            "<html><head><meta name=\"description\" content=\"plain\">"
+            "<meta property=\"og:description\" content=\"OG &amp; <b>more</b>\"/>"
+            "</head><body><meta name=\"twitter:description\" content=\"late\"></body></html>"
+        )
+
+        assert enrich.extract_description(markup) == "OG & more"
+
+    def test_stops_at_body(self) -> None:
+        markup = "<head></head><body><meta name=\"description\" content=\"too late\"></body>"
+
+        assert enrich.extract_description(markup) == ""
+
+    @pytest.mark.parametrize(
+        "section",
+        ["x", {"max_workers": 0}, {"max_workers": 1.5}, {"timeout": "10"}, {"ttl_hour": 1}],
+    )
+    def test_config_rejects(self, section: Any) -> None:
+        with pytest.raises(ValueError):
+            enrich.EnrichConfig.from_config({"enrich": section})
+
+    def test_config_overrides(self) -> None:
+        config = enrich.EnrichConfig.from_config({"enrich": {"max_kb": 16, "per_host_interval": 0}})
+
+        assert config.max_kb == 16
+        assert config.per_host_interval == 0
+        assert config.max_workers == enrich.EnrichConfig().max_workers
+
+
+class TestLinkCache:
+    """測試快取 TTL。"""
+
+    def test_ttl_for_success_and_failure(self, tmp_path: pathlib.Path) -> None:
+        config = enrich.EnrichConfig(ttl_hours=24, failure_ttl_hours=1)
+        cache = enrich.LinkCache()
+        cache.put("ok", "desc", True, NOW - 2 * 3600)
+        cache.put("bad", "", False, NOW - 2 * 3600)
+        cache.put("old", "desc", True, NOW - 48 * 3600)
+
+        assert cache.get("ok", config, NOW)["description"] == "desc"
+        assert cache.get("bad", config, NOW) is None
+        assert cache.get("old", config, NOW) is None
+
+        path = tmp_path / "enrich.json"
+        cache.save(path, config, NOW)
+        assert set(enrich.LinkCache.load(path).records) == {"ok"}
+
+    def test_corrupt_file_starts_empty(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "enrich.json"
+        path.write_text("{", encoding="utf-8")
+
+        assert enrich.LinkCache.load(path).records == {}
+
+
+def test_host_limiter_spaces_requests() -> None:
+    limiter = enrich.HostLimiter(0.5)
+    deadline = time.monotonic() + 1.2
+
+    first = limiter.reserve("a.com", deadline)
+    second = limiter.reserve("a.com", deadline)
+    other = limiter.reserve("b.com", deadline)
+
+    assert second - first == pytest.approx(0.5)
+    assert other - first < 0.1
+    assert limiter.reserve("a.com", deadline) is not None
+    assert limiter.reserve("a.com", deadline) is None
+
+
+class TestEnrichEntries:
+    """測試並行補充流程。"""
+
+    def test_fetches_short_summaries_once_per_link(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        calls: List[str] = []
+        lock = threading.Lock()
+
+        def fake_fetch(url: str, _config: enrich.EnrichConfig, _deadline: float) -> str:
+            with lock:
+                calls.append(url)
+            if "broken" in url:
+                raise OSError("boom")
+            return f"Description of {url}"
+
+        entries = [
+            Entry.from_dict(make_entry(url=url, summary_raw=summary))
+            for url, summary in [
+                ("https://a.com/1", "Comments"),
+                ("https://a.com/1?utm_source=hn", ""),
+                ("https://b.com/2", "A long enough summary that is left untouched as is."),
+                ("https://c.com/broken", ""),
+            ]
+        ]
+        cache = enrich.LinkCache()
+        config = enrich.EnrichConfig(per_host_interval=0)
+
+        stats = enrich.enrich_entries(entries, config, cache, 30, fetch=fake_fetch)
+
+        assert sorted(calls) == ["https://a.com/1", "https://c.com/broken"]
+        assert entries[0].summary_raw == "Description of https://a.com/1"
+        assert entries[1].summary_raw == entries[0].summary_raw
+        assert entries[2].summary_raw.startswith("A long enough")
+        assert entries[3].summary_raw == ""
+        assert (stats.candidates, stats.fetched, stats.failed, stats.enriched) == (2, 1, 1, 2)
+        assert cache.records["https://c.com/broken"]["ok"] is False
+
+        # 第二次執行：成功與失敗都命中快取，不再抓取
+        calls.clear()
+        again = [
+            Entry.from_dict(make_entry(url=url)) for url in ("https://a.com/1", "https://c.com/broken")
+        ]
+        stats = enrich.enrich_entries(again, config, cache, 30, fetch=fake_fetch)
+
+        assert calls == []
+        assert stats.cache_hits == 2
+        assert again[0].summary_raw == "Description of https://a.com/1"
+
+    def test_malformed_url_is_skipped(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        entries = [
+            Entry.from_dict(make_entry(url=url)) for url in ("http://a.com:xx/", "https://b.com/ok")
+        ]
+
+        stats = enrich.enrich_entries(
+            entries, enrich.EnrichConfig(per_host_interval=0), enrich.LinkCache(), 100, fetch=lambda *_: "desc"
+        )
+
+        assert stats.candidates == 1
+        assert entries[0].summary_raw == ""
+        assert entries[1].summary_raw == "desc"
+
+    def test_budget_skips_slow_links(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        release = threading.Event()
+
+        def slow_fetch(url: str, _config: enrich.EnrichConfig, _deadline: float) -> str:
+            if "slow" in url:
+                release.wait(5)
+            return "fast description"
+
+        entries = [
+            Entry.from_dict(make_entry(url=url)) for url in ("https://slow.com/x", "https://fast.com/y")
+        ]
+        config = enrich.EnrichConfig(budget_seconds=0.3, per_host_interval=0)
+        cache = enrich.LinkCache()
+
+        started = time.monotonic()
+        stats = enrich.enrich_entries(entries, config, cache, 100, fetch=slow_fetch)
+        release.set()
+
+        assert time.monotonic() - started < 2
+        assert stats.skipped == 1 and stats.fetched == 1
+        assert entries[1].summary_raw == "fast description"
+        assert "https://slow.com/x" not in cache.records
+
+    def test_host_interval_beyond_budget_is_skipped(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        entries = [Entry.from_dict(make_entry(url=f"https://same.com/{idx}")) for idx in range(3)]
+        config = enrich.EnrichConfig(budget_seconds=0.5, per_host_interval=10)
+
+        stats = enrich.enrich_entries(
+            entries, config, enrich.LinkCache(), 100, fetch=lambda *_: "desc"
+        )
+
+        assert stats.fetched == 1
+        assert stats.skipped == 2
+
+
+class FakeStreamResponse:
+    def __init__(self, body: bytes, content_type: str = "text/html; charset=utf-8") -> None:
+        self.body = body
+        self.headers = {"Content-Type": content_type}
+        # requests 對沒有 charset 的 text/* 回報 ISO-8859-1
+        self.encoding = "ISO-8859-1"
+        self.read = 0
+
+    def __enter__(self) -> "FakeStreamResponse":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        return None
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        for start in range(0, len(self.body), chunk_size):
+            self.read += chunk_size
+            yield self.body[start : start + chunk_size]
+
+
+class TestFetchDescription:
+    """測試只讀取頁面前 N KB。"""
+
+    def test_reads_only_first_kb(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        head = "<head><meta property=\"og:description\" content=\"描述\"></head>".encode("utf-8")
+        response = FakeStreamResponse(head + b"<body>" + b"x" * 1_000_000)
+        requested: Dict[str, Any] = {}
+
+        def fake_get(url: str, **kwargs: Any) -> FakeStreamResponse:
+            requested.update(kwargs)
+            return response
+
+        monkeypatch.setattr(enrich.requests, "get", fake_get)
+        config = enrich.EnrichConfig(max_kb=16)
+
+        description = enrich.fetch_description("https://a.com", config, time.monotonic() + 5)
+
+        assert description == "描述"
+        assert requested["stream"] is True
+        assert response.read <= 16 * 1024
+
+    @pytest.mark.parametrize(
+        "content_type, body",
+        [
+            ("text/html", '<meta charset="utf-8"><meta name="description" content="中文描述">'.encode("utf-8")),
+            ("text/html", '<meta http-equiv="Content-Type" content="text/html; charset=big5">'
+             '<meta name="description" content="中文描述">'.encode("big5")),
+            ("text/html", '<meta name="description" content="中文描述">'.encode("utf-8")),
+            ("text/html; charset=GBK", '<meta name="description" content="中文描述">'.encode("gbk")),
+        ],
+    )
+    def test_decodes_cjk_without_header_charset(
+        self, monkeypatch: pytest.MonkeyPatch, content_type: str, body: bytes
+    ) -> None:
+        response = FakeStreamResponse(body, content_type=content_type)
+        monkeypatch.setattr(enrich.requests, "get", lambda url, **_: response)
+
+        description = enrich.fetch_description("https://a.com", enrich.EnrichConfig(), time.monotonic() + 5)
+
+        assert description == "中文描述"
+
+    def test_page_encoding_ignores_unknown_labels(self) -> None:
+        assert enrich.page_encoding("text/html; charset=bogus", b'<meta charset="latin-1">') == "iso8859-1"
+        assert enrich.page_encoding("text/html", b"") == "utf-8"
+
+    def test_non_html_is_ignored(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        response = FakeStreamResponse(b"%PDF", content_type="application/pdf")
+        monkeypatch.setattr(enrich.requests, "get", lambda url, **_: response)
+
+        deadline = time.monotonic() + 5
+
+        assert enrich.fetch_description("https://a.com/x.pdf", enrich.EnrichConfig(), deadline) == ""
+
+
+def test_enrich_links_persists_cache(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+    make_entry: Callable[..., Dict[str, Any]],
+) -> None:
+    monkeypatch.setattr(collector, "ENRICH_CACHE_PATH", tmp_path / "enrich.json")
+    entries = [Entry.from_dict(make_entry(url="https://a.com/1"))]
+
+    def fake_enrich(
+        items: List[Entry], _config: Any, cache: enrich.LinkCache, _max_chars: int
+    ) -> enrich.EnrichStats:
+        cache.put(enrich.canonical_url(items[0].url), "desc", True, time.time())
+        items[0].summary_raw = "desc"
+        return enrich.EnrichStats(candidates=1, fetched=1, enriched=1)
+
+    monkeypatch.setattr(enrich, "enrich_entries", fake_enrich)
+
+    meta = collector.enrich_links(entries, {"enrich": {"max_workers": 2}})
+
+    assert meta["enriched"] == 1
+    assert "https://a.com/1" in enrich.LinkCache.load(tmp_path / "enrich.json").records
+
+
+def test_invalid_enrich_config_exits() -> None:
+    config = {
+        "enrich": {"budget_seconds": -1},
+        "sources": [{"key": "a", "name": "A", "url": "u", "type": "rss", "category": "news"}],
+    }
+
+    with pytest.raises(SystemExit) as exc_info:
+        collector.compile_config(config)
+
+    assert exc_info.value.code == 1
@@ -0,0 +1,164 @@
+"""測試 filters 的 Aho-Corasick 比對與規則套用。"""
+import argparse
+import pathlib
+import sys
+from typing import Any, Callable, Dict
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import collector
+import filters
+from filters import Automaton, FilterEngine
+from models import Entry
+
+
+class TestAutomaton:
+    """測試多關鍵字比對。"""
+
+    def test_finds_overlapping_patterns(self) -> None:
+        automaton = Automaton(["資料", "料庫", "資料庫系統", "系統設計"])
+
+        found = automaton.search("分散式資料庫系統")
+
+        assert {automaton.patterns[idx] for idx in found} == {"資料", "料庫", "資料庫系統"}
+
+    def test_case_insensitive_with_word_boundaries(self) -> None:
+        automaton = Automaton(["AI"])
+
+        assert automaton.search("New ai model") == {0}
+        assert automaton.search("She said hello") == set()
+        assert automaton.search("(AI)") == {0}
+
+    def test_cjk_keywords_match_inside_text(self) -> None:
+        automaton = Automaton(["人工智慧", "智慧型手機"])
+
+        found = automaton.search("最新人工智慧型手機發表")
+
+        assert found == {0, 1}
+
+
+class TestParseRules:
+    """測試 feeds.yml filters 區塊的驗證。"""
+
+    def test_missing_section_is_empty(self) -> None:
+        assert filters.parse_rules({"sources": []}) == []
+
+    def test_default_rule_name(self) -> None:
+        rules = filters.parse_rules({"filters": [{"exclude": ["spam"]}]})
+
+        assert rules[0].name == "rule-0"
+
+    @pytest.mark.parametrize(
+        "section",
+        [
+            {"rule": "x"},
+            ["x"],
+            [{"name": "empty"}],
+            [{"name": "bad", "include": "AI"}],
+            [{"name": "bad", "exclude": [""]}],
+        ],
+    )
+    def test_rejects_malformed_rules(self, section: Any) -> None:
+        with pytest.raises(ValueError):
+            filters.parse_rules({"filters": section})
+
+    def test_compile_config_exits_on_bad_filters(self) -> None:
+        with pytest.raises(SystemExit) as exc:
+            collector.compile_config({"sources": [], "filters": [{"name": "x"}]})
+
+        assert exc.value.code == 1
+
+
+class TestFilterEngine:
+    """測試 include/exclude 與範圍限定。"""
+
+    def test_exclude_drops_entry(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        engine = FilterEngine.from_config({"filters": [{"name": "ads", "exclude": ["Sponsored"]}]})
+        entries = [Entry.from_dict(make_entry(title)) for title in ("Sponsored post", "Real news")]
+
+        kept, hits = engine.apply(entries)
+
+        assert [entry.title for entry in kept] == ["Real news"]
+        assert hits == {"ads": {"include": 0, "exclude": 1, "dropped": 1}}
+
+    def test_include_matches_summary_and_tags(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        engine = FilterEngine.from_config(
+            {"filters": [{"name": "ai", "include": ["LLM", "人工智慧"]}]}
+        )
+        entries = [
+            Entry.from_dict(make_entry("A", summary_raw="關於人工智慧的報導")),
+            Entry.from_dict(make_entry("B", tags=["llm"])),
+            Entry.from_dict(make_entry("C", summary_raw="nothing here")),
+        ]
+
+        kept, hits = engine.apply(entries)
+
+        assert [entry.title for entry in kept] == ["A", "B"]
+        assert hits["ai"] == {"include": 2, "exclude": 0, "dropped": 1}
+
+    def test_rules_scoped_by_source_and_category(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        engine = FilterEngine.from_config(
+            {
+                "filters": [
+                    {"name": "hn", "sources": ["hn"], "include": ["rust"]},
+                    {"name": "tools", "categories": ["tools"], "exclude": ["beta"]},
+                ]
+            }
+        )
+        entries = [
+            Entry.from_dict(make_entry("Python news", source_key="hn")),
+            Entry.from_dict(make_entry("Python news", source_key="other")),
+            Entry.from_dict(make_entry("Editor beta", category="tools")),
+            Entry.from_dict(make_entry("Editor beta", category="news")),
+        ]
+
+        kept, hits = engine.apply(entries)
+
+        assert [(entry.source_key, entry.category) for entry in kept] == [
+            ("other", "news"),
+            ("source_1", "news"),
+        ]
+        assert hits["hn"]["dropped"] == 1
+        assert hits["tools"]["dropped"] == 1
+
+    def test_empty_engine_is_falsy(self) -> None:
+        assert not FilterEngine.from_config({"sources": []})
+
+
+def test_main_records_filter_meta(
+    monkeypatch: pytest.MonkeyPatch,
+    sample_entries: list[Entry],
+    collector_args: Callable[..., argparse.Namespace],
+) -> None:
+    fake_args = collector_args()
+    monkeypatch.setattr(collector, "parse_args", lambda: fake_args)
+    monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
+    monkeypatch.setattr(
+        collector,
+        "load_config",
+        lambda _path: {
+            "sources": [{"key": "source_1", "type": "rss", "enabled": True}],
+            "filters": [{"name": "no-1", "exclude": ["Article 1"]}],
+        },
+    )
+    monkeypatch.setattr(collector, "fetch_source", lambda _src: sample_entries)
+    recorded: Dict[str, Any] = {}
+    monkeypatch.setattr(
+        collector, "write_payload", lambda document, _path: recorded.update(document)
+    )
+
+    collector.main()
+
+    assert [entry.title for entry in recorded["entries"]] == ["Article 2"]
+    meta = recorded["meta"]
+    assert meta["unique_entries"] == 2
+    assert meta["filtered_entries"] == 1
+    assert meta["filter_hits"]["no-1"]["dropped"] == 1
+    assert meta["category_counts"] == {"community": 1}
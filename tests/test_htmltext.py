@@ -0,0 +1,160 @@
+"""測試 HTML 摘要轉純文字與全文壓縮欄位。"""
+import pathlib
+import sys
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import collector
+import htmltext
+import renderers
+from models import Entry
+
+
+class TestHtmlToText:
+    """測試串流轉換。"""
+
+    def test_strips_tags_and_entities(self) -> None:
+        markup = (
+            "<p>Hello&nbsp;<b>world</b> &amp; AT&amp;T &#8212; 中文</p>"
+            "<script>var x = '<p>hidden</p>';</script>"
+            "<style>p { color: red }</style>"
+            "<p>Second<br>line</p>"
+        )
+
+        result = htmltext.html_to_text(markup)
+
+        assert result.text == "Hello world & AT&T \u2014 中文\n\nSecond\nline"
+        assert not result.truncated
+
+    def test_collapses_whitespace_across_chunks(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(htmltext, "CHUNK_CHARS", 3)
+
+        result = htmltext.html_to_text("  <i>some</i>   words\n\tsplit &amp; joined ")
+
+        assert result.text == "some words split & joined"
+
+    def test_plain_text_passes_through(self) -> None:
+        assert htmltext.html_to_text("a < b, 1 & 2").text == "a < b, 1 & 2"
+
+    def test_stops_after_budget(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        fed: List[int] = []
+        original = htmltext._TextExtractor.feed
+        monkeypatch.setattr(
+            htmltext._TextExtractor,
+            "feed",
+            lambda self, data: fed.append(len(data)) or original(self, data),
+        )
+        markup = "<div>" + "word " * 200_000 + "</div>"
+
+        result = htmltext.html_to_text(markup, 20)
+
+        assert result == htmltext.CleanText("word word word word ", True)
+        assert sum(fed) <= htmltext.CHUNK_CHARS
+
+    def test_exact_budget_is_not_truncated(self) -> None:
+        assert htmltext.html_to_text("<p>abcde</p>", 5) == htmltext.CleanText("abcde", False)
+
+
+class TestCleanSummary:
+    """測試字元上限與全文壓縮。"""
+
+    def test_clips_with_ellipsis(self) -> None:
+        config = htmltext.SummaryConfig(max_chars=10)
+
+        assert htmltext.clean_summary("<p>abc def ghi jkl</p>", config) == ("abc def g…", "")
+        assert htmltext.clean_summary("<p>short</p>", config) == ("short", "")
+        assert htmltext.clean_summary("", config) == ("", "")
+
+    def test_keep_full_round_trip(self) -> None:
+        config = htmltext.SummaryConfig(max_chars=10, keep_full=True)
+        markup = "<p>" + "長文內容 " * 500 + "</p>"
+
+        summary, full = htmltext.clean_summary(markup, config)
+
+        assert len(summary) == 10 and summary.endswith("…")
+        assert htmltext.decompress_text(full) == htmltext.html_to_text(markup).text
+        assert len(full) < len(markup) / 10
+
+    def test_decompress_rejects_corrupt_data(self) -> None:
+        with pytest.raises(ValueError):
+            htmltext.decompress_text("not-base64!")
+
+    @pytest.mark.parametrize(
+        "section",
+        ["x", {"max_chars": 0}, {"max_chars": "500"}, {"max_chars": True}, {"keep_full": "yes"}],
+    )
+    def test_config_rejects(self, section: Any) -> None:
+        with pytest.raises(ValueError):
+            htmltext.SummaryConfig.from_config({"summary": section})
+
+    def test_config_defaults(self) -> None:
+        assert htmltext.SummaryConfig.from_config({}) == htmltext.SummaryConfig()
+        assert htmltext.SummaryConfig.from_config(
+            {"summary": {"max_chars": 80, "keep_full": True}}
+        ) == htmltext.SummaryConfig(80, True)
+
+
+class TestCollectorSummaries:
+    """測試 collector 在收集時清理摘要。"""
+
+    @pytest.fixture(autouse=True)
+    def reset(self) -> None:
+        yield
+        collector.SUMMARY_CONFIG = htmltext.SummaryConfig()
+
+    def fetch(self, monkeypatch: pytest.MonkeyPatch, summary: str) -> Entry:
+        entries = [{"title": "T", "link": "https://example.com/t", "summary": summary}]
+        monkeypatch.setattr(
+            collector.requests,
+            "get",
+            lambda url, timeout: SimpleNamespace(content=b"<rss>", raise_for_status=lambda: None),
+        )
+        monkeypatch.setattr(
+            collector.feedparser, "parse", lambda _content: SimpleNamespace(entries=entries, bozo=False)
+        )
+        (entry,) = collector.fetch_rss_or_atom({"key": "k", "name": "K", "url": "u"})
+        return entry
+
+    def test_rss_summary_is_cleaned(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        entry = self.fetch(monkeypatch, '<p>Read <a href="/x">more</a> &raquo;</p>' + "<p>x</p>" * 5000)
+
+        assert entry.summary_raw.startswith("Read more \u00bb")
+        assert len(entry.summary_raw) <= htmltext.DEFAULT_MAX_CHARS
+        assert entry.summary_full == ""
+        assert "summary_full" not in entry.to_dict()
+
+    def test_keep_full_stores_compressed_text(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        collector.configure_summary({"summary": {"max_chars": 8, "keep_full": True}})
+
+        entry = self.fetch(monkeypatch, "<p>first paragraph</p><p>second</p>")
+
+        assert entry.summary_raw == "first p…"
+        data = entry.to_dict()
+        assert htmltext.decompress_text(data["summary_full"]) == "first paragraph\n\nsecond"
+        assert Entry.from_dict(data).summary_full == data["summary_full"]
+
+    def test_invalid_summary_config_exits(self) -> None:
+        config: Dict[str, Any] = {
+            "summary": {"max_chars": -1},
+            "sources": [{"key": "a", "name": "A", "url": "u", "type": "rss", "category": "news"}],
+        }
+
+        with pytest.raises(SystemExit) as exc_info:
+            collector.compile_config(config)
+
+        assert exc_info.value.code == 1
+
+
+def test_digest_cleans_legacy_html_summaries() -> None:
+    item = {"summary_raw": "<p>Old <b>raw</b> file</p>" + "<p>filler</p>" * 1000}
+
+    summary = renderers.truncate_summary(item)
+
+    assert summary.startswith("Old raw file\n\nfiller")
+    assert "<" not in summary
+    assert len(summary) == renderers.SUMMARY_LIMIT + len("...")
@@ -0,0 +1,206 @@
+"""測試日內增量 digest。"""
+import io
+import pathlib
+import sys
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import digest
+import incremental
+import renderers
+
+
+def render_full(entries: List[Dict[str, Any]], model: renderers.DigestModel) -> str:
+    buffer = io.StringIO()
+    renderers.MarkdownRenderer().render(
+        renderers.build_model(entries, model.date, model.meta), buffer
+    )
+    return buffer.getvalue().replace(
+        renderers.footer_text(renderers.build_model(entries, model.date)), renderers.footer_text(model)
+    )
+
+
+def run_update(state: incremental.DigestState, entries: List[Dict[str, Any]]):
+    model = renderers.build_model(entries, "2025-12-22")
+    delta = incremental.update(state, model)
+    full = io.StringIO()
+    incremental.write_full(state, model, full)
+    return model, delta, full.getvalue()
+
+
+class TestEntryId:
+    """測試 entry ID。"""
+
+    def test_url_is_id(self) -> None:
+        assert incremental.entry_id({"url": "https://a/1"}) == "https://a/1"
+
+    def test_hash_without_url(self) -> None:
+        first = incremental.entry_id({"source": "A", "title": "x"})
+        assert first.startswith("sha:")
+        assert first == incremental.entry_id({"source": "A", "title": "x", "url": ""})
+        assert first != incremental.entry_id({"source": "B", "title": "x"})
+
+
+class TestUpdate:
+    """測試只 render 新 entry。"""
+
+    def test_first_run_matches_full_renderer(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        entries = [
+            make_entry("A 第 1 則", source="A"),
+            make_entry("B 第 2 則", source="B"),
+            make_entry("C 第 3 則", source="C", category="tools"),
+        ]
+        state = incremental.DigestState(date="2025-12-22", renderer=1)
+
+        model, delta, full = run_update(state, entries)
+
+        assert full == render_full(entries, model)
+        assert delta.entry_count == 3
+        assert len(state.ids) == 3
+
+    def test_second_run_renders_only_new_entries(
+        self, monkeypatch, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        state = incremental.DigestState(date="2025-12-22", renderer=1)
+        first = [make_entry("A 第 1 則", source="A"), make_entry("B 第 2 則", source="B")]
+        run_update(state, first)
+
+        rendered: List[str] = []
+        original = renderers.write_entry
+
+        def tracking(item, source, out):
+            rendered.append(item["url"])
+            original(item, source, out)
+
+        monkeypatch.setattr(renderers, "write_entry", tracking)
+        second = first + [
+            make_entry("A 第 3 則", source="A"),
+            make_entry("D 第 4 則", source="D", category="tools"),
+        ]
+        model, delta, full = run_update(state, second)
+
+        assert rendered == [entry["url"] for entry in second[2:]]
+        assert delta.entry_count == 2
+        assert full == render_full(second, model)
+
+    def test_no_new_entries(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        state = incremental.DigestState(date="2025-12-22", renderer=1)
+        run_update(state, [make_entry("A 第 1 則")])
+
+        _, delta, _ = run_update(state, [make_entry("A 第 1 則")])
+
+        assert delta.entry_count == 0
+
+    def test_delta_contains_only_new_entries(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        state = incremental.DigestState(date="2025-12-22", renderer=1)
+        first = make_entry("A 第 1 則", source="A")
+        run_update(state, [first])
+        _, delta, _ = run_update(state, [first, make_entry("A 第 2 則", source="A")])
+
+        buffer = io.StringIO()
+        incremental.write_delta(delta, buffer)
+        text = buffer.getvalue()
+
+        assert text.startswith("# 技術資訊摘要 - 2025-12-22 新增 1 筆\n\n## news\n\n### A\n\n")
+        assert "A 第 2 則" in text
+        assert "A 第 1 則" not in text
+
+
+class TestDigestState:
+    """測試狀態檔讀寫。"""
+
+    def test_round_trip(
+        self, tmp_path: pathlib.Path, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        path = tmp_path / ".digest.state.json"
+        state = incremental.DigestState(date="2025-12-22", renderer=1)
+        run_update(state, [make_entry("A 第 1 則")])
+        state.save(path)
+
+        loaded = incremental.DigestState.load(path, "2025-12-22", 1)
+
+        assert loaded.ids == state.ids
+        assert loaded.sections == state.sections
+
+    def test_reset_on_renderer_or_date_change(
+        self, tmp_path: pathlib.Path, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        path = tmp_path / ".digest.state.json"
+        state = incremental.DigestState(date="2025-12-22", renderer=1)
+        run_update(state, [make_entry("A 第 1 則")])
+        state.save(path)
+
+        assert incremental.DigestState.load(path, "2025-12-22", 2).ids == []
+        assert incremental.DigestState.load(path, "2025-12-23", 1).ids == []
+
+    def test_reset_on_corrupt_file(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / ".digest.state.json"
+        path.write_text("{broken", encoding="utf-8")
+
+        assert incremental.DigestState.load(path, "2025-12-22", 1).ids == []
+
+    def test_paths(self) -> None:
+        base = pathlib.Path("out/digest-2025-12-22.md")
+        assert incremental.state_path(base) == pathlib.Path("out/.digest-2025-12-22.state.json")
+        assert incremental.delta_path(base) == pathlib.Path("out/digest-2025-12-22-delta.md")
+
+
+class TestMainIncremental:
+    """測試 digest --incremental。"""
+
+    def run(self, monkeypatch, raw: pathlib.Path, output: pathlib.Path) -> None:
+        args = SimpleNamespace(
+            date="2025-12-22",
+            input=raw,
+            output=output,
+            dry_run=False,
+            verbose=False,
+            metrics_dir=None,
+            log_json=False,
+            top_k=None,
+            config=None,
+            range=None,
+            weekly=None,
+            formats=["markdown"],
+            template=None,
+            template_engine="builtin",
+            max_bytes=None,
+            incremental=True,
+            profiles=None,
+        )
+        monkeypatch.setattr(digest, "parse_args", lambda: args)
+        digest.main()
+
+    def test_writes_full_and_delta(
+        self,
+        tmp_path: pathlib.Path,
+        monkeypatch,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        monkeypatch.setattr(digest, "setup_logging", lambda *args, **kwargs: None)
+        output = tmp_path / "digest-2025-12-22.md"
+        delta = tmp_path / "digest-2025-12-22-delta.md"
+
+        raw = write_raw(tmp_path, "2025-12-22", [make_entry("A 第 1 則")])
+        self.run(monkeypatch, raw, output)
+        assert "A 第 1 則" in delta.read_text(encoding="utf-8")
+
+        write_raw(tmp_path, "2025-12-22", [make_entry("A 第 1 則"), make_entry("A 第 2 則")])
+        self.run(monkeypatch, raw, output)
+        delta_text = delta.read_text(encoding="utf-8")
+        assert "A 第 2 則" in delta_text
+        assert "A 第 1 則" not in delta_text
+        full_text = output.read_text(encoding="utf-8")
+        assert "A 第 1 則" in full_text and "A 第 2 則" in full_text
+        assert (tmp_path / ".digest-2025-12-22.state.json").exists()
+
+        self.run(monkeypatch, raw, output)
+        assert not delta.exists()
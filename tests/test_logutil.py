@@ -0,0 +1,146 @@
+"""測試 logutil 的佇列式 logging 與輪替設定。"""
+import json
+import logging
+import os
+import pathlib
+import sys
+from typing import Generator
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import logutil
+
+
+@pytest.fixture
+def clean_root() -> Generator[None, None, None]:
+    """測試前後清除 root handler，避免影響其他測試。"""
+    root_logger = logging.getLogger()
+    saved = root_logger.handlers[:]
+    yield
+    logutil.stop_logging()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    for handler in saved:
+        root_logger.addHandler(handler)
+
+
+class TestSetupLogging:
+    """測試 QueueHandler/QueueListener 架構。"""
+
+    def test_records_flow_through_queue(
+        self, tmp_path: pathlib.Path, clean_root: None
+    ) -> None:
+        log_file = tmp_path / "logs" / "collector-2025-12-30.log"
+
+        listener = logutil.setup_logging(verbose=False, log_file=log_file)
+        logging.getLogger("collector").info("queued message")
+        logutil.stop_logging()
+
+        root_handlers = logging.getLogger().handlers
+        assert [type(h) for h in root_handlers] == [logging.handlers.QueueHandler]
+        assert len(listener.handlers) == 2
+        assert "queued message" in log_file.read_text(encoding="utf-8")
+
+    def test_json_lines_include_structured_fields(
+        self, tmp_path: pathlib.Path, clean_root: None
+    ) -> None:
+        log_file = tmp_path / "collector.log"
+
+        logutil.setup_logging(log_file=log_file, json_lines=True)
+        logging.getLogger("collector").warning(
+            "retry", extra={"source_key": "hn", "attempt": 2, "latency_ms": 12.5}
+        )
+        logutil.stop_logging()
+
+        record = json.loads(log_file.read_text(encoding="utf-8").splitlines()[-1])
+        assert record["message"] == "retry"
+        assert record["level"] == "WARNING"
+        assert record["source_key"] == "hn"
+        assert record["attempt"] == 2
+        assert record["latency_ms"] == 12.5
+
+    def test_stop_logging_is_idempotent(self, clean_root: None) -> None:
+        logutil.setup_logging()
+        logutil.stop_logging()
+        logutil.stop_logging()
+
+        assert logutil._LISTENER is None
+
+
+class TestSizedTimedRotatingFileHandler:
+    """測試依大小與時間輪替。"""
+
+    @staticmethod
+    def _record(message: str) -> logging.LogRecord:
+        return logging.LogRecord("collector", logging.INFO, __file__, 1, message, None, None)
+
+    def test_rotates_by_size(self, tmp_path: pathlib.Path) -> None:
+        log_file = tmp_path / "collector.log"
+        handler = logutil.SizedTimedRotatingFileHandler(log_file, max_bytes=50, backup_count=2)
+        try:
+            for idx in range(5):
+                handler.emit(self._record(f"message number {idx:02d} padding"))
+        finally:
+            handler.close()
+
+        assert (tmp_path / "collector.log.1").exists()
+        assert (tmp_path / "collector.log.2").exists()
+        assert not (tmp_path / "collector.log.3").exists()
+
+    def test_rotates_by_time(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        log_file = tmp_path / "collector.log"
+        handler = logutil.SizedTimedRotatingFileHandler(log_file, interval=60)
+        try:
+            handler.emit(self._record("before"))
+            now = logutil.time.time()
+            monkeypatch.setattr(logutil.time, "time", lambda: now + 120)
+            handler.emit(self._record("after"))
+        finally:
+            handler.close()
+
+        assert "before" in (tmp_path / "collector.log.1").read_text(encoding="utf-8")
+        assert "after" in log_file.read_text(encoding="utf-8")
+
+    def test_old_log_rotates_on_startup(self, tmp_path: pathlib.Path) -> None:
+        log_file = tmp_path / "collector.log"
+        log_file.write_text("yesterday\n", encoding="utf-8")
+        old = logutil.time.time() - 2 * 60
+        os.utime(log_file, (old, old))
+        handler = logutil.SizedTimedRotatingFileHandler(log_file, interval=60)
+        try:
+            handler.emit(self._record("today"))
+        finally:
+            handler.close()
+
+        assert (tmp_path / "collector.log.1").read_text(encoding="utf-8") == "yesterday\n"
+        assert log_file.read_text(encoding="utf-8").strip() == "today"
+
+    def test_recent_log_is_appended(self, tmp_path: pathlib.Path) -> None:
+        log_file = tmp_path / "collector.log"
+        log_file.write_text("earlier\n", encoding="utf-8")
+        handler = logutil.SizedTimedRotatingFileHandler(log_file, interval=60)
+        try:
+            handler.emit(self._record("now"))
+        finally:
+            handler.close()
+
+        assert not (tmp_path / "collector.log.1").exists()
+        assert log_file.read_text(encoding="utf-8") == "earlier\nnow\n"
+
+
+class TestConsoleHandler:
+    """測試 console log 寫到 stderr。"""
+
+    def test_writes_to_current_stderr(self, capsys: pytest.CaptureFixture[str]) -> None:
+        handler = logutil.ConsoleHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler.emit(logging.LogRecord("collector", logging.INFO, __file__, 1, "hello", None, None))
+
+        captured = capsys.readouterr()
+        assert captured.err == "hello\n"
+        assert captured.out == ""
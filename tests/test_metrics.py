@@ -0,0 +1,160 @@
+"""測試 metrics 的 Prometheus textfile 輸出。"""
+import argparse
+import pathlib
+import sys
+import urllib.request
+from typing import Any, Callable, Dict
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import collector
+import digest
+import metrics
+from models import Entry
+
+
+class TestRegistry:
+    """測試 Registry 的 text exposition 格式。"""
+
+    def test_gauge_and_counter_render(self) -> None:
+        registry = metrics.Registry()
+        registry.set("demo_up", 1, "Demo gauge", source="a")
+        registry.inc("demo_total", 2, "Demo counter")
+        registry.inc("demo_total", 3)
+
+        text = registry.render()
+
+        assert "# TYPE demo_up gauge" in text
+        assert 'demo_up{source="a"} 1' in text
+        assert "# TYPE demo_total counter" in text
+        assert "demo_total 5" in text
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        registry = metrics.Registry()
+        registry.observe("demo_seconds", 0.3, "Demo", buckets=(0.1, 0.5, 1.0), source="a")
+        registry.observe("demo_seconds", 0.7, buckets=(0.1, 0.5, 1.0), source="a")
+
+        text = registry.render()
+
+        assert 'demo_seconds_bucket{source="a",le="0.1"} 0' in text
+        assert 'demo_seconds_bucket{source="a",le="0.5"} 1' in text
+        assert 'demo_seconds_bucket{source="a",le="1"} 2' in text
+        assert 'demo_seconds_bucket{source="a",le="+Inf"} 2' in text
+        assert 'demo_seconds_count{source="a"} 2' in text
+        assert 'demo_seconds_sum{source="a"} 1\n' in text
+
+    def test_label_values_are_escaped(self) -> None:
+        registry = metrics.Registry()
+        registry.set("demo", 1, source='a"b\\c')
+
+        assert 'demo{source="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_kind_conflict_raises(self) -> None:
+        registry = metrics.Registry()
+        registry.set("demo", 1)
+
+        with pytest.raises(ValueError):
+            registry.inc("demo")
+
+
+def test_write_textfile_is_atomic(tmp_path: pathlib.Path) -> None:
+    registry = metrics.Registry()
+    registry.set("demo", 1)
+    path = tmp_path / "prom" / "demo.prom"
+
+    metrics.write_textfile(registry, path)
+
+    assert path.read_text(encoding="utf-8").startswith("# HELP demo")
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_serve_exposes_textfiles(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "a.prom").write_text("a 1\n", encoding="utf-8")
+    (tmp_path / "b.prom").write_text("b 2\n", encoding="utf-8")
+    server = metrics.serve(tmp_path, port=0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert body == "a 1\nb 2\n"
+
+
+class TestCollectorMetrics:
+    """測試 collector 輸出的指標內容。"""
+
+    def test_build_metrics_per_source(self) -> None:
+        stats = [
+            {"key": "ok", "seconds": 0.4, "bytes": 1024, "entries": 3, "retries": 0, "ok": True},
+            {"key": "bad", "seconds": 6.0, "bytes": 0, "entries": 0, "retries": 2, "ok": False},
+        ]
+        meta = {"raw_entries": 3, "unique_entries": 2, "dedup_rate": 0.3333}
+
+        text = collector.build_metrics(stats, meta, 6.5).render()
+
+        assert 'collector_source_fetch_seconds_count{source="ok"} 1' in text
+        assert 'collector_source_bytes{source="ok"} 1024' in text
+        assert 'collector_source_retries{source="bad"} 2' in text
+        assert 'collector_source_up{source="bad"} 0' in text
+        assert "collector_dedup_rate 0.3333" in text
+
+    def test_main_writes_prom_file(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        sample_entries: list[Entry],
+        collector_args: Callable[..., argparse.Namespace],
+    ) -> None:
+        fake_args = collector_args("--dry-run", "--metrics-dir", str(tmp_path))
+        monkeypatch.setattr(collector, "parse_args", lambda: fake_args)
+        monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
+        monkeypatch.setattr(
+            collector,
+            "load_config",
+            lambda _path: {"sources": [{"key": "source_1", "type": "rss", "enabled": True}]},
+        )
+        monkeypatch.setattr(collector, "fetch_source", lambda _src: sample_entries)
+
+        collector.main()
+
+        text = (tmp_path / "collector.prom").read_text(encoding="utf-8")
+        assert 'collector_source_entries{source="source_1"} 2' in text
+        assert "collector_unique_entries 2" in text
+
+    def test_main_writes_prom_file_when_all_fail(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        collector_args: Callable[..., argparse.Namespace],
+    ) -> None:
+        fake_args = collector_args("--dry-run", "--metrics-dir", str(tmp_path))
+        monkeypatch.setattr(collector, "parse_args", lambda: fake_args)
+        monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
+        monkeypatch.setattr(
+            collector,
+            "load_config",
+            lambda _path: {"sources": [{"key": "source_1", "type": "rss", "enabled": True}]},
+        )
+        monkeypatch.setattr(collector, "fetch_source", lambda _src: [])
+
+        with pytest.raises(SystemExit):
+            collector.main()
+
+        text = (tmp_path / "collector.prom").read_text(encoding="utf-8")
+        assert 'collector_source_up{source="source_1"} 0' in text
+
+
+def test_digest_export_metrics(tmp_path: pathlib.Path) -> None:
+    digest.export_metrics(tmp_path, [{}, {}], {"dedup_rate": 0.25, "failed_source_count": 1}, 0.05)
+
+    text = (tmp_path / "digest.prom").read_text(encoding="utf-8")
+    assert "digest_render_seconds 0.05" in text
+    assert "digest_entries 2" in text
+    assert "digest_dedup_rate 0.25" in text
+    assert "digest_failed_sources 1" in text
@@ -0,0 +1,345 @@
+"""測試 RSS/Atom 解析結果快取。"""
+import argparse
+import json
+import pathlib
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import collector
+import htmltext
+import parsecache
+
+NOW = 1766404800.0  # 2025-12-22T12:00:00Z
+HOUR = 3600
+
+
+def item(title: str, epoch: int | None = None, summary: str | None = "s") -> parsecache.Item:
+    return parsecache.Item(
+        title=title, url=f"https://example.com/{title}", published_epoch=epoch, summary=summary
+    )
+
+
+def older_than(cutoff: int) -> Callable[[int | None], bool]:
+    return lambda epoch: epoch is not None and epoch < cutoff
+
+
+class TestParseCache:
+    """測試 LRU 淘汰、統計與存檔。"""
+
+    def test_lru_eviction_keeps_recently_used(self) -> None:
+        cache = parsecache.ParseCache(max_entries=2)
+        cache.put("a", parsecache.Feed(1, [item("a")]))
+        cache.put("b", parsecache.Feed(1, [item("b")]))
+
+        assert cache.select("a", 10, older_than(0)) == ([item("a")], 0)
+        cache.put("c", parsecache.Feed(1, [item("c")]))
+
+        assert cache.select("b", 10, older_than(0)) is None
+        assert cache.select("a", 10, older_than(0)) == ([item("a")], 0)
+        assert cache.stats() == {
+            "hits": 2,
+            "misses": 1,
+            "hit_rate": 0.6667,
+            "evictions": 1,
+            "entries": 2,
+        }
+
+    def test_empty_stats(self) -> None:
+        assert parsecache.ParseCache().stats()["hit_rate"] == 0.0
+
+    def test_round_trip_preserves_order(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "parsed.json"
+        cache = parsecache.ParseCache()
+        cache.put("old", parsecache.Feed(1, [item("old")]))
+        fresh = parsecache.Feed(
+            5,
+            [
+                item("略過", epoch=1, summary=None),
+                parsecache.Item("新", "u", "2025-12-22T00:00:00+00:00", 1766361600, "a & b", "full"),
+            ],
+        )
+        cache.put("new", fresh)
+        cache.save(path)
+
+        loaded = parsecache.ParseCache.load(path, max_entries=1)
+
+        assert len(loaded) == 1
+        assert loaded.get("old") is None
+        assert loaded.get("new") == fresh
+
+    def test_outdated_or_corrupt_file_starts_empty(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "parsed.json"
+        path.write_text(
+            json.dumps({"version": parsecache.PARSER_VERSION - 1, "entries": [["k", 0, []]]}),
+            encoding="utf-8",
+        )
+        assert len(parsecache.ParseCache.load(path)) == 0
+        path.write_text("{", encoding="utf-8")
+        assert len(parsecache.ParseCache.load(path)) == 0
+        path.write_text(
+            json.dumps({"version": parsecache.PARSER_VERSION, "entries": [["k", 1, [[1, 2, 3, 4, 5, 6, 7]]]]}),
+            encoding="utf-8",
+        )
+        assert len(parsecache.ParseCache.load(path)) == 0
+
+    def test_key_depends_on_body_and_summary_config(self) -> None:
+        config = htmltext.SummaryConfig()
+        key = parsecache.cache_key(b"<rss/>", config)
+
+        assert key == parsecache.cache_key(b"<rss/>", htmltext.SummaryConfig())
+        assert key != parsecache.cache_key(b"<rss></rss>", config)
+        assert key != parsecache.cache_key(b"<rss/>", htmltext.SummaryConfig(max_chars=100))
+        assert key.startswith(f"v{parsecache.PARSER_VERSION}:")
+
+
+class TestFeedSelect:
+    """測試快取前綴能否涵蓋本次的 limit 與截止時間。"""
+
+    def test_limit_reached_inside_prefix(self) -> None:
+        feed = parsecache.Feed(10, [item("old", epoch=1, summary=None), item("a", 5), item("b", 6)])
+
+        assert feed.select(1, older_than(3)) == ([item("a", 5)], 1)
+
+    def test_complete_feed_shorter_than_limit(self) -> None:
+        feed = parsecache.Feed(2, [item("a", 5), item("b", 6)])
+
+        assert feed.select(10, older_than(0)) == ([item("a", 5), item("b", 6)], 0)
+
+    def test_short_prefix_misses(self) -> None:
+        assert parsecache.Feed(3, [item("a", 5)]).select(2, older_than(0)) is None
+
+    def test_earlier_cutoff_needs_uncleaned_item(self) -> None:
+        feed = parsecache.Feed(2, [item("old", epoch=1, summary=None), item("a", 5)])
+
+        assert feed.select(2, older_than(3)) == ([item("a", 5)], 1)
+        assert feed.select(2, older_than(0)) is None
+
+
+class FakeFeed(SimpleNamespace):
+    pass
+
+
+class TestCollectorParseCache:
+    """測試 collector 在 body 未變更時略過 feedparser。"""
+
+    @pytest.fixture(autouse=True)
+    def reset(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(collector, "PARSE_CACHE", parsecache.ParseCache())
+        collector.CUTOFFS.clear()
+        yield
+        collector.CUTOFFS.clear()
+
+    def feed(self, monkeypatch: pytest.MonkeyPatch, hours_ago: List[int]) -> List[bytes]:
+        entries = [
+            {
+                "title": f"{hours} hours ago",
+                "link": f"https://example.com/{hours}",
+                "summary": f"<p>{hours} &amp; more</p>",
+                "published": time.strftime(
+                    "%a, %d %b %Y %H:%M:%S GMT", time.gmtime(NOW - hours * HOUR)
+                ),
+                "published_parsed": time.gmtime(NOW - hours * HOUR),
+            }
+            for hours in hours_ago
+        ]
+        parsed: List[bytes] = []
+        bodies = {"https://example.com/rss": b"<rss>1</rss>"}
+
+        def fake_parse(content: bytes) -> FakeFeed:
+            parsed.append(content)
+            return FakeFeed(entries=entries, bozo=False)
+
+        monkeypatch.setattr(
+            collector.requests, "get", lambda url, timeout: SimpleNamespace(
+                content=bodies.get(url, b"<rss>other</rss>"), raise_for_status=lambda: None
+            )
+        )
+        monkeypatch.setattr(collector.feedparser, "parse", fake_parse)
+        return parsed
+
+    def test_identical_body_skips_parse(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        parsed = self.feed(monkeypatch, [1, 2])
+        source = {"key": "feed", "name": "Feed", "url": "https://example.com/rss"}
+
+        first = collector.fetch_rss_or_atom(source)
+        work: List[str] = []
+        monkeypatch.setattr(htmltext, "clean_summary", lambda *_args: work.append("clean"))
+        monkeypatch.setattr(collector.timeutil, "feed_entry_time", lambda _entry: work.append("time"))
+        second = collector.fetch_rss_or_atom(source)
+
+        assert len(parsed) == 1
+        assert work == []
+        assert [entry.to_dict() for entry in second] == [entry.to_dict() for entry in first]
+        assert first[0].summary_raw == "1 & more"
+        assert collector.PARSE_CACHE.stats()["hits"] == 1
+
+    def test_different_body_is_parsed(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        parsed = self.feed(monkeypatch, [1])
+
+        collector.fetch_rss_or_atom({"key": "a", "name": "A", "url": "https://example.com/rss"})
+        collector.fetch_rss_or_atom({"key": "b", "name": "B", "url": "https://example.com/other"})
+
+        assert len(parsed) == 2
+
+    def test_summary_config_change_misses(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        parsed = self.feed(monkeypatch, [1])
+        source = {"key": "feed", "name": "Feed", "url": "https://example.com/rss"}
+
+        collector.fetch_rss_or_atom(source)
+        monkeypatch.setattr(collector, "SUMMARY_CONFIG", htmltext.SummaryConfig(max_chars=3))
+        entries = collector.fetch_rss_or_atom(source)
+
+        assert len(parsed) == 2
+        assert entries[0].summary_raw == "1…"
+
+    def test_cutoff_and_limit_applied_on_hit(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        parsed = self.feed(monkeypatch, [30, 1, 40, 2, 3])
+        collector.fetch_rss_or_atom({"key": "all", "name": "All", "url": "https://example.com/rss"})
+        collector.CUTOFFS["feed"] = NOW - 24 * HOUR
+        source = {
+            "key": "feed",
+            "name": "Feed",
+            "url": "https://example.com/rss",
+            "limit": 2,
+            "tags": ["t"],
+        }
+
+        entries = collector.fetch_rss_or_atom(source)
+
+        assert len(parsed) == 1
+        assert [entry.title for entry in entries] == ["1 hours ago", "2 hours ago"]
+        assert entries[0].source_key == "feed"
+        assert collector.FETCH_STATS["feed"]["too_old"] == 2
+
+    def test_limit_and_cutoff_applied_before_cleaning(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        parsed = self.feed(monkeypatch, [30, 1, 40, 2, 3])
+        cleaned: List[str] = []
+        real_clean = htmltext.clean_summary
+
+        def counting_clean(markup: str, config: htmltext.SummaryConfig) -> Any:
+            cleaned.append(markup)
+            return real_clean(markup, config)
+
+        monkeypatch.setattr(htmltext, "clean_summary", counting_clean)
+        collector.CUTOFFS["feed"] = NOW - 24 * HOUR
+        source = {"key": "feed", "name": "Feed", "url": "https://example.com/rss", "limit": 1}
+
+        entries = collector.fetch_rss_or_atom(source)
+
+        assert [entry.title for entry in entries] == ["1 hours ago"]
+        assert cleaned == ["<p>1 &amp; more</p>"]
+        feed = collector.PARSE_CACHE.get(parsecache.cache_key(b"<rss>1</rss>", collector.SUMMARY_CONFIG))
+        # 只存掃描過的前綴：過舊項目沒有摘要，limit 之後的項目不存
+        assert feed.total == 5
+        assert [(entry.title, entry.summary) for entry in feed.items] == [
+            ("30 hours ago", None),
+            ("1 hours ago", "1 & more"),
+        ]
+
+        wider = collector.fetch_rss_or_atom({"key": "all", "name": "All", "url": "https://example.com/rss"})
+
+        # 前綴不足以涵蓋沒有截止時間、limit 較大的來源：重新解析
+        assert len(parsed) == 2
+        assert [entry.summary_raw for entry in wider] == ["30 & more", "1 & more", "40 & more", "2 & more", "3 & more"]
+        assert collector.PARSE_CACHE.stats()["misses"] == 2
+
+    def test_disabled_cache_always_parses(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        parsed = self.feed(monkeypatch, [1])
+        monkeypatch.setattr(collector, "PARSE_CACHE", None)
+        source = {"key": "feed", "name": "Feed", "url": "https://example.com/rss"}
+
+        collector.fetch_rss_or_atom(source)
+        collector.fetch_rss_or_atom(source)
+
+        assert len(parsed) == 2
+
+
+class TestMainParseCache:
+    """測試 main() 載入/存檔快取並把命中率寫入 meta。"""
+
+    def run_main(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        collector_args: Callable[..., argparse.Namespace],
+        *flags: str,
+    ) -> Dict[str, Any]:
+        args = collector_args("--date", "2025-12-22", "--output", str(tmp_path / "raw.json"), *flags)
+        sources = [
+            {"key": key, "name": key.upper(), "url": "https://example.com/rss", "type": "rss",
+             "category": "news", "enabled": True}
+            for key in ("a", "b")
+        ]
+        recorded: Dict[str, Any] = {}
+        parsed: List[bytes] = []
+
+        def fake_parse(content: bytes) -> FakeFeed:
+            parsed.append(content)
+            return FakeFeed(entries=[{"title": "T", "link": "https://example.com/t"}], bozo=False)
+
+        monkeypatch.setattr(collector, "parse_args", lambda: args)
+        monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
+        monkeypatch.setattr(collector, "load_config", lambda _path: {"sources": sources})
+        # main() 依 --replay 設定 CASSETTE，測試結束後還原
+        monkeypatch.setattr(collector, "CASSETTE", None)
+        monkeypatch.setattr(collector, "update_search_index", lambda *_: None)
+        monkeypatch.setattr(
+            collector, "http_request", lambda *_args, **_kwargs: SimpleNamespace(
+                content=b"<rss/>", raise_for_status=lambda: None
+            )
+        )
+        monkeypatch.setattr(collector.feedparser, "parse", fake_parse)
+        monkeypatch.setattr(
+            collector, "write_payload", lambda document, _path: recorded.update(document)
+        )
+        collector.main()
+        recorded["parse_calls"] = len(parsed)
+        return recorded
+
+    def test_meta_reports_hits_and_cache_persists(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        collector_args: Callable[..., argparse.Namespace],
+    ) -> None:
+        first = self.run_main(monkeypatch, tmp_path, collector_args)
+
+        # 兩個來源共用同一 URL：第二個來源直接命中
+        assert first["parse_calls"] == 1
+        assert first["meta"]["parse_cache"]["hits"] == 1
+        assert first["meta"]["parse_cache"]["misses"] == 1
+        assert collector.PARSE_CACHE_PATH.exists()
+
+        second = self.run_main(monkeypatch, tmp_path, collector_args)
+
+        assert second["parse_calls"] == 0
+        assert second["meta"]["parse_cache"]["hit_rate"] == 1.0
+
+    def test_dry_run_does_not_persist(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        collector_args: Callable[..., argparse.Namespace],
+    ) -> None:
+        self.run_main(monkeypatch, tmp_path, collector_args, "--dry-run")
+
+        assert not collector.PARSE_CACHE_PATH.exists()
+
+    def test_replay_disables_cache(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        collector_args: Callable[..., argparse.Namespace],
+    ) -> None:
+        document = self.run_main(monkeypatch, tmp_path, collector_args, "--replay", str(tmp_path))
+
+        assert document["parse_calls"] == 2
+        assert "parse_cache" not in document["meta"]
+        assert not collector.PARSE_CACHE_PATH.exists()
@@ -0,0 +1,217 @@
+"""測試多團隊 profiles：設定驗證、共用抓取與單次讀檔產出多份 digest。"""
+import json
+import pathlib
+import sys
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import collector
+import digest
+import profiles
+
+SOURCES = [
+    {"key": "hn", "name": "HN", "url": "https://hn/rss", "type": "rss", "category": "community"},
+    {"key": "tc", "name": "TC", "url": "https://tc/rss", "type": "rss", "category": "news"},
+    {"key": "tc_ai", "name": "TC AI", "url": "https://tc/rss", "type": "rss", "category": "ai"},
+]
+
+
+def config_with(profile_list: Any) -> Dict[str, Any]:
+    return {"sources": SOURCES, "profiles": profile_list}
+
+
+class TestParseProfiles:
+    """測試 profiles 區塊驗證。"""
+
+    def test_defaults(self) -> None:
+        (profile,) = profiles.parse_profiles(config_with([{"name": "team-a"}]))
+
+        assert profile == profiles.Profile(name="team-a")
+        assert profile.output_path(pathlib.Path("out"), pathlib.Path("."), "2025-12-22") == (
+            pathlib.Path("out/team-a/digest-2025-12-22.md")
+        )
+
+    def test_full_profile(self) -> None:
+        (profile,) = profiles.parse_profiles(
+            config_with(
+                [
+                    {
+                        "name": "ai",
+                        "sources": ["tc", "tc_ai"],
+                        "exclude_categories": ["news"],
+                        "formats": ["markdown", "html", "markdown"],
+                        "output": "out/ai/{date}.md",
+                        "top_k": 5,
+                    }
+                ]
+            )
+        )
+
+        assert profile.formats == ("markdown", "html")
+        assert profile.output_path(pathlib.Path("out"), pathlib.Path("/r"), "2025-12-22") == (
+            pathlib.Path("/r/out/ai/2025-12-22.md")
+        )
+        entries = [
+            {"source_key": "hn", "category": "community"},
+            {"source_key": "tc", "category": "news"},
+            {"source_key": "tc_ai", "category": "ai"},
+        ]
+        assert profile.select(entries) == [entries[2]]
+
+    @pytest.mark.parametrize(
+        "profile_list, message",
+        [
+            ({"name": "a"}, "列表"),
+            ([{"sources": ["hn"]}], "name"),
+            ([{"name": "a b"}], "英數字"),
+            ([{"name": "a"}, {"name": "a"}], "重複"),
+            ([{"name": "a", "sources": ["missing"]}], "missing"),
+            ([{"name": "a", "categories": "news"}], "字串列表"),
+            ([{"name": "a", "output": "out/{team}.md"}], "{date}"),
+            ([{"name": "a", "output": "out/a.html"}], ".md"),
+            ([{"name": "a", "top_k": -1}], "top_k"),
+        ],
+    )
+    def test_rejects(self, profile_list: Any, message: str) -> None:
+        with pytest.raises(ValueError, match=message):
+            profiles.parse_profiles(config_with(profile_list))
+
+    def test_choose(self) -> None:
+        parsed = profiles.parse_profiles(config_with([{"name": "a"}, {"name": "b"}]))
+
+        assert [profile.name for profile in profiles.choose(parsed, [])] == ["a", "b"]
+        assert [profile.name for profile in profiles.choose(parsed, ["b", "b"])] == ["b"]
+        with pytest.raises(ValueError, match="c"):
+            profiles.choose(parsed, ["c"])
+
+    def test_collector_rejects_invalid_profiles(self) -> None:
+        with pytest.raises(SystemExit) as exc_info:
+            collector.compile_config(config_with([{"name": "a", "sources": ["nope"]}]))
+
+        assert exc_info.value.code == 1
+
+
+def test_shared_url_is_downloaded_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    downloads: List[str] = []
+
+    def fake_get(url: str, timeout: int) -> SimpleNamespace:
+        downloads.append(url)
+        return SimpleNamespace(content=url.encode(), raise_for_status=lambda: None)
+
+    def fake_parse(content: bytes) -> SimpleNamespace:
+        entry = {"title": content.decode(), "link": f"{content.decode()}/1", "summary": ""}
+        return SimpleNamespace(entries=[entry], bozo=False)
+
+    monkeypatch.setattr(collector.requests, "get", fake_get)
+    monkeypatch.setattr(collector.feedparser, "parse", fake_parse)
+    collector.plan_shared_fetches(SOURCES)
+    try:
+        results = [collector.fetch_rss_or_atom(source) for source in SOURCES]
+    finally:
+        collector.SHARED_BODIES.clear()
+
+    assert downloads == ["https://hn/rss", "https://tc/rss"]
+    assert [entries[0].category for entries in results] == ["community", "news", "ai"]
+    assert collector.FETCH_STATS["tc_ai"]["bytes"] == len(b"https://tc/rss")
+
+
+def digest_args(**overrides: Any) -> SimpleNamespace:
+    values = dict(
+        date="2025-12-22",
+        input=None,
+        output=None,
+        dry_run=False,
+        verbose=False,
+        metrics_dir=None,
+        log_json=False,
+        top_k=None,
+        config=pathlib.Path("feeds.yml"),
+        range=None,
+        weekly=False,
+        formats=["markdown"],
+        template=None,
+        template_engine="builtin",
+        max_bytes=None,
+        incremental=False,
+        profiles=[],
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class TestDigestProfiles:
+    """測試 digest --profiles。"""
+
+    @pytest.fixture
+    def setup(self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> List[pathlib.Path]:
+        entries = [
+            {
+                "source_key": source["key"],
+                "source": source["name"],
+                "category": source["category"],
+                "title": f"{source['key']} title",
+                "url": f"https://example.com/{source['key']}",
+                "summary_raw": "",
+                "published_at": "2025-12-22T08:00:00+00:00",
+                "tags": [],
+            }
+            for source in SOURCES
+        ]
+        meta = {"raw_entries": 3, "unique_entries": 3, "dedup_rate": 0.0, "category_counts": {"x": 3}}
+        loads: List[pathlib.Path] = []
+        config = config_with(
+            [
+                {"name": "community", "sources": ["hn"]},
+                {"name": "ai", "categories": ["ai", "news"], "formats": ["markdown", "jsonfeed"]},
+            ]
+        )
+        monkeypatch.setattr(digest, "OUT_DIR", tmp_path)
+        monkeypatch.setattr(digest, "setup_logging", lambda **_: None)
+        monkeypatch.setattr(digest, "load_entries", lambda path: loads.append(path) or (entries, meta))
+        monkeypatch.setattr(digest.collector, "load_config", lambda _path: config)
+        return loads
+
+    def test_renders_every_profile_from_one_load(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path, setup: List[pathlib.Path]
+    ) -> None:
+        monkeypatch.setattr(digest, "parse_args", lambda: digest_args())
+
+        digest.main()
+
+        assert len(setup) == 1
+        community = (tmp_path / "community" / "digest-2025-12-22.md").read_text(encoding="utf-8")
+        assert "hn title" in community and "tc title" not in community
+        assert "分類統計：community 1 筆" in community
+        ai = (tmp_path / "ai" / "digest-2025-12-22.md").read_text(encoding="utf-8")
+        assert "tc title" in ai and "tc_ai title" in ai and "hn title" not in ai
+        feed = json.loads((tmp_path / "ai" / "digest-2025-12-22.json").read_text(encoding="utf-8"))
+        assert len(feed["items"]) == 2
+        assert not (tmp_path / "digest-2025-12-22.md").exists()
+
+    def test_selects_named_profiles(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path, setup: List[pathlib.Path]
+    ) -> None:
+        monkeypatch.setattr(digest, "parse_args", lambda: digest_args(profiles=["ai"]))
+
+        digest.main()
+
+        assert (tmp_path / "ai" / "digest-2025-12-22.md").exists()
+        assert not (tmp_path / "community").exists()
+
+    @pytest.mark.parametrize(
+        "overrides", [{"profiles": ["unknown"]}, {"incremental": True}]
+    )
+    def test_invalid_requests_exit(
+        self, monkeypatch: pytest.MonkeyPatch, setup: List[pathlib.Path], overrides: Dict[str, Any]
+    ) -> None:
+        monkeypatch.setattr(digest, "parse_args", lambda: digest_args(**overrides))
+
+        with pytest.raises(SystemExit) as exc_info:
+            digest.main()
+
+        assert exc_info.value.code == 1
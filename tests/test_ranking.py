@@ -0,0 +1,223 @@
+"""測試 ranking 的評分與 top-K 篩選。"""
+import pathlib
+import sys
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import pytest
+import yaml
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import collector
+import digest
+import ranking
+import renderers
+from ranking import RankingConfig
+
+REFERENCE = ranking.reference_timestamp("2025-12-22")
+
+
+class TestRankingConfig:
+    """測試 feeds.yml ranking 區塊的解析。"""
+
+    def test_defaults(self) -> None:
+        config = RankingConfig.from_config({"sources": []})
+
+        assert config.half_life_hours == ranking.DEFAULT_HALF_LIFE_HOURS
+        assert config.weights == ranking.DEFAULT_WEIGHTS
+
+    def test_reads_section_and_source_weights(self) -> None:
+        config = RankingConfig.from_config(
+            {
+                "ranking": {
+                    "half_life_hours": 12,
+                    "weights": {"coverage": 2},
+                    "tag_weights": {"AI": 1.5},
+                    "keyword_weights": {"LLM": 2},
+                    "source_weights": {"a": 0.5},
+                },
+                "sources": [{"key": "b", "weight": 3}],
+            }
+        )
+
+        assert config.half_life_hours == 12
+        assert config.weights == {"recency": 1.0, "coverage": 2.0}
+        assert config.tag_weights == {"ai": 1.5}
+        assert config.keyword_weights == {"llm": 2.0}
+        assert config.source_weights == {"a": 0.5, "b": 3.0}
+
+    @pytest.mark.parametrize(
+        "section",
+        [
+            "bad",
+            {"tag_weights": ["AI"]},
+            {"keyword_weights": {"llm": "high"}},
+            {"half_life_hours": 0},
+            {"half_life_hours": "soon"},
+        ],
+    )
+    def test_rejects_malformed_values(self, section: Any) -> None:
+        with pytest.raises(ValueError):
+            RankingConfig.from_config({"ranking": section, "sources": []})
+
+    def test_compile_config_exits_on_bad_ranking(
+        self, temp_dir: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(collector, "CONFIG_CACHE", collector.configcache.ConfigCache())
+        path = temp_dir / "feeds.yml"
+        bad_config = {"sources": [], "ranking": {"half_life_hours": -1}}
+        path.write_text(yaml.dump(bad_config), encoding="utf-8")
+
+        with pytest.raises(SystemExit) as exc_info:
+            collector.load_config(path)
+
+        assert exc_info.value.code == 1
+
+
+class TestParseTimestamp:
+    """測試時間字串解析。"""
+
+    def test_iso_and_rfc822_agree(self) -> None:
+        iso = ranking.parse_timestamp("2025-12-22T10:00:00Z")
+        rfc = ranking.parse_timestamp("Mon, 22 Dec 2025 10:00:00 +0000")
+
+        assert iso is not None and iso == rfc
+
+    def test_invalid_returns_none(self) -> None:
+        assert ranking.parse_timestamp("") is None
+        assert ranking.parse_timestamp("yesterday") is None
+
+
+class TestScoreEntries:
+    """測試各訊號對分數的影響。"""
+
+    def test_recent_entries_score_higher(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        entries = [
+            make_entry(published_at="2025-12-20T00:00:00Z"),
+            make_entry(published_at="2025-12-22T20:00:00Z"),
+            make_entry(published_at=""),
+        ]
+
+        scores = ranking.score_entries(entries, RankingConfig(), REFERENCE)
+
+        assert scores[1] > scores[0] > scores[2] == 0
+
+    def test_cross_source_coverage(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        entries = [
+            make_entry(title="Big News!", source_key="a", published_at=""),
+            make_entry(title="big news", source_key="b", published_at=""),
+            make_entry(title="Other", source_key="c", published_at=""),
+        ]
+
+        scores = ranking.score_entries(entries, RankingConfig(), REFERENCE)
+
+        assert scores[0] == scores[1] > scores[2]
+
+    def test_tag_keyword_and_source_weights(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        config = RankingConfig(
+            tag_weights={"ai": 1.0},
+            keyword_weights={"llm": 2.0},
+            source_weights={"boosted": 3.0},
+        )
+        entries = [
+            make_entry(title="A", tags=["AI"], published_at=""),
+            make_entry(title="B", summary_raw="New LLM release", published_at=""),
+            make_entry(title="C", source_key="boosted", tags=["AI"], published_at=""),
+        ]
+
+        scores = ranking.score_entries(entries, config, REFERENCE)
+
+        assert scores == pytest.approx([1.0, 2.0, 3.0])
+
+    def test_pure_python_fallback_matches(
+        self, monkeypatch: pytest.MonkeyPatch, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        entries = [
+            make_entry(
+                title=f"T{idx % 4}",
+                source_key=f"s{idx % 3}",
+                tags=["AI"],
+                published_at=f"2025-12-{10 + idx % 12:02d}T00:00:00Z",
+            )
+            for idx in range(30)
+        ]
+        config = RankingConfig(tag_weights={"ai": 0.3})
+        expected = ranking.score_entries(entries, config, REFERENCE)
+
+        monkeypatch.setattr(ranking, "_numpy", lambda: None)
+
+        assert ranking.score_entries(entries, config, REFERENCE) == pytest.approx(expected)
+
+
+class TestSelectTopK:
+    """測試各分類 top-K 篩選。"""
+
+    def test_keeps_top_k_per_category(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        entries = [
+            make_entry(title=str(idx), category="a" if idx < 5 else "b") for idx in range(8)
+        ]
+        scores = [1, 5, 3, 5, 0, 2, 9, 1]
+
+        selected = ranking.select_top_k(entries, scores, 2)
+
+        assert [item["title"] for item in selected] == ["1", "3", "6", "5"]
+
+    def test_zero_means_sort_only(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        entries = [make_entry(title=str(idx)) for idx in range(3)]
+
+        selected = ranking.select_top_k(entries, [1, 3, 2], None)
+
+        assert [item["title"] for item in selected] == ["1", "2", "0"]
+
+    def test_empty(self) -> None:
+        assert ranking.rank_entries([], RankingConfig(), "2025-12-22", 3) == []
+
+
+def test_digest_main_applies_top_k(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+    make_entry: Callable[..., Dict[str, Any]],
+) -> None:
+    entries = [
+        make_entry(title=f"Entry {idx}", url=f"https://example.com/{idx}") for idx in range(5)
+    ]
+    args = SimpleNamespace(
+        date="2025-12-22",
+        input=None,
+        output=tmp_path / "digest.md",
+        dry_run=False,
+        verbose=False,
+        metrics_dir=None,
+        log_json=False,
+        top_k=2,
+        config=tmp_path / "missing.yml",
+        range=None,
+        weekly=False,
+        formats=["markdown"],
+        template=None,
+        template_engine="builtin",
+        max_bytes=None,
+        incremental=False,
+        profiles=None,
+    )
+    rendered: Dict[str, List[Dict[str, Any]]] = {}
+    monkeypatch.setattr(digest, "parse_args", lambda: args)
+    monkeypatch.setattr(digest, "OUT_DIR", tmp_path / "raw")
+    monkeypatch.setattr(digest, "setup_logging", lambda **_: None)
+    monkeypatch.setattr(digest, "load_entries", lambda _path: (entries, {}))
+    monkeypatch.setattr(
+        renderers.MarkdownRenderer,
+        "render",
+        lambda _self, model, out: rendered.setdefault(
+            "entries", [entry for _cat, _src, entry in model.iter_entries()]
+        )
+        and out.write("ok"),
+    )
+
+    digest.main()
+
+    assert len(rendered["entries"]) == 2
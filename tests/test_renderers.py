@@ -0,0 +1,161 @@
+"""測試共用 DigestModel 與各輸出格式 renderer。"""
+import argparse
+import io
+import json
+import pathlib
+import sys
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import digest
+import renderers
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+@pytest.fixture
+def entries() -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": "B <script>",
+            "url": "https://b.example/?a=1&b=2",
+            "summary_raw": "x" * 250,
+            "published_at": "2025-12-22T08:00:00+00:00",
+            "source": "Zeta",
+            "tags": ["AI"],
+            "category": "news",
+        },
+        {
+            "title": "A",
+            "url": "",
+            "summary_raw": "",
+            "published_at": "unknown",
+            "source": "Alpha",
+            "tags": [],
+            "category": "news",
+        },
+        {
+            "title": "C",
+            "url": "https://c.example",
+            "summary_raw": "C & D",
+            "published_at": "",
+            "source": "Alpha",
+            "tags": [],
+            "category": "",
+        },
+    ]
+
+
+def render(name: str, model: renderers.DigestModel) -> str:
+    buffer = io.StringIO()
+    renderers.RENDERERS[name].render(model, buffer)
+    return buffer.getvalue()
+
+
+class TestBuildModel:
+    """測試一次分組的中介結構。"""
+
+    def test_groups_and_sorts(self, entries: List[Dict[str, Any]]) -> None:
+        model = renderers.build_model(entries, "2025-12-22")
+
+        assert [category.name for category in model.categories] == ["news", "未分類"]
+        assert [source.name for source in model.categories[0].sources] == ["Alpha", "Zeta"]
+        assert model.entry_count == 3
+        assert len(list(model.iter_entries())) == 3
+
+
+class TestRenderers:
+    """測試各格式輸出。"""
+
+    def test_markdown_matches_digest_wrapper(self, entries: List[Dict[str, Any]]) -> None:
+        model = renderers.build_model(entries, "2025-12-22", {"dedup_rate": 0.5})
+
+        markdown = render("markdown", model)
+
+        expected = digest.generate_markdown(entries, "2025-12-22", {"dedup_rate": 0.5})
+        assert markdown.split("*本摘要")[0] == expected.split("*本摘要")[0]
+        assert "x" * 200 + "..." in markdown
+
+    def test_html_escapes_content(self, entries: List[Dict[str, Any]]) -> None:
+        output = render("html", renderers.build_model(entries, "2025-12-22", {"raw_entries": 3}))
+
+        assert output.startswith("<!DOCTYPE html>")
+        assert "B &lt;script&gt;" in output
+        assert 'href="https://b.example/?a=1&amp;b=2"' in output
+        assert "<li>去重率：N/A（原始 3 → 去重 3）</li>" in output
+
+    def test_json_feed(self, entries: List[Dict[str, Any]]) -> None:
+        feed = json.loads(render("jsonfeed", renderers.build_model(entries, "2025-12-22")))
+
+        assert feed["version"] == "https://jsonfeed.org/version/1.1"
+        first = feed["items"][1]
+        assert first["id"] == "https://b.example/?a=1&b=2"
+        assert first["date_published"] == "2025-12-22T08:00:00+00:00"
+        assert first["_digest"] == {"category": "news", "source": "Zeta"}
+        assert "date_published" not in feed["items"][0]
+
+    def test_atom_is_well_formed(self, entries: List[Dict[str, Any]]) -> None:
+        root = ET.fromstring(render("atom", renderers.build_model(entries, "2025-12-22")))
+
+        items = root.findall(f"{ATOM}entry")
+        assert len(items) == 3
+        assert items[1].find(f"{ATOM}title").text == "B <script>"
+        assert items[1].find(f"{ATOM}link").get("href") == "https://b.example/?a=1&b=2"
+        assert items[2].find(f"{ATOM}summary").text == "C & D"
+
+
+class TestFormatsOption:
+    """測試 --formats 與單次載入輸出多格式。"""
+
+    def test_parse_formats(self) -> None:
+        assert digest.parse_formats("markdown, atom,markdown") == ["markdown", "atom"]
+        with pytest.raises(argparse.ArgumentTypeError):
+            digest.parse_formats("pdf")
+
+    def test_main_writes_all_formats(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        entries: List[Dict[str, Any]],
+    ) -> None:
+        args = SimpleNamespace(
+            date="2025-12-22",
+            input=None,
+            output=tmp_path / "digest-2025-12-22.md",
+            dry_run=False,
+            verbose=False,
+            metrics_dir=None,
+            log_json=False,
+            top_k=None,
+            config=None,
+            range=None,
+            weekly=False,
+            formats=["markdown", "html", "jsonfeed", "atom"],
+            template=None,
+            template_engine="builtin",
+            max_bytes=None,
+            incremental=False,
+            profiles=None,
+        )
+        loads: List[pathlib.Path] = []
+        monkeypatch.setattr(digest, "parse_args", lambda: args)
+        monkeypatch.setattr(digest, "OUT_DIR", tmp_path / "raw")
+        monkeypatch.setattr(digest, "setup_logging", lambda **_: None)
+        monkeypatch.setattr(digest, "load_entries", lambda path: loads.append(path) or (entries, {}))
+
+        digest.main()
+
+        assert len(loads) == 1
+        names = sorted(path.name for path in tmp_path.iterdir() if path.is_file())
+        assert names == [
+            "digest-2025-12-22.html",
+            "digest-2025-12-22.json",
+            "digest-2025-12-22.md",
+            "digest-2025-12-22.xml",
+        ]
@@ -0,0 +1,147 @@
+"""測試多日彙總（每日 aggregate 快取與合併）。"""
+import pathlib
+import sys
+from types import SimpleNamespace
+from typing import Any, Callable, Dict
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import digest
+import rollup
+from ranking import RankingConfig
+
+
+def rollup_args(**overrides: Any) -> SimpleNamespace:
+    args = SimpleNamespace(
+        date="2025-12-07",
+        input=None,
+        output=None,
+        dry_run=False,
+        verbose=False,
+        metrics_dir=None,
+        log_json=False,
+        top_k=None,
+        config=pathlib.Path("missing.yml"),
+        range=None,
+        weekly=True,
+        formats=["markdown"],
+        template=None,
+        template_engine="builtin",
+        max_bytes=None,
+        incremental=False,
+        profiles=None,
+    )
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+class TestDateRanges:
+    """測試 --range 與 --weekly 的日期展開。"""
+
+    def test_parse_range_inclusive(self) -> None:
+        assert rollup.parse_range("2025-12-30..2026-01-02") == [
+            "2025-12-30",
+            "2025-12-31",
+            "2026-01-01",
+            "2026-01-02",
+        ]
+
+    @pytest.mark.parametrize("text", ["2025-12-01", "2025-12-05..2025-12-01", "x..y", "2024-01-01..2025-12-31"])
+    def test_parse_range_rejects_invalid(self, text: str) -> None:
+        with pytest.raises(ValueError):
+            rollup.parse_range(text)
+
+    def test_week_ending(self) -> None:
+        days = rollup.week_ending("2025-12-07")
+
+        assert days[0] == "2025-12-01"
+        assert days[-1] == "2025-12-07"
+        assert len(days) == 7
+
+
+class TestAggregates:
+    """測試單日 aggregate 與跨日合併。"""
+
+    def test_build_aggregate_counts_and_truncates(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        entries = [make_entry("A", summary_raw="x" * 500), make_entry("B", category="tools")]
+
+        aggregate = rollup.build_aggregate(entries, {}, "2025-12-01", RankingConfig(), "stamp")
+
+        assert aggregate["entries"] == 2
+        assert aggregate["category_counts"] == {"news": 1, "tools": 1}
+        assert len(aggregate["clusters"]) == 2
+        assert all(len(item["summary_raw"]) <= rollup.SUMMARY_CHARS for item in aggregate["top"])
+        assert rollup.is_fresh(aggregate, "stamp", rollup.config_fingerprint(RankingConfig()))
+        assert not rollup.is_fresh(aggregate, "other", rollup.config_fingerprint(RankingConfig()))
+
+    def test_merge_prefers_recurring_clusters(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        config = RankingConfig()
+        day1 = rollup.build_aggregate(
+            [make_entry("Big launch"), make_entry("Only once")], {}, "2025-12-01", config, "1"
+        )
+        day2 = rollup.build_aggregate(
+            [make_entry("big launch!", url="https://other.example/x")], {}, "2025-12-02", config, "2"
+        )
+
+        merged = rollup.merge_aggregates(
+            [day1, day2], ["2025-12-01", "2025-12-02", "2025-12-03"], top_k=1
+        )
+
+        assert merged["entries"] == 3
+        assert merged["missing"] == ["2025-12-03"]
+        assert merged["recurring_clusters"] == 1
+        assert [item["days"] for item in merged["top"]["news"]] == [2]
+
+
+class TestRunRollup:
+    """測試 digest --weekly/--range 的端到端流程。"""
+
+    def test_weekly_writes_digest_and_caches_aggregates(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        monkeypatch.setattr(digest, "OUT_DIR", tmp_path)
+        write_raw(tmp_path, "2025-12-01", [make_entry("Launch"), make_entry("Other")])
+        write_raw(tmp_path, "2025-12-03", [make_entry("launch", url="https://b.example")])
+
+        digest.run_rollup(rollup_args())
+
+        output = (tmp_path / "digest-2025-12-01_2025-12-07.md").read_text(encoding="utf-8")
+        assert output.startswith("# 技術資訊彙總 - 2025-12-01 ~ 2025-12-07")
+        assert "- 涵蓋天數：2 / 7" in output
+        assert "**出現天數**：2" in output
+        assert (tmp_path / "raw-2025-12-01.agg.json").exists()
+
+        def fail_load(_path: pathlib.Path) -> None:
+            raise AssertionError("aggregate 快取未命中")
+
+        monkeypatch.setattr(digest, "load_entries", fail_load)
+        digest.run_rollup(rollup_args(output=tmp_path / "again.md"))
+        assert (tmp_path / "again.md").exists()
+
+    def test_range_without_data_exits(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+    ) -> None:
+        monkeypatch.setattr(digest, "OUT_DIR", tmp_path)
+
+        with pytest.raises(SystemExit) as exc:
+            digest.run_rollup(rollup_args(weekly=False, range="2025-12-01..2025-12-02"))
+
+        assert exc.value.code == 2
+
+    def test_invalid_range_exits(self) -> None:
+        with pytest.raises(SystemExit) as exc:
+            digest.run_rollup(rollup_args(weekly=False, range="2025-12-01"))
+
+        assert exc.value.code == 1
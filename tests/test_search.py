@@ -0,0 +1,240 @@
+"""測試歷史全文檢索。"""
+import json
+import logging
+import pathlib
+import sqlite3
+import sys
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import collector
+import search
+
+
+@pytest.fixture
+def archive(
+    tmp_path: pathlib.Path,
+    make_entry: Callable[..., Dict[str, Any]],
+    write_raw: Callable[..., pathlib.Path],
+) -> pathlib.Path:
+    write_raw(
+        tmp_path,
+        "2025-12-01",
+        [
+            make_entry("大型語言模型推論加速", summary_raw="介紹 KV cache 與量化"),
+            make_entry("Kubernetes 1.35 released", summary_raw="new scheduler", category="tools"),
+        ],
+    )
+    write_raw(
+        tmp_path,
+        "2025-12-20",
+        [
+            make_entry("語言模型評測", summary_raw="比較多個 LLM", source="B"),
+            make_entry("Rust async runtime", summary_raw="tokio 語言模型無關", category="tools"),
+        ],
+    )
+    return tmp_path
+
+
+def query(raw_dir: pathlib.Path, text: str, **kwargs: Any) -> List[search.Hit]:
+    conn = search.connect(search.store_path(raw_dir))
+    search.sync(conn, raw_dir)
+    try:
+        return search.search(conn, text, **kwargs)
+    finally:
+        conn.close()
+
+
+class TestTokenize:
+    """測試斷詞與查詢字串。"""
+
+    def test_cjk_bigrams_and_ascii_words(self) -> None:
+        assert search.tokenize("OpenAI 發布語言模型 GPT-5") == [
+            "openai", "發布", "布語", "語言", "言模", "模型", "gpt", "5",
+        ]
+
+    def test_single_cjk_char_kept(self) -> None:
+        assert search.tokenize("與 AI") == ["與", "ai"]
+
+    def test_build_query(self) -> None:
+        assert search.build_query("語言模型 kube*") == '"語言 言模 模型" AND "kube" *'
+        assert search.build_query('"') == ""
+
+    def test_punctuation_never_reaches_fts(self) -> None:
+        assert search.build_query('a"b OR(') == '"a b" AND "or"'
+
+
+class TestSearch:
+    """測試索引與查詢。"""
+
+    def test_cjk_substring_match(self, archive: pathlib.Path) -> None:
+        titles = [hit.title for hit in query(archive, "語言模型")]
+
+        assert set(titles) == {"大型語言模型推論加速", "語言模型評測", "Rust async runtime"}
+        # 標題命中排在只有摘要命中的前面
+        assert titles[-1] == "Rust async runtime"
+
+    def test_ascii_and_prefix(self, archive: pathlib.Path) -> None:
+        assert [hit.title for hit in query(archive, "kubernetes")] == ["Kubernetes 1.35 released"]
+        assert [hit.title for hit in query(archive, "kube*")] == ["Kubernetes 1.35 released"]
+
+    def test_filters(self, archive: pathlib.Path) -> None:
+        recent_news = query(archive, "語言模型", since="2025-12-10", categories=["news"])
+        assert [hit.title for hit in recent_news] == ["語言模型評測"]
+        assert [hit.title for hit in query(archive, "語言模型", until="2025-12-10")] == [
+            "大型語言模型推論加速"
+        ]
+        assert [hit.source for hit in query(archive, "語言模型", sources=["B"])] == ["B"]
+
+    def test_same_url_reported_once(
+        self,
+        tmp_path: pathlib.Path,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        entry = make_entry("語言模型週報", url="https://example.com/weekly")
+        write_raw(tmp_path, "2025-12-01", [entry])
+        write_raw(tmp_path, "2025-12-02", [entry])
+
+        hits = query(tmp_path, "週報")
+
+        assert [hit.date for hit in hits] == ["2025-12-02"]
+
+    def test_sync_is_incremental(
+        self,
+        archive: pathlib.Path,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        conn = search.connect(search.store_path(archive))
+        try:
+            assert search.sync(conn, archive) == 2
+            assert search.sync(conn, archive) == 0
+
+            write_raw(archive, "2025-12-20", [make_entry("全新內容")])
+            assert search.sync(conn, archive) == 1
+            assert [hit.title for hit in search.search(conn, "全新")] == ["全新內容"]
+            assert [hit.title for hit in search.search(conn, "評測")] == []
+        finally:
+            conn.close()
+
+    def test_deleted_raw_file_is_purged(self, archive: pathlib.Path) -> None:
+        conn = search.connect(search.store_path(archive))
+        try:
+            search.sync(conn, archive)
+            (archive / "raw-2025-12-20.json").unlink()
+
+            assert search.sync(conn, archive) == 0
+            assert search.search(conn, "評測") == []
+            assert [row[0] for row in conn.execute("SELECT date FROM indexed_files")] == ["2025-12-01"]
+            counts = [
+                conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("documents", "documents_fts")
+            ]
+            assert counts == [2, 2]
+        finally:
+            conn.close()
+
+    def test_schema_version_change_rebuilds(self, archive: pathlib.Path) -> None:
+        path = search.store_path(archive)
+        conn = search.connect(path)
+        search.sync(conn, archive)
+        conn.execute("PRAGMA user_version = 0")
+        conn.close()
+
+        conn = search.connect(path)
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 0
+        finally:
+            conn.close()
+
+
+class TestIndexFile:
+    """測試 collector 寫檔後的增量索引。"""
+
+    def test_index_file_skips_unchanged(
+        self,
+        tmp_path: pathlib.Path,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        path = write_raw(tmp_path, "2025-12-22", [make_entry("語言模型")])
+
+        assert search.index_file(path, "2025-12-22") == 1
+        assert search.index_file(path, "2025-12-22") is None
+
+    def test_collector_updates_index(
+        self,
+        tmp_path: pathlib.Path,
+        make_entry: Callable[..., Dict[str, Any]],
+        write_raw: Callable[..., pathlib.Path],
+    ) -> None:
+        path = write_raw(tmp_path, "2025-12-22", [make_entry("語言模型")])
+
+        collector.update_search_index(path, "2025-12-22")
+
+        assert [hit.title for hit in query(tmp_path, "模型")] == ["語言模型"]
+
+    def test_collector_index_failure_only_warns(
+        self, tmp_path: pathlib.Path, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        with caplog.at_level(logging.WARNING, logger="collector"):
+            collector.update_search_index(tmp_path / "missing.json", "2025-12-22")
+
+        assert "更新搜尋索引失敗" in caplog.text
+        assert not search.store_path(tmp_path).exists()
+
+
+class TestMain:
+    """測試 search CLI。"""
+
+    def test_prints_hits(
+        self, archive: pathlib.Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+    ) -> None:
+        monkeypatch.setattr(search.logutil, "setup_logging", lambda **_: None)
+
+        search.main(["語言模型", "--raw-dir", str(archive), "--category", "news", "--json"])
+
+        lines = capsys.readouterr().out.strip().splitlines()
+        assert [json.loads(line)["title"] for line in lines] == ["語言模型評測", "大型語言模型推論加速"]
+
+    def test_reindex_removes_wal_files(
+        self, archive: pathlib.Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+    ) -> None:
+        monkeypatch.setattr(search.logutil, "setup_logging", lambda **_: None)
+        db_path = search.store_path(archive)
+        files = [db_path.with_name(db_path.name + suffix) for suffix in ("", "-wal", "-shm")]
+        for path in files:
+            path.write_bytes(b"stale")
+        left: List[str] = []
+        real_connect = search.connect
+
+        def spy_connect(path: pathlib.Path) -> sqlite3.Connection:
+            left.extend(item.name for item in files if item.exists())
+            return real_connect(path)
+
+        monkeypatch.setattr(search, "connect", spy_connect)
+
+        search.main(["評測", "--raw-dir", str(archive), "--reindex", "--json"])
+
+        assert left == []
+        lines = capsys.readouterr().out.strip().splitlines()
+        assert [json.loads(line)["title"] for line in lines] == ["語言模型評測"]
+
+    def test_no_archive_exits_2(self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(search.logutil, "setup_logging", lambda **_: None)
+
+        with pytest.raises(SystemExit) as exc_info:
+            search.main(["x", "--raw-dir", str(tmp_path)])
+
+        assert exc_info.value.code == 2
+
+    def test_bad_date_rejected(self, capsys: pytest.CaptureFixture) -> None:
+        with pytest.raises(SystemExit) as exc_info:
+            search.parse_args(["x", "--since", "12/01"])
+
+        assert exc_info.value.code == 2
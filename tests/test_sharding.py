@@ -0,0 +1,241 @@
+"""測試分片收集：一致性雜湊分配來源與合併分片輸出。"""
+import argparse
+import json
+import pathlib
+import sys
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import collector
+import sharding
+from models import Entry
+
+KEYS = [f"source_{idx}" for idx in range(400)]
+
+
+def shard_document(
+    index: int, count: int, entries: List[Dict[str, Any]], **meta: Any
+) -> Dict[str, Any]:
+    base = {
+        "raw_entries": len(entries),
+        "unique_entries": len(entries),
+        "filtered_entries": 0,
+        "too_old_entries": 0,
+        "filter_hits": {},
+        "total_sources": 1,
+        "succeeded_sources": 1,
+        "failed_source_count": 0,
+        "failed_sources": [],
+        "shard": {"index": index, "count": count},
+    }
+    return {"meta": {**base, **meta}, "entries": entries}
+
+
+def item(url: str, category: str = "news") -> Dict[str, Any]:
+    return {"url": url, "title": url, "category": category}
+
+
+class TestAssignment:
+    """測試分片解析與一致性雜湊。"""
+
+    def test_parse_shard(self) -> None:
+        assert sharding.parse_shard("2/4") == (2, 4)
+        assert sharding.parse_shard(" 1 / 1 ") == (1, 1)
+        for value in ["0/3", "4/3", "1/0", "a/b", "1-3", ""]:
+            with pytest.raises(ValueError):
+                sharding.parse_shard(value)
+
+    def test_every_source_has_exactly_one_shard(self) -> None:
+        sources = [{"key": key} for key in KEYS]
+
+        selected = [sharding.select_sources(sources, index, 4) for index in range(1, 5)]
+
+        assert sorted(source["key"] for part in selected for source in part) == sorted(KEYS)
+        # 虛擬節點讓分配大致平均
+        assert all(50 <= len(part) <= 150 for part in selected)
+
+    def test_adding_a_shard_moves_few_sources(self) -> None:
+        before = {key: sharding.shard_of(key, 4) for key in KEYS}
+        after = {key: sharding.shard_of(key, 5) for key in KEYS}
+
+        moved = [key for key in KEYS if before[key] != after[key]]
+
+        assert all(after[key] == 5 for key in moved)
+        assert len(moved) < len(KEYS) * 0.35
+
+    def test_shard_paths(self, tmp_path: pathlib.Path) -> None:
+        shards = tmp_path / "shards"
+        shards.mkdir()
+        for name in [
+            "raw-2025-12-22.shard-10-of-10.json",
+            "raw-2025-12-22.shard-2-of-10.json",
+            "raw-2025-12-22.shard-x-of-10.json",
+            "raw-2025-12-23.shard-1-of-10.json",
+            "raw-2025-12-22.json",
+        ]:
+            (shards / name).write_text("{}", encoding="utf-8")
+
+        found = sharding.find_shards(tmp_path, "2025-12-22")
+
+        assert [path.name for path in found] == [
+            "raw-2025-12-22.shard-2-of-10.json",
+            "raw-2025-12-22.shard-10-of-10.json",
+        ]
+        assert sharding.shard_path(tmp_path, "2025-12-22", 2, 10) == found[0]
+
+
+class TestMergeDocuments:
+    """測試合併後的 meta 統計。"""
+
+    def test_aggregates_meta(self) -> None:
+        first = shard_document(
+            1,
+            3,
+            [item("https://a/1"), item("https://a/2", "tools")],
+            raw_entries=5,
+            unique_entries=7,
+            filtered_entries=1,
+            filter_hits={"ads": {"exclude": 1}},
+            enrichment={"candidates": 2, "seconds": 0.5},
+        )
+        second = shard_document(
+            2,
+            3,
+            [item("https://a/2", "tools"), item("https://b/1")],
+            raw_entries=4,
+            total_sources=2,
+            succeeded_sources=1,
+            failed_source_count=1,
+            failed_sources=[{"key": "down", "name": "Down"}],
+            filter_hits={"ads": {"exclude": 2}},
+            enrichment={"candidates": 1, "seconds": 0.25},
+        )
+
+        merged = sharding.merge_documents([second, first])
+        meta = merged["meta"]
+
+        assert [entry["url"] for entry in merged["entries"]] == ["https://a/1", "https://a/2", "https://b/1"]
+        assert meta["raw_entries"] == 9
+        # 合併去重後 3 筆 + 過濾掉的 1 筆；不採用分片自報的 unique_entries
+        assert meta["unique_entries"] == 3 + 1
+        assert meta["unique_entries"] - meta["filtered_entries"] == len(merged["entries"])
+        assert meta["dedup_rate"] == round(5 / 9, 4)
+        assert meta["filtered_entries"] == 1
+        assert meta["category_counts"] == {"news": 2, "tools": 1}
+        assert meta["total_sources"] == 3
+        assert meta["failed_source_count"] == 1
+        assert meta["failed_sources"] == [{"key": "down", "name": "Down"}]
+        assert meta["filter_hits"] == {"ads": {"exclude": 3}}
+        assert meta["enrichment"] == {"candidates": 3, "seconds": 0.75}
+        assert meta["shards"] == {
+            "count": 3,
+            "merged": [1, 2],
+            "missing": [3],
+            "cross_shard_duplicates": 1,
+        }
+
+    @pytest.mark.parametrize(
+        "documents, message",
+        [
+            ([], "沒有"),
+            ([{"meta": {}, "entries": []}], "meta.shard"),
+            ([shard_document(1, 2, []), shard_document(1, 2, [])], "重複"),
+            ([shard_document(1, 2, []), shard_document(2, 3, [])], "不一致"),
+        ],
+    )
+    def test_rejects_inconsistent_shards(self, documents: List[Dict[str, Any]], message: str) -> None:
+        with pytest.raises(ValueError, match=message):
+            sharding.merge_documents(documents)
+
+
+class TestCollectorShards:
+    """測試 collector 的 --shard 與 --merge-shards。"""
+
+    @pytest.fixture(autouse=True)
+    def patch_io(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+        collector_args: Callable[..., argparse.Namespace],
+    ) -> None:
+        indexed: List[Any] = []
+        monkeypatch.setattr(collector, "OUT_DIR", tmp_path)
+        monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
+        monkeypatch.setattr(collector, "update_search_index", lambda *args: indexed.append(args))
+        self.indexed = indexed
+        self.make_args = lambda *argv: collector_args("--date", "2025-12-22", *argv)
+
+    def test_shard_collects_only_its_sources(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+    ) -> None:
+        sources = [
+            {"key": key, "name": key, "type": "rss", "category": "news", "enabled": True}
+            for key in KEYS[:20]
+        ]
+        fetched: List[str] = []
+
+        def fake_fetch(source: Dict[str, Any]) -> List[Entry]:
+            fetched.append(source["key"])
+            return [
+                Entry.create(
+                    source_key=source["key"],
+                    source=source["name"],
+                    category="news",
+                    tags=[],
+                    title=source["key"],
+                    url=f"https://example.com/{source['key']}",
+                    summary_raw="",
+                )
+            ]
+
+        monkeypatch.setattr(collector, "parse_args", lambda: self.make_args("--shard", "2/3"))
+        monkeypatch.setattr(collector, "load_config", lambda _path: {"sources": sources})
+        monkeypatch.setattr(collector, "fetch_source", fake_fetch)
+
+        collector.main()
+
+        expected = [source["key"] for source in sharding.select_sources(sources, 2, 3)]
+        assert fetched == expected
+        document = json.loads(
+            sharding.shard_path(tmp_path, "2025-12-22", 2, 3).read_text(encoding="utf-8")
+        )
+        assert document["meta"]["shard"] == {"index": 2, "count": 3}
+        assert document["meta"]["total_sources"] == len(expected)
+        assert not (tmp_path / "raw-2025-12-22.json").exists()
+        assert self.indexed == []
+
+    def test_merge_writes_raw_file(self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> None:
+        for index in (1, 2):
+            path = sharding.shard_path(tmp_path, "2025-12-22", index, 2)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            document = shard_document(index, 2, [item(f"https://x/{index}"), item("https://x/shared")])
+            path.write_text(json.dumps(document), encoding="utf-8")
+        monkeypatch.setattr(collector, "parse_args", lambda: self.make_args("--merge-shards"))
+
+        collector.main()
+
+        output = tmp_path / "raw-2025-12-22.json"
+        merged = json.loads(output.read_text(encoding="utf-8"))
+        assert len(merged["entries"]) == 3
+        assert merged["meta"]["shards"]["missing"] == []
+        assert self.indexed == [(output, "2025-12-22")]
+
+    def test_merge_without_shards_exits(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(collector, "parse_args", lambda: self.make_args("--merge-shards"))
+
+        with pytest.raises(SystemExit) as exc_info:
+            collector.main()
+
+        assert exc_info.value.code == 2
+
+    def test_invalid_shard_exits(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(collector, "parse_args", lambda: self.make_args("--shard", "3/2"))
+
+        with pytest.raises(SystemExit) as exc_info:
+            collector.main()
+
+        assert exc_info.value.code == 1
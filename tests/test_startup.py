@@ -0,0 +1,108 @@
+"""以 python -X importtime 守護 collector 的啟動成本。"""
+import argparse
+import pathlib
+import shutil
+import subprocess
+import sys
+from typing import Callable, Dict, List
+
+import pytest
+
+OPS_DIR = pathlib.Path(__file__).parent.parent / "ops"
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(OPS_DIR))
+
+import collector
+from lazyimport import LazyModule
+
+HEAVY_MODULES = {"feedparser", "requests", "yaml"}
+
+
+def import_times(*args: str, cwd: pathlib.Path = OPS_DIR) -> Dict[str, int]:
+    """執行 python -X importtime，回傳 {模組名稱: 累計微秒}。"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        timeout=60,
+    )
+    times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def top_level(times: Dict[str, int]) -> set[str]:
+    return {name.split(".")[0] for name in times}
+
+
+class TestImportTime:
+    """import collector 與 --help/--check-config 不應載入重量級套件。"""
+
+    def test_import_collector_skips_heavy_modules(self) -> None:
+        times = import_times("-c", "import collector")
+
+        assert "collector" in times
+        assert not HEAVY_MODULES & top_level(times), sorted(times, key=times.get)[-10:]
+
+    def test_help_skips_heavy_modules(self) -> None:
+        times = import_times("collector.py", "--help")
+
+        assert not HEAVY_MODULES & top_level(times)
+
+    def test_check_config_skips_fetch_modules(self, tmp_path: pathlib.Path) -> None:
+        # 在 ops/ 的副本中執行，設定快取寫到臨時目錄而非 repo 的 cache/
+        ops_copy = shutil.copytree(OPS_DIR, tmp_path / "ops", ignore=shutil.ignore_patterns("__pycache__"))
+        # yaml 只有在設定快取未命中時才會載入，因此不檢查它
+        times = import_times("collector.py", "--check-config", cwd=ops_copy)
+
+        assert not {"feedparser", "requests"} & top_level(times)
+
+
+class TestLazyModule:
+    """測試 LazyModule 代理行為。"""
+
+    def test_loads_on_first_attribute_access(self) -> None:
+        module = LazyModule("colorsys", "missing")
+
+        assert not module.loaded
+        assert module.rgb_to_hsv(0, 0, 0) == (0.0, 0.0, 0.0)
+        assert module.loaded
+
+    def test_setattr_forwards_to_real_module(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        module = LazyModule("colorsys", "missing")
+        monkeypatch.setattr(module, "ONE_THIRD", 0.5)
+
+        import colorsys
+
+        assert colorsys.ONE_THIRD == 0.5
+
+    def test_missing_module_raises_system_exit(self) -> None:
+        module = LazyModule("definitely_not_installed_pkg", "請先安裝 definitely_not_installed_pkg")
+
+        with pytest.raises(SystemExit) as exc_info:
+            module.anything
+
+        assert "請先安裝" in str(exc_info.value.code)
+
+
+def test_main_check_config_does_not_fetch(
+    monkeypatch: pytest.MonkeyPatch, collector_args: Callable[..., argparse.Namespace]
+) -> None:
+    fake_args = collector_args("--check-config")
+    calls: List[str] = []
+    monkeypatch.setattr(collector, "parse_args", lambda: fake_args)
+    monkeypatch.setattr(collector, "setup_logging", lambda **_: None)
+    monkeypatch.setattr(
+        collector, "load_config", lambda _path: calls.append("load") or {"sources": [{}]}
+    )
+    monkeypatch.setattr(collector, "fetch_source", lambda _src: calls.append("fetch") or [])
+
+    collector.main()
+
+    assert calls == ["load"]
@@ -0,0 +1,206 @@
+"""測試內建模板引擎與 --template。"""
+import io
+import pathlib
+import sys
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import backfill
+import digest
+import renderers
+import templating
+from templating import BuiltinTemplate, TemplateError
+
+
+@pytest.fixture
+def entries() -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": "B",
+            "url": "https://b.example",
+            "summary_raw": "x" * 250,
+            "published_at": "2025-12-22",
+            "source": "Zeta",
+            "tags": ["AI", "ML"],
+            "category": "news",
+        },
+        {
+            "title": "A",
+            "url": "",
+            "summary_raw": "",
+            "published_at": "",
+            "source": "Alpha",
+            "tags": [],
+            "category": "news",
+            "days": 3,
+        },
+    ]
+
+
+class TestBuiltinTemplate:
+    """測試內建引擎的語法子集。"""
+
+    def test_expressions_loops_and_filters(self) -> None:
+        template = BuiltinTemplate(
+            "{% for item in items %}\n"
+            "{{ loop_title|upper }}: {{ item.name|e }}{% if item.n > 1 %} x{{ item.n }}{% endif %};\n"
+            "{% endfor %}\n"
+            "{{ tags|join(\", \") }}\n"
+        )
+
+        output = template.render(
+            {"loop_title": "row", "items": [{"name": "<a>", "n": 2}, {"name": "b", "n": 1}], "tags": ["x", "y"]}
+        )
+
+        assert output == "ROW: &lt;a&gt; x2;\nROW: b;\nx, y"
+
+    def test_elif_else_and_missing_values(self) -> None:
+        template = BuiltinTemplate(
+            "{% if value == 1 %}one{% elif value == 2 %}two{% else %}other{% endif %}[{{ missing.field }}]"
+        )
+
+        assert template.render({"value": 2}) == "two[]"
+        assert template.render({}) == "other[]"
+
+    def test_block_lines_are_trimmed(self) -> None:
+        template = BuiltinTemplate("a\n  {% if true %}\nb\n  {% endif %}\nc\n")
+
+        assert template.render({}) == "a\nb\nc"
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "{{ __import__('os') }}",
+            "{{ value|unknown }}",
+            "{{ (lambda: 1) }}",
+            "{% for x %}{% endfor %}",
+            "{% if x %}",
+            "{% endfor %}",
+            "{% else %}",
+            "{% include 'x' %}",
+            "{{ 1 + }}",
+            "{{ model.__class__.__init__.__globals__ }}",
+            "{{ entry._private }}",
+            "{% for x in items.__class__ %}{% endfor %}",
+        ],
+    )
+    def test_rejects_unsupported_syntax(self, source: str) -> None:
+        with pytest.raises(TemplateError):
+            BuiltinTemplate(source)
+
+
+class TestTemplateRenderer:
+    """測試預設模板與快取。"""
+
+    def test_default_template_matches_builtin_markdown(self, entries: List[Dict[str, Any]]) -> None:
+        for meta in (None, {"dedup_rate": 0.25, "raw_entries": 4, "failed_source_count": 0, "total_sources": 2}):
+            model = renderers.build_model(entries, "2025-12-22", meta)
+            expected = io.StringIO()
+            renderers.MarkdownRenderer().render(model, expected)
+            actual = io.StringIO()
+
+            templating.TemplateRenderer().render(model, actual)
+
+            assert actual.getvalue() == expected.getvalue()
+
+    def test_templates_are_compiled_once(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "t.j2"
+        path.write_text("{{ date }}", encoding="utf-8")
+
+        first = templating.load_template(path)
+
+        assert templating.load_template(path) is first
+        path.write_text("v2 {{ date }}", encoding="utf-8")
+        assert templating.load_template(path).render({"date": "d"}) == "v2 d"
+
+    def test_unknown_engine(self) -> None:
+        with pytest.raises(TemplateError):
+            templating.load_template(engine="mako")
+
+    def test_jinja2_engine_matches_builtin(self, entries: List[Dict[str, Any]]) -> None:
+        pytest.importorskip("jinja2")
+        model = renderers.build_model(entries, "2025-12-22", {"dedup_rate": 0.1})
+        builtin, jinja = io.StringIO(), io.StringIO()
+
+        templating.TemplateRenderer(engine="builtin").render(model, builtin)
+        templating.TemplateRenderer(engine="jinja2").render(model, jinja)
+
+        assert jinja.getvalue() == builtin.getvalue()
+
+
+class TestTemplateOption:
+    """測試 digest/backfill 的 --template。"""
+
+    def test_digest_main_uses_template(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path, entries: List[Dict[str, Any]]
+    ) -> None:
+        template = tmp_path / "custom.j2"
+        template.write_text("{{ date }}: {{ entry_count }}\n", encoding="utf-8")
+        args = SimpleNamespace(
+            date="2025-12-22",
+            input=None,
+            output=tmp_path / "digest.md",
+            dry_run=False,
+            verbose=False,
+            metrics_dir=None,
+            log_json=False,
+            top_k=None,
+            config=None,
+            range=None,
+            weekly=False,
+            formats=["markdown"],
+            template=template,
+            template_engine="builtin",
+            max_bytes=None,
+            incremental=False,
+            profiles=None,
+        )
+        monkeypatch.setattr(digest, "parse_args", lambda: args)
+        monkeypatch.setattr(digest, "OUT_DIR", tmp_path / "raw")
+        monkeypatch.setattr(digest, "setup_logging", lambda **_: None)
+        monkeypatch.setattr(digest, "load_entries", lambda _path: (entries, {}))
+
+        digest.main()
+
+        assert (tmp_path / "digest.md").read_text(encoding="utf-8") == "2025-12-22: 2"
+
+    def test_digest_exits_on_broken_template(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+    ) -> None:
+        template = tmp_path / "broken.j2"
+        template.write_text("{% if x %}", encoding="utf-8")
+        args = SimpleNamespace(formats=["markdown"], template=template, template_engine="builtin")
+
+        with pytest.raises(SystemExit) as exc:
+            digest.resolve_renderers(args)
+
+        assert exc.value.code == 1
+
+    def test_backfill_template_change_rerenders(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+    ) -> None:
+        out = tmp_path / "out"
+        out.mkdir()
+        (out / "raw-2025-12-01.json").write_text(
+            '{"meta": {}, "entries": [{"title": "A", "url": "u", "summary_raw": "", '
+            '"published_at": "", "source": "S", "category": "c"}]}',
+            encoding="utf-8",
+        )
+        template = tmp_path / "t.j2"
+        template.write_text("v1 {{ entry_count }}", encoding="utf-8")
+        monkeypatch.setattr(digest, "OUT_DIR", out)
+        monkeypatch.setattr(backfill, "STATE_PATH", tmp_path / "state.json")
+        missing = pathlib.Path("missing.yml")
+
+        backfill.run(["2025-12-01"], 1, None, missing, template=template)
+        assert (out / "digest-2025-12-01.md").read_text(encoding="utf-8") == "v1 1"
+        assert backfill.run(["2025-12-01"], 1, None, missing, template=template)["skipped"] == 1
+
+        template.write_text("v2 {{ entry_count }}", encoding="utf-8")
+        assert backfill.run(["2025-12-01"], 1, None, missing, template=template)["rendered"] == 1
+        assert (out / "digest-2025-12-01.md").read_text(encoding="utf-8") == "v2 1"
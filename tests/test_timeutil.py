@@ -0,0 +1,92 @@
+"""測試 published_at 正規化。"""
+import pathlib
+import sys
+import time
+from typing import Any, Dict
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import ranking
+import renderers
+import timeutil
+
+NOON_UTC = 1766404800  # 2025-12-22T12:00:00Z
+
+
+class TestNormalize:
+    """測試各種時間格式轉成 ISO 8601 UTC 與 epoch。"""
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "2025-12-22T12:00:00Z",
+            "2025-12-22T20:00:00+08:00",
+            "Mon, 22 Dec 2025 12:00:00 GMT",
+            "Mon, 22 Dec 2025 07:00:00 -0500",
+            "2025-12-22 12:00:00",
+        ],
+    )
+    def test_formats(self, value: str) -> None:
+        assert timeutil.normalize(value) == ("2025-12-22T12:00:00+00:00", NOON_UTC)
+
+    def test_unparseable_kept_verbatim(self) -> None:
+        assert timeutil.normalize("yesterday") == ("yesterday", None)
+        assert timeutil.normalize("") == ("", None)
+
+    def test_struct_time_preferred(self) -> None:
+        parsed = time.gmtime(NOON_UTC)
+
+        assert timeutil.normalize("not a date", parsed) == ("2025-12-22T12:00:00+00:00", NOON_UTC)
+
+    def test_parse_is_memoized(self) -> None:
+        timeutil.parse_timestamp.cache_clear()
+        for _ in range(3):
+            timeutil.parse_timestamp("Mon, 22 Dec 2025 12:00:00 GMT")
+
+        assert timeutil.parse_timestamp.cache_info().hits == 2
+
+    def test_ranking_keeps_old_name(self) -> None:
+        assert ranking.parse_timestamp is timeutil.parse_timestamp
+
+
+class TestFeedEntryTime:
+    """測試 feedparser entry 的時間欄位選擇。"""
+
+    def test_published_with_parsed(self) -> None:
+        entry = {"published": "bogus", "published_parsed": time.gmtime(NOON_UTC)}
+
+        assert timeutil.feed_entry_time(entry) == ("2025-12-22T12:00:00+00:00", NOON_UTC)
+
+    def test_falls_back_to_updated(self) -> None:
+        entry = {"updated": "2025-12-22T12:00:00Z", "updated_parsed": None}
+
+        assert timeutil.feed_entry_time(entry)[1] == NOON_UTC
+
+    def test_missing(self) -> None:
+        assert timeutil.feed_entry_time({}) == ("", None)
+
+
+class TestEntryEpoch:
+    """測試下游讀取 epoch。"""
+
+    def test_prefers_stored_epoch(self) -> None:
+        entry: Dict[str, Any] = {"published_at": "無法解析", "published_epoch": NOON_UTC}
+
+        assert timeutil.entry_epoch(entry) == NOON_UTC
+        assert renderers.iso_timestamp(entry) == "2025-12-22T12:00:00+00:00"
+
+    def test_legacy_entries_parse_string(self) -> None:
+        assert timeutil.entry_epoch({"published_at": "2025-12-22T12:00:00Z"}) == NOON_UTC
+        assert timeutil.entry_epoch({"published_at": "", "published_epoch": None}) is None
+
+    def test_ranking_uses_epoch(self) -> None:
+        config = ranking.RankingConfig()
+        fresh = {"title": "a", "published_at": "?", "published_epoch": NOON_UTC}
+        unknown = {"title": "b", "published_at": "?"}
+
+        scores = ranking.score_entries([fresh, unknown], config, NOON_UTC + 3600)
+
+        assert scores[0] > scores[1]
@@ -0,0 +1,186 @@
+"""測試跨日趨勢統計。"""
+import io
+import pathlib
+import sys
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+# 將 ops/ 加入路徑
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "ops"))
+
+import digest
+import renderers
+import templating
+import trends
+
+
+def seeded_store(days: int = 5) -> trends.TrendStore:
+    store = trends.TrendStore()
+    for day in range(1, days + 1):
+        store.update(f"2025-12-{day:02d}", Counter({"tag:ai": 1 + day % 2, "tag:rust": 4}))
+    return store
+
+
+class TestEntryTerms:
+    """測試詞彙抽取。"""
+
+    def test_tags_domain_and_title_words(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        terms = trends.entry_terms(make_entry("Rust 1.80 released for the Web", tags=["AI"]))
+
+        assert "tag:ai" in terms
+        assert "domain:example.com" in terms
+        assert {"term:rust", "term:released", "term:web"} <= terms
+        assert "term:the" not in terms
+
+    def test_cjk_bigrams(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        terms = trends.entry_terms(make_entry("大型語言模型", url=""))
+
+        assert {"term:大型", "term:型語", "term:模型"} <= terms
+        assert not any(term.startswith("domain:") for term in terms)
+
+    def test_count_terms_once_per_entry(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        counts = trends.count_terms([make_entry("rust rust"), make_entry("rust")])
+
+        assert counts["term:rust"] == 2
+        assert counts["domain:example.com"] == 2
+
+
+class TestTrendStore:
+    """測試累加式計數儲存。"""
+
+    def test_rerun_replaces_column(self) -> None:
+        store = trends.TrendStore()
+        store.update("2025-12-01", Counter({"tag:ai": 3, "tag:old": 1}))
+        store.update("2025-12-01", Counter({"tag:ai": 5}))
+
+        assert store.days == ["2025-12-01"]
+        assert store.counts == {"tag:ai": [5]}
+
+    def test_out_of_order_insert(self) -> None:
+        store = trends.TrendStore()
+        store.update("2025-12-03", Counter({"tag:ai": 3}))
+        store.update("2025-12-01", Counter({"tag:ai": 1}))
+
+        assert store.days == ["2025-12-01", "2025-12-03"]
+        assert store.counts["tag:ai"] == [1, 3]
+
+    def test_window_drops_oldest_days(self) -> None:
+        store = trends.TrendStore(window=3)
+        store.update("2025-12-01", Counter({"tag:gone": 2}))
+        for day in (2, 3, 4):
+            store.update(f"2025-12-{day:02d}", Counter({"tag:ai": day}))
+
+        assert store.days == ["2025-12-02", "2025-12-03", "2025-12-04"]
+        assert store.counts == {"tag:ai": [2, 3, 4]}
+        assert store.update("2025-11-30", Counter({"tag:ai": 1})) is False
+
+    def test_round_trip_and_version_reset(self, tmp_path: pathlib.Path) -> None:
+        path = tmp_path / "trends.json"
+        store = seeded_store()
+        store.save(path)
+
+        loaded = trends.TrendStore.load(path)
+        assert loaded.days == store.days
+        assert loaded.counts == store.counts
+
+        path.write_text('{"version": 0, "days": ["2025-12-01"], "terms": {}}', encoding="utf-8")
+        assert trends.TrendStore.load(path).days == []
+
+
+class TestBursts:
+    """測試 z-score 升溫判斷。"""
+
+    def test_spike_detected(self) -> None:
+        store = seeded_store()
+        store.update("2025-12-06", Counter({"tag:ai": 12, "tag:rust": 4, "tag:new": 5}))
+
+        bursts = store.bursts("2025-12-06")
+
+        assert [burst.term for burst in bursts] == ["tag:ai", "tag:new"]
+        assert bursts[0].count == 12
+        assert bursts[0].history_days == 5
+        assert bursts[0].mean == pytest.approx(1.6)
+
+    def test_needs_history(self) -> None:
+        store = seeded_store(days=2)
+        store.update("2025-12-03", Counter({"tag:ai": 50}))
+
+        assert store.bursts("2025-12-03") == []
+
+    def test_pure_python_matches_numpy(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        pytest.importorskip("numpy")
+        store = seeded_store()
+        store.update("2025-12-06", Counter({"tag:ai": 12, "tag:rust": 9, "tag:new": 5}))
+        vectorized = store.bursts("2025-12-06")
+
+        monkeypatch.setattr(trends, "_numpy", lambda: None)
+        fallback = store.bursts("2025-12-06")
+
+        assert [burst.term for burst in fallback] == [burst.term for burst in vectorized]
+        for left, right in zip(fallback, vectorized):
+            assert left.zscore == pytest.approx(right.zscore)
+
+
+class TestTrendSection:
+    """測試「趨勢」區塊輸出。"""
+
+    def bursts(self) -> List[trends.Burst]:
+        store = seeded_store()
+        store.update("2025-12-06", Counter({"tag:ai": 12, "domain:example.com": 6}))
+        return store.bursts("2025-12-06")
+
+    def test_generate_markdown_includes_trends(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        text = digest.generate_markdown([make_entry("x")], "2025-12-06", None, self.bursts())
+
+        assert "## 趨勢\n\n- #ai：今日 12 筆（前 5 日平均 1.6，z=" in text
+        assert "- example.com：今日 6 筆" in text
+        assert text.index("## 趨勢") < text.index("## news")
+
+    def test_no_section_without_bursts(self, make_entry: Callable[..., Dict[str, Any]]) -> None:
+        assert "## 趨勢" not in digest.generate_markdown([make_entry("x")], "2025-12-06")
+
+    def test_default_template_matches_builtin(
+        self, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        model = renderers.build_model(
+            [make_entry("x")], "2025-12-06", {"dedup_rate": 0.1}, self.bursts()
+        )
+        builtin = io.StringIO()
+        renderers.MarkdownRenderer().render(model, builtin)
+        templated = io.StringIO()
+        templating.TemplateRenderer().render(model, templated)
+
+        assert templated.getvalue() == builtin.getvalue()
+
+
+class TestUpdateTrends:
+    """測試 digest 逐日更新趨勢統計。"""
+
+    def test_updates_store_next_to_input(
+        self, tmp_path: pathlib.Path, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        raw = tmp_path / "raw-2025-12-06.json"
+        store = seeded_store()
+        store.save(trends.store_path(tmp_path))
+        entries = [make_entry(f"post {idx}", tags=["AI"]) for idx in range(12)]
+
+        bursts = digest.update_trends(entries, "2025-12-06", raw, dry_run=False)
+
+        assert "tag:ai" in [burst.term for burst in bursts]
+        assert trends.TrendStore.load(trends.store_path(tmp_path)).days[-1] == "2025-12-06"
+
+    def test_dry_run_does_not_save(
+        self, tmp_path: pathlib.Path, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        digest.update_trends([make_entry("x")], "2025-12-06", tmp_path / "raw.json", dry_run=True)
+
+        assert not trends.store_path(tmp_path).exists()
+
+    def test_non_iso_date_skipped(
+        self, tmp_path: pathlib.Path, make_entry: Callable[..., Dict[str, Any]]
+    ) -> None:
+        assert digest.update_trends([make_entry("x")], "today", tmp_path / "raw.json", False) == []